@@ -1,6 +1,3 @@
-from copy import deepcopy
-
-
 def is_model_output(tensor_name, model):
     """
     Check if a tensor is a final output of the model.
@@ -30,19 +27,29 @@ class MemTracker:
     Attributes:
     model (class):              Input ONNX model
     tensor_size (dict):         Tensor size map for the model
-    ref_count (dict):           This track the tensor that is being referenced in the ONNX model
+    liveness (class):           Tensor birth/death node indices, used to free tensors after their last consumer
+    graph_outputs (set):        Names of the model outputs, stored to system memory when they die
+    node_index (int):           Index of the next node to process
     local_memory_size (int):    The size of local memory, used to determine buffer eviction policy
     in_local_memory (set):      Track the tensor that resides in local memory
     current_footprint (int):    The local mempory usage
     max_foorprint (int):        The maximum memory usage
     bytes_loaded_total (int):   Number of bytes loaded from system dram
     bytes_stored_total (int):   Number of bytes stored to system memory
+    node_ops (array):           Primitive operations of every node, set by enable_recompute (None: always spill)
+    ops_per_byte (float):       Primitive operations taking as long as moving one DRAM byte
+    pending_recompute (dict):   Dropped tensor -> (producer primitive ops, producer weight bytes) to recompute it
+    produced (set):             Names of the node outputs, set by enable_recompute
+    bytes_saved_total (int):    DRAM bytes saved by recomputing instead of spilling
+    recompute_ops_total (float): Primitive operations spent recomputing
     """
 
-    def __init__(self, model, tensor_size, ref_count, local_memory_size):
+    def __init__(self, model, tensor_size, liveness, local_memory_size):
         self.model = model
         self.tensor_size = tensor_size
-        self.ref_count = deepcopy(ref_count)
+        self.liveness = liveness
+        self.graph_outputs = {output.name for output in model.graph.output}
+        self.node_index = 0
         self.local_memory_size = local_memory_size
         self.in_local_memory = set()
         self.current_footprint = 0
@@ -51,6 +58,45 @@ class MemTracker:
         self.bytes_loaded_total = 0
         self.bytes_stored_total = 0
 
+        self.node_ops = None
+        self.ops_per_byte = 0
+        self.pending_recompute = {}
+        self.produced = set()
+        self.bytes_saved_total = 0
+        self.recompute_ops_total = 0
+
+    def enable_recompute(self, node_ops, ops_per_byte):
+        """
+        Weigh recomputing a flushed output against spilling it: the output is dropped instead of stored and
+        reloaded when its producer costs fewer primitive operations, plus reloading its weights, than the
+        spilled bytes
+
+        Args:
+            node_ops (array):       Primitive operations of every node, in node order
+            ops_per_byte (float):   Primitive operations taking as long as moving one DRAM byte
+        """
+        self.node_ops = node_ops
+        self.ops_per_byte = ops_per_byte
+        self.produced = {
+            output for node in self.model.graph.node for output in node.output
+        }
+
+    def recompute_cost(self, node, output):
+        """
+        (primitive ops, weight bytes) to recompute the output of the node at its next use, or None when an
+        activation the node reads is gone by then. The node inputs are all in local memory now and stay there
+        until their last use, the weights and model inputs dead by then are reloaded from DRAM
+        """
+        next_use = self.liveness.next_use(output, self.node_index)
+        weight_bytes = 0
+        for input in dict.fromkeys(node.input):
+            if not input or self.liveness.death.get(input, -1) >= next_use:
+                continue
+            if input in self.produced:
+                return None
+            weight_bytes += self.tensor_size.get(input, 0)
+        return self.node_ops[self.node_index], weight_bytes
+
     def process_node(self, node, next_node_chainable):
         """
         Simulate memory management with local SRAM
@@ -60,14 +106,24 @@ class MemTracker:
         # Track local loads/stores for just this node
         bytes_loaded_node = 0
         bytes_stored_node = 0
+        bytes_saved_node = 0
+        recompute_ops_node = 0
         current_max_footprint = 0
 
-        # 1. Load inputs if not already in local SRAM
+        # 1. Load inputs if not already in local SRAM, the dropped ones are recomputed from their producer
         for input in node.input:
             if input not in self.in_local_memory:
                 load_size = self.tensor_size.get(input, 0)
-                bytes_loaded_node += load_size
-                self.bytes_loaded_total += load_size
+                if input in self.pending_recompute:
+                    # Only the producer weights are reloaded, the tensor itself is produced in local memory
+                    ops, weight_bytes = self.pending_recompute.pop(input)
+                    recompute_ops_node += ops
+                    self.recompute_ops_total += ops
+                    bytes_loaded_node += weight_bytes
+                    self.bytes_loaded_total += weight_bytes
+                else:
+                    bytes_loaded_node += load_size
+                    self.bytes_loaded_total += load_size
                 self.in_local_memory.add(input)
                 self.current_footprint += load_size
                 if self.current_footprint > self.max_footprint:
@@ -85,35 +141,46 @@ class MemTracker:
         # This is the maximal footprint for each node.
         current_max_footprint = self.current_footprint
 
-        # 3. If the next node is "un-chainable", flush its outputs to DRAM.
+        # 3. If the outputs can't stay local until their consumers, flush them to DRAM.
         if not next_node_chainable:
-            # Flush all of this node's outputs
+            # Flush all of this node's outputs, the ones nothing reads are just dropped
             for output in node.output:
                 if output in self.in_local_memory:
                     out_size = self.tensor_size.get(output, 0)
-                    bytes_stored_node += out_size
-                    self.bytes_stored_total += out_size
+                    if (
+                        not self.liveness.dies_at(output, self.node_index)
+                        or output in self.graph_outputs
+                    ):
+                        cost = self.cheaper_recompute(node, output, out_size)
+                        if cost:
+                            # Dropped, the store and the reload are saved
+                            self.pending_recompute[output] = cost
+                            bytes_saved_node += 2 * out_size - cost[1]
+                            self.bytes_saved_total += 2 * out_size - cost[1]
+                        else:
+                            bytes_stored_node += out_size
+                            self.bytes_stored_total += out_size
 
                     # free from local memory
                     self.in_local_memory.remove(output)
                     self.current_footprint -= out_size
 
-        # 4. Free inputs with ref_count=0
-        for input in node.input:
-            if input in self.ref_count:
-                self.ref_count[input] -= 1
-                if self.ref_count[input] == 0:
-                    # If it's a final model output, flush it.
-                    if is_model_output(input, self.model):
-                        store_size = self.tensor_size.get(input, 0)
-                        bytes_stored_node += store_size
-                        self.bytes_stored_total += store_size
-
-                    # remove from SRAM
-                    if input in self.in_local_memory:
-                        input_size = self.tensor_size.get(input, 0)
-                        self.current_footprint -= input_size
-                        self.in_local_memory.remove(input)
+        # 4. Free the tensors whose last use is this node (each once, even when used twice by the node)
+        for tensor in dict.fromkeys(list(node.input) + list(node.output)):
+            if tensor in self.in_local_memory and self.liveness.dies_at(
+                tensor, self.node_index
+            ):
+                tensor_size = self.tensor_size.get(tensor, 0)
+                # If it's a final model output, flush it.
+                if tensor in self.graph_outputs:
+                    bytes_stored_node += tensor_size
+                    self.bytes_stored_total += tensor_size
+
+                # remove from SRAM
+                self.current_footprint -= tensor_size
+                self.in_local_memory.remove(tensor)
+
+        self.node_index += 1
 
         # Return the per-node metrics
         return {
@@ -122,8 +189,59 @@ class MemTracker:
             "footprint": current_max_footprint,
             "max_footprint": self.max_footprint,
             "next_node_chainable": next_node_chainable,
+            "bytes_saved": bytes_saved_node,
+            "recompute_ops": recompute_ops_node,
         }
 
+    def cheaper_recompute(self, node, output, out_size):
+        """
+        The recompute cost of the output when recomputing it is cheaper than storing and reloading it, else None
+        """
+        if self.node_ops is None or output in self.graph_outputs:
+            return None
+        cost = self.recompute_cost(node, output)
+        if cost is None:
+            return None
+        ops, weight_bytes = cost
+        if ops / self.ops_per_byte + weight_bytes < 2 * out_size:
+            return cost
+        return None
+
+    def get_state(self):
+        """
+        Snapshot of the simulation state, used to resume an incremental re-simulation from this node
+        """
+        return {
+            "node_index": self.node_index,
+            "in_local_memory": set(self.in_local_memory),
+            "current_footprint": self.current_footprint,
+            "max_footprint": self.max_footprint,
+            "bytes_loaded_total": self.bytes_loaded_total,
+            "bytes_stored_total": self.bytes_stored_total,
+            "pending_recompute": dict(self.pending_recompute),
+            "bytes_saved_total": self.bytes_saved_total,
+            "recompute_ops_total": self.recompute_ops_total,
+        }
+
+    def resume(self, state):
+        """
+        Continue from a snapshot taken on another version of the model whose preceding nodes are identical.
+        The tensors still live at the snapshot have the same consumers so far, so this model's own liveness
+        frees them at the right node
+
+        Args:
+            state (dict):               Snapshot from get_state()
+        """
+        self.node_index = state["node_index"]
+        self.in_local_memory = set(state["in_local_memory"])
+        self.current_footprint = state["current_footprint"]
+        self.max_footprint = state["max_footprint"]
+        self.bytes_loaded_total = state["bytes_loaded_total"]
+        self.bytes_stored_total = state["bytes_stored_total"]
+        self.pending_recompute = dict(state["pending_recompute"])
+        self.bytes_saved_total = state["bytes_saved_total"]
+        self.recompute_ops_total = state["recompute_ops_total"]
+
     def finalize(self):
         """
         After all nodes are processed, we store any leftover final outputs
@@ -149,4 +267,6 @@ class MemTracker:
             "max_footprint": self.max_footprint,
             "total_bytes_loaded": self.bytes_loaded_total,
             "total_bytes_stored": self.bytes_stored_total,
+            "total_bytes_saved": self.bytes_saved_total,
+            "total_recompute_ops": self.recompute_ops_total,
         }
@@ -0,0 +1,166 @@
+import os
+import glob
+import pickle
+import hashlib
+from onnx import TensorProto
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "onnx-toolbox")
+
+# Source files whose content changes the analysis results, hashed into the toolbox version
+TOOLBOX_SOURCES = [
+    "onnx_analysis.py",
+    "node_attributes.py",
+    "node_table.py",
+    "node_registry.py",
+    "graph_index.py",
+    "shape_sweep.py",
+    "tensor_reader.py",
+    "sparsity.py",
+    "MemTracker.py",
+    "memory_hierarchy.py",
+    "liveness.py",
+    "fusion.py",
+    os.path.join("handlers", "*.py"),
+]
+
+HASH_BLOCK_SIZE = 1 << 24
+
+
+def toolbox_version():
+    """
+    Hash of the analyzer sources, so cached results are dropped whenever a handler changes
+    """
+    toolbox_dir = os.path.dirname(os.path.abspath(__file__))
+    digest = hashlib.sha256()
+    for pattern in TOOLBOX_SOURCES:
+        for filename in sorted(glob.glob(os.path.join(toolbox_dir, pattern))):
+            with open(filename, "rb") as f:
+                digest.update(f.read())
+    return digest.hexdigest()
+
+
+def hash_file(digest, filename):
+    with open(filename, "rb") as f:
+        for block in iter(lambda: f.read(HASH_BLOCK_SIZE), b""):
+            digest.update(block)
+
+
+def external_data_files(model):
+    locations = set()
+    for initializer in model.graph.initializer:
+        if initializer.data_location == TensorProto.EXTERNAL:
+            for entry in initializer.external_data:
+                if entry.key == "location":
+                    locations.add(entry.value)
+    return sorted(locations)
+
+
+class AnalysisCache:
+    """
+    Content-addressed on-disk cache of the model analysis (shape-inferred value_info and per-node ops_attributes)
+    so repeated runs over the same model skip check_model, shape inference and the handlers.
+    Entries are evicted least-recently-used first once the cache exceeds max_size
+
+    Attributes:
+    cache_dir (str):            Directory holding one pickle file per cache entry
+    max_size (int):             Cache size cap in bytes
+    """
+
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR, max_size_mb=1024):
+        self.cache_dir = cache_dir
+        self.max_size = max_size_mb * 1024 * 1024
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    def model_key(self, onnx_filename, model, options):
+        """
+        Key on the model content, the toolbox version and the options that change the analysis results.
+        The graph proto is hashed in full, external data files by name, size and mtime to keep warm runs cheap
+        """
+        digest = hashlib.sha256()
+        hash_file(digest, onnx_filename)
+
+        base_dir = os.path.dirname(os.path.abspath(onnx_filename))
+        for location in external_data_files(model):
+            stat = os.stat(os.path.join(base_dir, location))
+            digest.update(f"{location}:{stat.st_size}:{stat.st_mtime_ns}".encode())
+
+        digest.update(toolbox_version().encode())
+        digest.update(repr(sorted(options.items())).encode())
+        return digest.hexdigest()
+
+    def memory_key(self, model_key, options):
+        """
+        Key of the memory simulation results of a cached model for the memory options
+        """
+        digest = hashlib.sha256(model_key.encode())
+        digest.update(repr(sorted(options.items())).encode())
+        return digest.hexdigest()
+
+    def entry_path(self, key):
+        return os.path.join(self.cache_dir, key + ".pkl")
+
+    def load(self, key):
+        path = self.entry_path(key)
+        if not os.path.exists(path):
+            return None
+
+        try:
+            with open(path, "rb") as f:
+                entry = pickle.load(f)
+        except Exception as e:
+            print(f"Ignoring unreadable cache entry {path}: {e}")
+            return None
+
+        # Refresh the mtime so the eviction is least-recently-used
+        os.utime(path)
+        return entry
+
+    def store(self, key, model, ops_attributes):
+        entry = {
+            "value_info": [v.SerializeToString() for v in model.graph.value_info],
+            "input": [v.SerializeToString() for v in model.graph.input],
+            "output": [v.SerializeToString() for v in model.graph.output],
+            "ops_attributes": ops_attributes,
+        }
+        self.store_entry(key, entry)
+
+    def store_entry(self, key, entry):
+        # Write-then-rename so a concurrent reader never sees a partial entry
+        path = self.entry_path(key)
+        temp_path = f"{path}.{os.getpid()}.tmp"
+        with open(temp_path, "wb") as f:
+            pickle.dump(entry, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temp_path, path)
+
+        self.evict()
+
+    def restore_value_info(self, model, entry):
+        """
+        Put the cached shape inference results back into the freshly loaded model
+        """
+        for field in ["value_info", "input", "output"]:
+            value_infos = getattr(model.graph, field)
+            del value_infos[:]
+            for serialized in entry[field]:
+                value_info = value_infos.add()
+                value_info.ParseFromString(serialized)
+
+    def evict(self):
+        entries = []
+        for path in glob.glob(os.path.join(self.cache_dir, "*.pkl")):
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                # Evicted by a concurrent run
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+
+        total_size = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total_size <= self.max_size:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total_size -= size
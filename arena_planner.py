@@ -0,0 +1,204 @@
+import json
+
+import numpy as np
+
+ARENA_STRATEGIES = ("size", "breadth", "coloring")
+
+
+def align_up(size, alignment):
+    return -(-size // alignment) * alignment
+
+
+class ArenaPlan:
+    """
+    Static placement of the intermediate tensors in a single arena, from their live ranges over the node order.
+
+    Every tensor produced by a node gets a byte offset, two tensors share bytes only if their live ranges don't
+    overlap. The model outputs are kept until the last node so they can be read back after the inference.
+    Strategies:
+    size:       Greedy by size, the largest tensors first, each in the smallest gap left by the placed tensors
+                overlapping its live range (best fit)
+    breadth:    Greedy by breadth, the nodes with the most live bytes first, their unplaced tensors by size,
+                best fit like size
+    coloring:   Interval graph coloring, the tensors in birth order share the buffers whose last tensor is dead.
+                Each buffer is as large as its largest tensor and the buffers are laid out one after another
+
+    Attributes:
+    strategy (str):             Placement strategy
+    alignment (int):            Offset and size alignment in bytes
+    node_names (list):          Node names in execution order, the node positions below index this list
+    tensors (list):             Tensor names
+    sizes (array):              Aligned tensor sizes
+    first_node (array):         Position of the node producing each tensor
+    last_node (array):          Position of the last node using each tensor
+    offsets (array):            Assigned byte offsets
+    arena_size (int):           Bytes of the arena
+    lower_bound (int):          Largest sum of aligned live tensor sizes over the nodes, no plan can be smaller
+    """
+
+    def __init__(
+        self, graph_index, liveness, tensor_size, strategy="size", alignment=64
+    ):
+        if strategy not in ARENA_STRATEGIES:
+            raise ValueError(
+                f"Unknown arena strategy {strategy}, expected one of {ARENA_STRATEGIES}"
+            )
+        self.strategy = strategy
+        self.alignment = alignment
+        self.node_names = [node.name for node in graph_index.nodes]
+        last = max(liveness.num_nodes - 1, 0)
+
+        self.tensors = list(graph_index.producer)
+        self.sizes = np.array(
+            [align_up(tensor_size.get(t, 0), alignment) for t in self.tensors],
+            dtype=np.int64,
+        )
+        self.first_node = np.array(
+            [liveness.birth[t] for t in self.tensors], dtype=np.int64
+        )
+        self.last_node = np.array(
+            [
+                last if t in graph_index.graph_outputs else liveness.death[t]
+                for t in self.tensors
+            ],
+            dtype=np.int64,
+        )
+
+        delta = np.bincount(
+            self.first_node, weights=self.sizes, minlength=liveness.num_nodes + 1
+        )
+        delta -= np.bincount(
+            self.last_node + 1, weights=self.sizes, minlength=liveness.num_nodes + 1
+        )
+        self.live_bytes = np.cumsum(delta)[: liveness.num_nodes]
+        self.lower_bound = int(self.live_bytes.max(initial=0))
+
+        self.offsets = np.full(len(self.tensors), -1, dtype=np.int64)
+        if strategy == "coloring":
+            self.plan_coloring()
+        else:
+            self.plan_greedy(self.placement_order())
+        self.arena_size = int((self.offsets + self.sizes).max(initial=0))
+
+    def fragmentation(self):
+        """
+        Fraction of the arena lost to fragmentation against the lower bound
+        """
+        if not self.arena_size:
+            return 0.0
+        return (self.arena_size - self.lower_bound) / self.arena_size
+
+    def placement_order(self):
+        by_size = np.lexsort((self.first_node, -self.sizes))
+        if self.strategy == "size":
+            return by_size
+        # Breadth: every tensor goes with the node of largest breadth it is live at, largest breadths first
+        breadth_rank = np.argsort(np.argsort(-self.live_bytes, kind="stable"))
+        tensor_rank = np.array(
+            [
+                breadth_rank[first : last + 1].min()
+                for first, last in zip(self.first_node, self.last_node)
+            ],
+            dtype=np.int64,
+        )
+        return by_size[np.argsort(tensor_rank[by_size], kind="stable")]
+
+    def plan_greedy(self, order):
+        for t in order:
+            placed = (
+                (self.offsets >= 0)
+                & (self.first_node <= self.last_node[t])
+                & (self.last_node >= self.first_node[t])
+            )
+            starts = self.offsets[placed]
+            ends = starts + self.sizes[placed]
+            by_offset = np.argsort(starts, kind="stable")
+
+            # Best fit among the gaps between the overlapping tensors, on top of them otherwise
+            size = self.sizes[t]
+            best_offset, best_gap = None, None
+            previous_end = 0
+            for start, end in zip(starts[by_offset], ends[by_offset]):
+                gap = start - previous_end
+                if gap >= size and (best_gap is None or gap < best_gap):
+                    best_offset, best_gap = previous_end, gap
+                previous_end = max(previous_end, end)
+            self.offsets[t] = previous_end if best_offset is None else best_offset
+
+    def plan_coloring(self):
+        buffer_size = []
+        buffer_free_after = []
+        buffer_of = np.zeros(len(self.tensors), dtype=np.int64)
+        for t in np.lexsort((-self.sizes, self.first_node)):
+            size = self.sizes[t]
+            free = [
+                b
+                for b in range(len(buffer_size))
+                if buffer_free_after[b] < self.first_node[t]
+            ]
+            fitting = [b for b in free if buffer_size[b] >= size]
+            if fitting:
+                # Smallest free buffer holding the tensor
+                b = min(fitting, key=lambda b: buffer_size[b])
+            elif free:
+                # Grow the largest free buffer
+                b = max(free, key=lambda b: buffer_size[b])
+                buffer_size[b] = size
+            else:
+                b = len(buffer_size)
+                buffer_size.append(size)
+                buffer_free_after.append(-1)
+            buffer_free_after[b] = self.last_node[t]
+            buffer_of[t] = b
+
+        buffer_offset = np.concatenate(([0], np.cumsum(buffer_size, dtype=np.int64)))[
+            : len(buffer_size)
+        ]
+        if len(self.tensors):
+            self.offsets = buffer_offset[buffer_of]
+
+    def rows(self):
+        return [
+            {
+                "Tensor Name": t,
+                "Offset": int(offset),
+                "Size (bytes)": int(size),
+                "First Node": self.node_names[first],
+                "Last Node": self.node_names[last],
+            }
+            for t, offset, size, first, last in zip(
+                self.tensors, self.offsets, self.sizes, self.first_node, self.last_node
+            )
+        ]
+
+    def to_json(self, filename):
+        """
+        Write the plan for the runtime: arena size and per-tensor offsets, with the node positions of the
+        live ranges in node_order
+        """
+        plan = {
+            "strategy": self.strategy,
+            "alignment": self.alignment,
+            "arena_size": self.arena_size,
+            "lower_bound": self.lower_bound,
+            "fragmentation": self.fragmentation(),
+            "node_order": self.node_names,
+            "tensors": [
+                {
+                    "name": t,
+                    "offset": int(offset),
+                    "size": int(size),
+                    "first_node": int(first),
+                    "last_node": int(last),
+                }
+                for t, offset, size, first, last in zip(
+                    self.tensors,
+                    self.offsets,
+                    self.sizes,
+                    self.first_node,
+                    self.last_node,
+                )
+            ],
+        }
+        with open(filename, "w") as f:
+            json.dump(plan, f, indent=2)
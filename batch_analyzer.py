@@ -0,0 +1,229 @@
+import os
+import io
+import glob
+import time
+import argparse
+import contextlib
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from concurrent.futures.process import BrokenProcessPool
+
+import numpy as np
+import pandas as pd
+
+from onnx_analysis import ModelStats
+from model_analyzer import add_analysis_arguments, print_args
+
+# Per-node columns summed into the per-model summary
+SUMMARY_STAT_KEYS = [
+    "MAC Count",
+    "ALU Count",
+    "EXP Count",
+    "DIV Count",
+    "TRIG Count",
+    "SQRT Count",
+    "Weight Size (bytes)",
+]
+
+
+def find_models(inputs):
+    """
+    Expand directories (recursively) and glob patterns into a sorted list of ONNX model files
+    """
+    models = []
+    for pattern in inputs:
+        if os.path.isdir(pattern):
+            models += glob.glob(os.path.join(pattern, "**", "*.onnx"), recursive=True)
+        else:
+            models += glob.glob(pattern, recursive=True)
+    return sorted(set(models))
+
+
+def prefetch_model(onnx_filename):
+    """
+    Ask the kernel to start reading the model file so loading overlaps with the models being analyzed
+    """
+    if not hasattr(os, "posix_fadvise"):
+        return
+    try:
+        fd = os.open(onnx_filename, os.O_RDONLY)
+        try:
+            os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_WILLNEED)
+        finally:
+            os.close(fd)
+    except OSError:
+        pass
+
+
+def analyze_model(onnx_filename, args):
+    """
+    Worker entry: run the full analysis of one model and return its summary row.
+    Any exception is caught and reported in the row so one bad model does not stop the batch
+    """
+    model_args = argparse.Namespace(**vars(args))
+    model_args.input = onnx_filename
+    summary = {"Model": onnx_filename, "Status": "OK"}
+
+    start = time.perf_counter()
+    try:
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            model_stats = ModelStats(model_args)
+            if args.report:
+                model_stats.generate_report()
+            if args.save:
+                model_stats.save_model()
+
+        ops_attributes = model_stats.ops_attributes
+        summary["Nodes"] = len(ops_attributes)
+        summary["Unsupported Ops"] = int(
+            np.count_nonzero(~ops_attributes.column("Supported"))
+        )
+        for key in SUMMARY_STAT_KEYS:
+            summary[key] = ops_attributes.total(key)
+        summary["bytes_loaded"] = model_stats.memory_summary["total_bytes_loaded"]
+        summary["bytes_stored"] = model_stats.memory_summary["total_bytes_stored"]
+        summary["Max SRAM footprint"] = model_stats.memory_summary["max_footprint"]
+        for name, stats in model_stats.memory_summary.get("levels", {}).items():
+            summary[f"{name} bytes_loaded"] = stats["bytes_loaded"]
+            summary[f"{name} bytes_stored"] = stats["bytes_stored"]
+        if model_stats.roofline:
+            summary["Roofline (us)"] = model_stats.roofline.total * 1e6
+        if model_stats.energy is not None:
+            summary["Energy (uJ)"] = model_stats.energy
+        if model_stats.timeline:
+            summary["Timeline (us)"] = model_stats.timeline.makespan * 1e6
+        if args.verbose:
+            print(output.getvalue())
+    except Exception as e:
+        summary["Status"] = "FAILED"
+        summary["Error"] = f"{type(e).__name__}: {e}"
+
+    summary["Analysis Time (s)"] = round(time.perf_counter() - start, 3)
+    return summary
+
+
+def run_batch(models, args):
+    """
+    Fan the models out to a process pool. At most 2 x workers models are in flight so the queued
+    ones can be prefetched while the running ones are analyzed. Results come back in model order.
+
+    A worker dying (e.g. a crash in a native library) breaks the pool and fails every model in flight
+    with it. The pool is then recreated and the models that were in flight are retried one at a time,
+    so only the model that breaks the pool on its own is reported as failed
+    """
+    summaries = {}
+    pending = list(reversed(models))
+    suspects = []
+
+    while pending or suspects:
+        in_flight = {}
+        broken = []
+        pool_broken = False
+        with ProcessPoolExecutor(max_workers=args.workers) as executor:
+            while (pending or suspects or in_flight) and not pool_broken:
+                # The suspects of a previous pool break run alone
+                if suspects:
+                    queue, limit = suspects, 1
+                else:
+                    queue, limit = pending, args.workers * 2
+                while queue and len(in_flight) < limit:
+                    onnx_filename = queue.pop()
+                    prefetch_model(onnx_filename)
+                    try:
+                        future = executor.submit(analyze_model, onnx_filename, args)
+                    except BrokenProcessPool:
+                        queue.append(onnx_filename)
+                        pool_broken = True
+                        break
+                    in_flight[future] = onnx_filename
+
+                done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                if pool_broken or any(
+                    isinstance(future.exception(), BrokenProcessPool) for future in done
+                ):
+                    # Every future still in flight fails with the pool
+                    pool_broken = True
+                    done, _ = wait(in_flight)
+                for future in done:
+                    onnx_filename = in_flight.pop(future)
+                    try:
+                        summaries[onnx_filename] = future.result()
+                    except BrokenProcessPool as e:
+                        broken.append((onnx_filename, e))
+                        continue
+                    print(
+                        f"[{len(summaries)}/{len(models)}] {onnx_filename}: {summaries[onnx_filename]['Status']}"
+                    )
+
+        if len(broken) == 1:
+            onnx_filename, e = broken[0]
+            summaries[onnx_filename] = {
+                "Model": onnx_filename,
+                "Status": "FAILED",
+                "Error": f"Worker process died: {e}",
+            }
+            print(f"[{len(summaries)}/{len(models)}] {onnx_filename}: FAILED")
+        elif broken:
+            print(
+                f"A worker process died, retrying the {len(broken)} models in flight one at a time"
+            )
+            order = {onnx_filename: i for i, onnx_filename in enumerate(models)}
+            suspects += sorted(
+                (onnx_filename for onnx_filename, _ in broken),
+                key=lambda onnx_filename: -order[onnx_filename],
+            )
+
+    return [summaries[onnx_filename] for onnx_filename in models]
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Toolbox for analyzing a batch of ONNX models"
+    )
+
+    parser.add_argument(
+        "--input",
+        "-i",
+        type=str,
+        nargs="+",
+        required=True,
+        help="Directories and/or glob patterns of the input ONNX models",
+    )
+    parser.add_argument(
+        "--workers",
+        "-w",
+        type=int,
+        default=os.cpu_count(),
+        required=False,
+        help="Number of models analyzed in parallel",
+    )
+    parser.add_argument(
+        "--output",
+        "-o",
+        type=str,
+        default="batch_summary.csv",
+        required=False,
+        help="Consolidated per-model summary (CSV)",
+    )
+    add_analysis_arguments(parser)
+
+    args = parser.parse_args()
+
+    print_args(args)
+
+    models = find_models(args.input)
+    print(f"Analyzing {len(models)} models with {args.workers} workers...")
+    summaries = run_batch(models, args)
+
+    summary_frame = pd.DataFrame(summaries)
+    if "Error" in summary_frame.columns:
+        summary_frame = summary_frame[
+            [col for col in summary_frame.columns if col != "Error"] + ["Error"]
+        ]
+    summary_frame.to_csv(args.output, index=False)
+    print(summary_frame.to_string(index=False))
+    print(f"Batch summary written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import onnx
+from onnx import TensorProto, helper, numpy_helper
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from node_registry import get_handler
+from graph_index import GraphIndex
+import handlers
+
+
+class LinearGraphView(GraphIndex):
+    """
+    Reference lookup with the linear scans NodeAttributes used before GraphIndex, kept here for comparison only.
+    Only the name lookups are overridden, everything else the handlers call comes from GraphIndex
+    """
+
+    def find_tensor(self, tensor_name):
+        for tensors in [
+            self.model.graph.value_info,
+            self.model.graph.input,
+            self.model.graph.output,
+        ]:
+            for tensor in tensors:
+                if tensor.name == tensor_name:
+                    return tensor
+        return None
+
+    def find_initializer(self, tensor_name):
+        for initializer in self.model.graph.initializer:
+            if initializer.name == tensor_name:
+                return initializer
+        return None
+
+    def is_initializer(self, tensor_name):
+        return self.find_initializer(tensor_name) is not None
+
+    def get_initializer_array(self, tensor_name):
+        initializer = self.find_initializer(tensor_name)
+        if initializer is None:
+            return None
+        return self.tensor_reader.get_array(initializer)
+
+    def is_model_input(self, tensor_name):
+        return any(tensor.name == tensor_name for tensor in self.model.graph.input)
+
+    def is_model_output(self, tensor_name):
+        return any(tensor.name == tensor_name for tensor in self.model.graph.output)
+
+
+def build_chain_model(num_blocks, channels=8, spatial=8):
+    """
+    Build a Conv -> Relu -> Add residual chain with 3 * num_blocks nodes
+    """
+    nodes = []
+    initializers = []
+    x = "input"
+    for i in range(num_blocks):
+        initializers.append(
+            numpy_helper.from_array(
+                np.zeros((channels, channels, 1, 1), dtype=np.float32), f"w_{i}"
+            )
+        )
+        nodes.append(
+            helper.make_node(
+                "Conv",
+                [x, f"w_{i}"],
+                [f"conv_{i}"],
+                name=f"Conv_{i}",
+                kernel_shape=[1, 1],
+                group=1,
+            )
+        )
+        nodes.append(
+            helper.make_node("Relu", [f"conv_{i}"], [f"relu_{i}"], name=f"Relu_{i}")
+        )
+        nodes.append(
+            helper.make_node("Add", [f"relu_{i}", x], [f"add_{i}"], name=f"Add_{i}")
+        )
+        x = f"add_{i}"
+
+    shape = [1, channels, spatial, spatial]
+    graph = helper.make_graph(
+        nodes,
+        "chain",
+        [helper.make_tensor_value_info("input", TensorProto.FLOAT, shape)],
+        [helper.make_tensor_value_info(x, TensorProto.FLOAT, shape)],
+        initializers,
+    )
+    model = helper.make_model(graph, opset_imports=[helper.make_opsetid("", 13)])
+    return onnx.shape_inference.infer_shapes(model)
+
+
+def parse_nodes(view, model):
+    for node in model.graph.node:
+        get_handler(node.op_type).handle(view, node).to_dict()
+
+
+def time_parse(model, view_class):
+    start = time.perf_counter()
+    view = view_class(model)
+    parse_nodes(view, model)
+    return time.perf_counter() - start
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Benchmark NodeAttributes lookups with and without GraphIndex"
+    )
+    parser.add_argument(
+        "--sizes",
+        type=str,
+        default="300,1000,3000,10000,30000",
+        help="Comma-separated node counts to benchmark",
+    )
+    parser.add_argument(
+        "--linear-limit",
+        type=int,
+        default=3000,
+        help="Largest node count to run with the linear-scan reference",
+    )
+    args = parser.parse_args(argv)
+
+    print(f"{'Nodes':>8} {'GraphIndex (s)':>16} {'us/node':>10} {'Linear (s)':>12}")
+    for size in [int(s) for s in args.sizes.split(",")]:
+        model = build_chain_model(max(size // 3, 1))
+        num_nodes = len(model.graph.node)
+
+        indexed_time = time_parse(model, GraphIndex)
+        if num_nodes <= args.linear_limit:
+            linear_time = f"{time_parse(model, LinearGraphView):12.3f}"
+        else:
+            linear_time = f"{'skipped':>12}"
+
+        print(
+            f"{num_nodes:>8} {indexed_time:16.3f} {indexed_time / num_nodes * 1e6:10.1f} {linear_time}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+import json
+
+import numpy as np
+import pandas as pd
+
+from hw_profile import PRIMITIVE_COLUMNS, per_data_type
+
+# Per-node energy columns added to the report, in uJ
+ENERGY_STAT_KEYS = [
+    "Compute Energy (uJ)",
+    "SRAM Energy (uJ)",
+    "DRAM Energy (uJ)",
+    "Energy (uJ)",
+]
+
+
+class EnergyModel:
+    """
+    Energy cost of the target, loaded from a JSON file:
+
+    {
+        "name": "npu",
+        "primitive_pj": {
+            "MAC": {"FLOAT": 3.7, "FLOAT16": 1.1, "INT8": 0.2},
+            "ALU": {"FLOAT": 0.9, "default": 0.1},
+            "EXP": 8, "DIV": 8, "TRIG": 8, "SQRT": 8
+        },
+        "sram_pj_per_byte": 1.2,
+        "dram_pj_per_byte": 80
+    }
+
+    primitive_pj is the energy of one primitive operation in pJ, either one value or one per node data type
+    ("default" for the types not listed), a primitive missing from it costs nothing. A node reads its inputs and
+    weights from local memory and writes its output to it, and moves its bytes_loaded/bytes_stored from/to DRAM
+
+    Attributes:
+    name (str):                 Energy model name
+    primitive_pj (dict):        Primitive -> pJ per operation, or data type -> pJ per operation
+    sram_pj_per_byte (float):   Local memory access energy in pJ per byte
+    dram_pj_per_byte (float):   DRAM access energy in pJ per byte
+    """
+
+    def __init__(self, profile):
+        self.name = profile.get("name", "")
+        self.primitive_pj = profile.get("primitive_pj", {})
+        for primitive in self.primitive_pj:
+            if primitive not in PRIMITIVE_COLUMNS:
+                raise ValueError(
+                    f"Unknown compute primitive in the energy model: {primitive}"
+                )
+        self.sram_pj_per_byte = profile.get("sram_pj_per_byte", 0.0)
+        self.dram_pj_per_byte = profile.get("dram_pj_per_byte", 0.0)
+
+    @classmethod
+    def load(cls, filename):
+        with open(filename) as f:
+            return cls(json.load(f))
+
+    def node_energy(self, ops_attributes):
+        """
+        Energy of every node in pJ
+
+        Returns:
+            (numpy array, numpy array, numpy array): compute, SRAM and DRAM energy per node
+        """
+        data_types = ops_attributes.column("Data Type")
+        compute = np.zeros(len(ops_attributes))
+        for primitive, pj in self.primitive_pj.items():
+            counts = ops_attributes.column(PRIMITIVE_COLUMNS[primitive])
+            per_op = per_data_type(
+                pj, data_types, counts, f"{primitive} energy in the energy model"
+            )
+            compute += np.where(counts > 0, counts * per_op, 0.0)
+        sram_bytes = (
+            ops_attributes.column("Input Size (bytes)")
+            + ops_attributes.column("Weight Size (bytes)")
+            + ops_attributes.column("Output Size (bytes)")
+        )
+        dram_bytes = ops_attributes.column("bytes_loaded") + ops_attributes.column(
+            "bytes_stored"
+        )
+        return (
+            compute,
+            sram_bytes * self.sram_pj_per_byte,
+            dram_bytes * self.dram_pj_per_byte,
+        )
+
+
+def energy_rows(ops_attributes):
+    """
+    Per op type sums of the per-node energy columns for the report
+    """
+    frame = pd.DataFrame(
+        {
+            "Op Type": ops_attributes.column("Op Type"),
+            **{key: ops_attributes.column(key) for key in ENERGY_STAT_KEYS},
+        }
+    )
+    summary = frame.groupby("Op Type", sort=True)[ENERGY_STAT_KEYS].sum()
+    summary.insert(0, "Operator Count", frame.groupby("Op Type", sort=True).size())
+    total = summary["Energy (uJ)"].sum()
+    summary["Share of Total"] = summary["Energy (uJ)"] / total if total else 0.0
+    summary = summary.sort_values("Energy (uJ)", ascending=False)
+    summary.loc["Total"] = summary.sum()
+    return summary.reset_index().to_dict("records")
@@ -0,0 +1,158 @@
+from collections import Counter
+
+import numpy as np
+
+# Ops that can be chained together without explicit DRAM flush
+CHAINABLE_OPS = {
+    "Relu",
+    "Sigmoid",
+    "Tanh",
+    "Add",
+    "Mul",
+    "Mish",
+    "Transpose",
+    "LeakyRelu",
+    "Concat",
+}
+
+# Ops a compute engine typically applies on its output tile before writing it out
+EPILOGUE_OPS = {
+    "Relu",
+    "Sigmoid",
+    "Tanh",
+    "Mish",
+    "LeakyRelu",
+    "Clip",
+    "BatchNormalization",
+    "Add",
+    "Mul",
+}
+COMPUTE_OPS = {"Conv", "ConvTranspose", "Gemm", "MatMul"}
+
+# Per-node columns summed per segment
+SEGMENT_STAT_KEYS = [
+    "MAC Count",
+    "ALU Count",
+    "EXP Count",
+    "DIV Count",
+    "TRIG Count",
+    "SQRT Count",
+]
+
+FUSION_RULES = {}
+
+
+def register_fusion_rule(name):
+    def wrapper(cls):
+        FUSION_RULES[name] = cls
+        return cls
+
+    return wrapper
+
+
+def get_fusion_rule(name):
+    return FUSION_RULES[name]()
+
+
+@register_fusion_rule("chainable")
+class ChainableRule:
+    """
+    A node joins the segment of its producers when it is a chainable op (the is_chainable() ops)
+    """
+
+    def can_fuse(self, graph_index, segment, i):
+        return graph_index.nodes[i].op_type in CHAINABLE_OPS
+
+
+@register_fusion_rule("epilogue")
+class EpilogueRule:
+    """
+    One compute op (Conv/Gemm/MatMul) per segment followed by the element-wise ops applied on its output tile,
+    as most NPUs fuse them
+    """
+
+    def can_fuse(self, graph_index, segment, i):
+        return graph_index.nodes[i].op_type in EPILOGUE_OPS and any(
+            graph_index.nodes[j].op_type in COMPUTE_OPS for j in segment
+        )
+
+
+def partition(graph_index, rule):
+    """
+    Group the nodes in fusion segments over the DAG. Going in node order, a node joins the segment of its
+    producers when they all are in the same segment and the rule accepts it. The inputs of a segment then only
+    enter at its first node, so the segments never depend on each other in a cycle and run one after another
+
+    Returns:
+        list of segments, each a list of node indices in node order
+    """
+    segment_of = {}
+    segments = []
+    for i, node in enumerate(graph_index.nodes):
+        producers = {
+            graph_index.producer[t] for t in node.input if t in graph_index.producer
+        }
+        producer_segments = {segment_of[j] for j in producers}
+        if len(producer_segments) == 1:
+            s = producer_segments.pop()
+            if rule.can_fuse(graph_index, segments[s], i):
+                segments[s].append(i)
+                segment_of[i] = s
+                continue
+        segment_of[i] = len(segments)
+        segments.append([i])
+    return segments
+
+
+def segment_rows(graph_index, ops_attributes, tensor_size, segments):
+    """
+    Per segment: aggregate compute, the DRAM traffic at its boundary (tensors read from outside, tensors used
+    outside or model outputs written out) and the peak bytes live while its nodes run
+    """
+    stat_columns = {key: ops_attributes.column(key) for key in SEGMENT_STAT_KEYS}
+    rows = []
+    for number, segment in enumerate(segments):
+        members = set(segment)
+        produced = {t for i in segment for t in graph_index.nodes[i].output if t}
+        # Live range of the touched tensors over the positions in the segment
+        first = {}
+        last = {}
+        for position, i in enumerate(segment):
+            node = graph_index.nodes[i]
+            for t in list(node.input) + list(node.output):
+                if t:
+                    first.setdefault(t, position)
+                    last[t] = position
+        boundary_inputs = [t for t in first if t not in produced]
+        boundary_outputs = [
+            t
+            for t in produced
+            if graph_index.is_model_output(t)
+            or any(j not in members for j in graph_index.get_consumers(t))
+        ]
+        for t in boundary_outputs:
+            last[t] = len(segment) - 1
+
+        delta = np.zeros(len(segment) + 1)
+        for t in first:
+            delta[first[t]] += tensor_size.get(t, 0)
+            delta[last[t] + 1] -= tensor_size.get(t, 0)
+
+        nodes = [graph_index.nodes[i] for i in segment]
+        row = {
+            "Segment": number,
+            "First Node": nodes[0].name,
+            "Last Node": nodes[-1].name,
+            "Nodes": len(segment),
+            "Op Types": ", ".join(
+                f"{op_type} x{count}" if count > 1 else op_type
+                for op_type, count in Counter(node.op_type for node in nodes).items()
+            ),
+        }
+        for key, column in stat_columns.items():
+            row[key] = float(column[segment].sum())
+        row["bytes_loaded"] = sum(tensor_size.get(t, 0) for t in boundary_inputs)
+        row["bytes_stored"] = sum(tensor_size.get(t, 0) for t in boundary_outputs)
+        row["Peak Footprint (bytes)"] = int(np.cumsum(delta).max(initial=0))
+        rows.append(row)
+    return rows
@@ -1,6 +1,10 @@
+import re
+
+import numpy as np
 import pandas as pd
 
 from openpyxl import load_workbook
+from openpyxl.utils import get_column_letter
 from openpyxl.worksheet.table import Table, TableStyleInfo
 
 import pdb
@@ -20,31 +24,69 @@ def new_primitive_count():
     }
 
 
+def table_name(title):
+    """
+    Excel table name of a sheet title: letters, digits and underscores only, starting with a letter or an underscore
+    """
+    name = re.sub(r"[^A-Za-z0-9_]", "_", title)
+    if not re.match(r"[A-Za-z_]", name):
+        name = "_" + name
+    return name
+
+
 class ReportGenerator:
     """
     This class is taking the model data from ModelStats and perform additional model analysis
 
     Attributes:
-    model_stats (list):        The basic statistics of ONNX model
+    model_stats (class):        The basic statistics of ONNX model (NodeTable)
     xlsx_filename (str):        report filename
+    extra_sheets (dict):        Additional analysis sheets, sheet title -> list of row dicts
     """
 
-    def __init__(self, model_stats, xlsx_filename):
+    def __init__(self, model_stats, xlsx_filename, extra_sheets=None):
         self.model_stats = model_stats
         self.xlsx_filename = xlsx_filename
+        self.extra_sheets = extra_sheets or {}
+
+    def add_sheet(self, workbook, title, rows):
+        """
+        Append a list of row dicts as a new formatted table sheet
+        """
+        frame = pd.DataFrame(rows)
+        sheet = workbook.create_sheet(title=title)
+        sheet.append(frame.columns.tolist())
+        for row in frame.values.tolist():
+            sheet.append(row)
+
+        for column in sheet.columns:
+            col_letter = column[0].column_letter
+            sheet.column_dimensions[col_letter].width = 16
+
+        table = Table(
+            displayName=table_name(title),
+            ref=f"A1:{get_column_letter(len(frame.columns))}{frame.shape[0] + 1}",
+        )
+        style = TableStyleInfo(
+            name="TableStyleMedium9",
+            showFirstColumn=False,
+            showLastColumn=False,
+            showRowStripes=True,
+            showColumnStripes=False,
+        )
+        table.tableStyleInfo = style
+        sheet.add_table(table)
 
     def write_xlsx(self):
         with pd.ExcelWriter(self.xlsx_filename) as writer:
-            model_frame = pd.DataFrame(self.model_stats)
+            model_frame = self.model_stats.to_frame()
             supported_model_frame = model_frame[
                 model_frame["Supported"] != False
             ].copy()
 
             # Remove "Supported" from the original columns
             supported_model_frame.drop(columns=["Supported"], inplace=True)
-            stat_names = [
-                key for key in self.model_stats[0].keys() if key != "Supported"
-            ]
+            stat_names = [key for key in model_frame.columns if key != "Supported"]
 
             TOTAL_STAT_KEYS = {
                 "MAC Count",
@@ -59,12 +101,11 @@ class ReportGenerator:
                 "bytes_stored",
             }
 
-            totals = {key: 0 for key in stat_names if key in TOTAL_STAT_KEYS}
-
-            for stat in self.model_stats:
-                for key in totals:
-                    if key in stat:
-                        totals[key] += stat[key]
+            totals = {
+                key: self.model_stats.total(key)
+                for key in stat_names
+                if key in TOTAL_STAT_KEYS
+            }
 
             totals = {key: (totals[key] if key in totals else "") for key in stat_names}
             totals.update({"Operator Name": "Total"})
@@ -82,10 +123,8 @@ class ReportGenerator:
             col_letter = column[0].column_letter
             sheet.column_dimensions[col_letter].width = 16
 
-        if len(supported_model_frame.columns) > 26:
-            table_model_stats_range = f"A1:{chr(64 + len(supported_model_frame.columns) // 26) + chr(65 + len(supported_model_frame.columns) % 26 - 1)}{supported_model_frame.shape[0] + 1}"
-        else:
-            table_model_stats_range = f"A1:{chr(65 + len(supported_model_frame.columns))}{supported_model_frame.shape[0] + 1}"
+        # The frame index is written as the first column
+        table_model_stats_range = f"A1:{get_column_letter(len(supported_model_frame.columns) + 1)}{supported_model_frame.shape[0] + 1}"
 
         table_ops_list = Table(displayName="ONNX_Ops_List", ref=table_model_stats_range)
         style = TableStyleInfo(
@@ -99,7 +138,7 @@ class ReportGenerator:
         sheet.add_table(table_ops_list)
 
         # Adding a new new sheet to summarize op_type
-        model_sheet_data = pd.DataFrame(self.model_stats)
+        model_sheet_data = model_frame
 
         for col in [
             "MAC Count",
@@ -118,8 +157,8 @@ class ReportGenerator:
                 model_sheet_data[col], errors="coerce"
             )
 
-        model_sheet_data["Supported"] = model_sheet_data["Supported"].apply(
-            lambda x: "TRUE" if x == 1 else "FALSE"
+        model_sheet_data["Supported"] = np.where(
+            model_sheet_data["Supported"], "TRUE", "FALSE"
         )
 
         ops_summary_frame = (
@@ -172,7 +211,7 @@ class ReportGenerator:
             col_letter = column[0].column_letter
             ops_sheet.column_dimensions[col_letter].width = 16
 
-        table_model_stats_range = f"A1:{chr(64 + len(ops_summary_frame.columns))}{ops_summary_frame.shape[0] + 1}"
+        table_model_stats_range = f"A1:{get_column_letter(len(ops_summary_frame.columns))}{ops_summary_frame.shape[0] + 1}"
 
         ops_summary_list = Table(
             displayName="Ops_Summary_List", ref=table_model_stats_range
@@ -187,4 +226,8 @@ class ReportGenerator:
         ops_summary_list.tableStyleInfo = style
         ops_sheet.add_table(ops_summary_list)
 
+        for title, rows in self.extra_sheets.items():
+            if rows:
+                self.add_sheet(workbook, title, rows)
+
         workbook.save(self.xlsx_filename)
@@ -0,0 +1,144 @@
+import copy
+from tensor_reader import TensorReader
+from sparsity import SparsityEngine
+from shape_sweep import dim_expression, fixed_dim
+
+
+class GraphIndex:
+    """
+    Built-once lookup tables over an ONNX graph so the handlers can resolve tensors by name in constant time
+    instead of scanning value_info/input/output/initializer for every tensor of every node
+
+    Attributes:
+    model (class):              The (shape-inferred) ONNX model being indexed
+    nodes (list):               graph.node in file order
+    value_info (dict):          Tensor name -> ValueInfoProto, looked up in value_info, input then output order
+    initializer (dict):         Tensor name -> initializer TensorProto
+    producer (dict):            Tensor name -> index of the node producing it
+    consumers (dict):           Tensor name -> list of indices of the nodes consuming it
+    graph_inputs (set):         Names of the model inputs
+    graph_outputs (set):        Names of the model outputs
+    tensor_reader (class):      Lazy access to the initializer data, including mmap'ed external data
+    sparsity_engine (class):    Chunked/sampled weight sparsity computation shared by all handlers (None skips sparsity)
+    symbolic_dims (bool):       Keep symbolic dims as sympy expressions instead of dropping them
+    dim_values (dict):          Symbolic dim name -> value the symbolic dims are evaluated at instead of dropping them
+                                (empty = dropped)
+    """
+
+    def __init__(self, model, base_dir="", sparsity_engine=None):
+        self.model = model
+        self.tensor_reader = TensorReader(base_dir)
+        self.sparsity_engine = sparsity_engine or SparsityEngine()
+        self.symbolic_dims = False
+        self.dim_values = {}
+        self.nodes = list(model.graph.node)
+        self.value_info = {}
+        self.initializer = {}
+        self.producer = {}
+        self.consumers = {}
+        self.graph_inputs = set()
+        self.graph_outputs = set()
+
+        self.build_tensor_maps()
+        self.build_node_maps()
+
+    def build_tensor_maps(self):
+        # The first match wins, in the same precedence the linear lookups used to have
+        for tensor in model_value_infos(self.model):
+            self.value_info.setdefault(tensor.name, tensor)
+
+        for initializer in self.model.graph.initializer:
+            self.initializer.setdefault(initializer.name, initializer)
+
+        self.graph_inputs = {tensor.name for tensor in self.model.graph.input}
+        self.graph_outputs = {tensor.name for tensor in self.model.graph.output}
+
+    def build_node_maps(self):
+        for i, node in enumerate(self.nodes):
+            for input_name in node.input:
+                if input_name:
+                    self.consumers.setdefault(input_name, []).append(i)
+            for output_name in node.output:
+                if output_name:
+                    self.producer[output_name] = i
+
+    def find_tensor(self, tensor_name):
+        """
+        Locating the target tensor from either value_info, input, or output
+        """
+        return self.value_info.get(tensor_name)
+
+    def get_shape(self, tensor):
+        """
+        Return the dims of a ValueInfoProto. Unknown and symbolic dims are dropped, unless symbolic_dims
+        is set in which case the dim_param is kept as a sympy expression over the symbolic dim names, or
+        dim_values is set in which case the dim_param is evaluated at these values
+        """
+        shape = []
+        for dim in tensor.type.tensor_type.shape.dim:
+            if dim.dim_value > 0:
+                shape.append(dim.dim_value)
+            elif self.symbolic_dims and dim.dim_param:
+                shape.append(dim_expression(dim.dim_param))
+            elif self.dim_values and dim.dim_param:
+                shape.append(fixed_dim(dim.dim_param, self.dim_values))
+        return shape
+
+    def symbolic_view(self):
+        """
+        A shallow copy sharing all lookup tables that yields symbolic dims and skips the weight sparsity
+        """
+        view = copy.copy(self)
+        view.symbolic_dims = True
+        view.sparsity_engine = None
+        return view
+
+    def fixed_view(self, dim_values):
+        """
+        A shallow copy sharing all lookup tables that evaluates the symbolic dims at other values
+        """
+        view = copy.copy(self)
+        view.dim_values = dim_values
+        return view
+
+    def find_initializer(self, tensor_name):
+        return self.initializer.get(tensor_name)
+
+    def get_initializer_array(self, tensor_name):
+        """
+        Return the initializer data as a numpy array, this is the only lookup that touches the weight bytes
+        """
+        initializer = self.initializer.get(tensor_name)
+        if initializer is None:
+            return None
+        return self.tensor_reader.get_array(initializer)
+
+    def is_initializer(self, tensor_name):
+        return tensor_name in self.initializer
+
+    def is_model_input(self, tensor_name):
+        return tensor_name in self.graph_inputs
+
+    def is_model_output(self, tensor_name):
+        return tensor_name in self.graph_outputs
+
+    def get_producer(self, tensor_name):
+        """
+        Return the node index producing the tensor, or None for model inputs and initializers
+        """
+        return self.producer.get(tensor_name)
+
+    def get_consumers(self, tensor_name):
+        """
+        Return the list of node indices consuming the tensor in file order
+        """
+        return self.consumers.get(tensor_name, [])
+
+
+def model_value_infos(model):
+    """
+    Iterate over all ValueInfoProto of the graph in value_info, input, output order
+    """
+    yield from model.graph.value_info
+    yield from model.graph.input
+    yield from model.graph.output
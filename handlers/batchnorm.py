@@ -5,20 +5,20 @@ import numpy as np
 
 @register_node_handler("BatchNormalization")
 class BatchNormNodeHandler:
-    def handle(self, model, node):
+    def handle(self, graph_index, node):
         """
         Handler for op_types "BatchNormalization"
 
         * Batch normalization is per-input feature map
 
         Args:
-            model (class):  Input ONNX model
-            node (class):   ONNX node
+            graph_index (class):    Indexed view of the input ONNX model
+            node (class):           ONNX node
 
         Returns:
             attributes (class): Node attributes
         """
-        attributes = NodeAttributes(model, node)
+        attributes = NodeAttributes(graph_index, node)
 
         # Calculating compute primitive
         attributes.count_mac = np.prod(attributes.input_dimension)
@@ -30,7 +30,9 @@ class BatchNormNodeHandler:
 
         # Add inputs could possibly contains coefficients
         for tensor_name in node.input:
-            if attributes.is_tensor_name_initializer(model, tensor_name):
-                attributes.weight_size += attributes.get_weight_size(model, tensor_name)
+            if attributes.is_tensor_name_initializer(graph_index, tensor_name):
+                attributes.weight_size += attributes.get_weight_size(
+                    graph_index, tensor_name
+                )
 
         return attributes
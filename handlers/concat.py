@@ -5,24 +5,26 @@ import numpy as np
 
 @register_node_handler("Concat")
 class ConcatNodeHandler:
-    def handle(self, model, node):
+    def handle(self, graph_index, node):
         """
         Handler for op_types "Concat".
 
         * This is a pure memory transfer op, there is no compute with it
 
         Args:
-            model (class):  Input ONNX model
-            node (class):   ONNX node
+            graph_index (class):    Indexed view of the input ONNX model
+            node (class):           ONNX node
 
         Returns:
             attributes (class): Node attributes
         """
-        attributes = NodeAttributes(model, node)
+        attributes = NodeAttributes(graph_index, node)
 
         # Add inputs could possibly contains coefficients
         for tensor_name in node.input:
-            if attributes.is_tensor_name_initializer(model, tensor_name):
-                attributes.weight_size += attributes.get_weight_size(model, tensor_name)
+            if attributes.is_tensor_name_initializer(graph_index, tensor_name):
+                attributes.weight_size += attributes.get_weight_size(
+                    graph_index, tensor_name
+                )
 
         return attributes
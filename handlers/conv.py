@@ -6,7 +6,7 @@ import numpy as np
 
 @register_node_handler("Conv")
 class ConvNodeHandler:
-    def handle(self, model, node):
+    def handle(self, graph_index, node):
         """
         Handler for op_types "Conv".
 
@@ -15,13 +15,13 @@ class ConvNodeHandler:
         * The weight size of Conv is made of W and, optional B that is the second and third input of the node
 
         Args:
-            model (class):  Input ONNX model
-            node (class):   ONNX node
+            graph_index (class):    Indexed view of the input ONNX model
+            node (class):           ONNX node
 
         Returns:
             attributes (class): Node attributes
         """
-        attributes = NodeAttributes(model, node)
+        attributes = NodeAttributes(graph_index, node)
 
         # Parsing the op-specific attributes
         attr = {
@@ -34,15 +34,17 @@ class ConvNodeHandler:
         attributes.strides = attr.get("strides")
 
         # For Conv the second input is W
-        attributes.sparsity = attributes.get_weight_sparsity(model, node.input[1])
+        attributes.sparsity = attributes.get_weight_sparsity(graph_index, node.input[1])
 
         # For Conv the weight includes W and B, however B is only optional
         if len(node.input) == 3:
             attributes.weight_size = attributes.get_weight_size(
-                model, node.input[1]
-            ) + attributes.get_weight_size(model, node.input[2])
+                graph_index, node.input[1]
+            ) + attributes.get_weight_size(graph_index, node.input[2])
         else:
-            attributes.weight_size = attributes.get_weight_size(model, node.input[1])
+            attributes.weight_size = attributes.get_weight_size(
+                graph_index, node.input[1]
+            )
 
         # Calculating compute primitive
         attributes.count_mac = (
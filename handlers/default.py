@@ -5,20 +5,20 @@ import numpy as np
 
 @register_node_handler("default")
 class DefaultHandler:
-    def handle(self, model, node):
+    def handle(self, graph_index, node):
         """
         Default handler for unsupported op_types.
         Returns a minimal attribute dictionary with op_type and node name.
 
         Args:
-            model (class):  Input ONNX model
-            node (class):   ONNX node
+            graph_index (class):    Indexed view of the input ONNX model
+            node (class):           ONNX node
 
         Returns:
             attributes (class): Node attributes
         """
         print(f"{node.name} has unsupported op_type [{node.op_type}]...")
 
-        attributes = NodeAttributes(model, node, support=False)
+        attributes = NodeAttributes(graph_index, node, support=False)
 
         return attributes
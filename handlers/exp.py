@@ -5,20 +5,20 @@ import numpy as np
 
 @register_node_handler("Exp")
 class ExpNodeHandler:
-    def handle(self, model, node):
+    def handle(self, graph_index, node):
         """
         Handler for op_types "Exp".
 
         * The op has EXP count of its input_dimension
 
         Args:
-            model (class):  Input ONNX model
-            node (class):   ONNX node
+            graph_index (class):    Indexed view of the input ONNX model
+            node (class):           ONNX node
 
         Returns:
             attributes (class): Node attributes
         """
-        attributes = NodeAttributes(model, node)
+        attributes = NodeAttributes(graph_index, node)
 
         # Calculating compute primitive
         attributes.count_exp = np.prod(attributes.input_dimension)
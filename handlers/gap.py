@@ -5,7 +5,7 @@ import numpy as np
 
 @register_node_handler("GlobalAveragePool")
 class GAPNodeHandler:
-    def handle(self, model, node):
+    def handle(self, graph_index, node):
         """
         Handler for op_types "GlobalAveragePool".
 
@@ -13,13 +13,13 @@ class GAPNodeHandler:
         * The op has DIV count of its output_dimension
 
         Args:
-            model (class):  Input ONNX model
-            node (class):   ONNX node
+            graph_index (class):    Indexed view of the input ONNX model
+            node (class):           ONNX node
 
         Returns:
             attributes (class): Node attributes
         """
-        attributes = NodeAttributes(model, node)
+        attributes = NodeAttributes(graph_index, node)
 
         # Calculating compute primitive
         attributes.count_alu = np.prod(attributes.input_dimension)
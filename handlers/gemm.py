@@ -6,7 +6,7 @@ import numpy as np
 
 @register_node_handler("Gemm")
 class GemmNodeHandler:
-    def handle(self, model, node):
+    def handle(self, graph_index, node):
         """
         Handler for op_types "Gemm".
 
@@ -14,13 +14,13 @@ class GemmNodeHandler:
         * The op has DIV count of its output_dimension
 
         Args:
-            model (class):  Input ONNX model
-            node (class):   ONNX node
+            graph_index (class):    Indexed view of the input ONNX model
+            node (class):           ONNX node
 
         Returns:
             attributes (class): Node attributes
         """
-        attributes = NodeAttributes(model, node)
+        attributes = NodeAttributes(graph_index, node)
 
         # Determine the "effective" diemsnion of matrix A and B
         attr = {
@@ -37,19 +37,19 @@ class GemmNodeHandler:
                 attributes.input_dimension[0][1],
             ]
 
-        B_dim = attributes.get_weight_shape(model, node.input[1])
+        B_dim = attributes.get_weight_shape(graph_index, node.input[1])
         if attr.get("transB") != None:
             actual_B_dim = [B_dim[1], B_dim[0]]
         else:
             actual_B_dim = [B_dim[0], B_dim[1]]
 
         # For Gemm the second input is B
-        attributes.sparsity = attributes.get_weight_sparsity(model, node.input[1])
+        attributes.sparsity = attributes.get_weight_sparsity(graph_index, node.input[1])
 
         # For Gemm the weight includes B and C
         attributes.weight_size = attributes.get_weight_size(
-            model, node.input[1]
-        ) + attributes.get_weight_size(model, node.input[2])
+            graph_index, node.input[1]
+        ) + attributes.get_weight_size(graph_index, node.input[2])
 
         # Calculating compute primitive
         attributes.count_mac = actual_A_dim[0] * actual_A_dim[1] * actual_B_dim[1]
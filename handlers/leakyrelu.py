@@ -5,20 +5,20 @@ import numpy as np
 
 @register_node_handler("LeakyRelu")
 class LeakyReluNodeHandler:
-    def handle(self, model, node):
+    def handle(self, graph_index, node):
         """
         Handler for op_types "Gemm".
 
         * The op has ALU count of its input_dimension * 2.5 (cmp/mul/assign instructions depend on its sign )
 
         Args:
-            model (class):  Input ONNX model
-            node (class):   ONNX node
+            graph_index (class):    Indexed view of the input ONNX model
+            node (class):           ONNX node
 
         Returns:
             attributes (class): Node attributes
         """
-        attributes = NodeAttributes(model, node)
+        attributes = NodeAttributes(graph_index, node)
 
         # Calculating compute primitive
         attributes.count_alu = np.prod(attributes.input_dimension) * 2.5
@@ -5,20 +5,20 @@ import numpy as np
 
 @register_node_handler("MaxPool")
 class MaxPoolNodeHandler:
-    def handle(self, model, node):
+    def handle(self, graph_index, node):
         """
         Handler for op_types "MaxPool".
 
         * The op has ALU count of its output_dimensionn (most processor should already have vector instructions to calculate max in single instruction)
 
         Args:
-            model (class):  Input ONNX model
-            node (class):   ONNX node
+            graph_index (class):    Indexed view of the input ONNX model
+            node (class):           ONNX node
 
         Returns:
             attributes (class): Node attributes
         """
-        attributes = NodeAttributes(model, node)
+        attributes = NodeAttributes(graph_index, node)
 
         # Calculating compute primitive
         attributes.count_alu = np.prod(attributes.output_dimension)
@@ -5,7 +5,7 @@ import numpy as np
 
 @register_node_handler("Mish")
 class MishNodeHandler:
-    def handle(self, model, node):
+    def handle(self, graph_index, node):
         """
         Handler for op_types "Mish". ( Mish(x) = x * tanh( ln(1+exp(x))) )
 
@@ -15,13 +15,13 @@ class MishNodeHandler:
         * The op has TRIG    count of its input_dimension (tanh)
 
         Args:
-            model (class):  Input ONNX model
-            node (class):   ONNX node
+            graph_index (class):    Indexed view of the input ONNX model
+            node (class):           ONNX node
 
         Returns:
             attributes (class): Node attributes
         """
-        attributes = NodeAttributes(model, node)
+        attributes = NodeAttributes(graph_index, node)
 
         # Calculating compute primitive
         attributes.count_alu = np.prod(attributes.input_dimension)
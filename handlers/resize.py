@@ -6,7 +6,7 @@ import onnx
 
 @register_node_handler("Resize")
 class ResizeNodeHandler:
-    def handle(self, model, node):
+    def handle(self, graph_index, node):
         """
         Handler for op_types "Resize".
 
@@ -17,13 +17,13 @@ class ResizeNodeHandler:
         * mode = "cubic":  ALU count is output_dimension * 109
 
         Args:
-            model (class):  Input ONNX model
-            node (class):   ONNX node
+            graph_index (class):    Indexed view of the input ONNX model
+            node (class):           ONNX node
 
         Returns:
             attributes (class): Node attributes
         """
-        attributes = NodeAttributes(model, node)
+        attributes = NodeAttributes(graph_index, node)
 
         # Determine the "effective" diemsnion of matrix A and B
         attr = {
@@ -41,7 +41,9 @@ class ResizeNodeHandler:
 
         # Add inputs could possibly contains coefficients
         for tensor_name in node.input:
-            if attributes.is_tensor_name_initializer(model, tensor_name):
-                attributes.weight_size += attributes.get_weight_size(model, tensor_name)
+            if attributes.is_tensor_name_initializer(graph_index, tensor_name):
+                attributes.weight_size += attributes.get_weight_size(
+                    graph_index, tensor_name
+                )
 
         return attributes
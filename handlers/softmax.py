@@ -6,7 +6,7 @@ import numpy as np
 
 @register_node_handler("Softmax")
 class SoftmaxNodeHandler:
-    def handle(self, model, node):
+    def handle(self, graph_index, node):
         """
         Handler for op_types "Softmax". ( Softmax = exp(x_n) / sum( exp(x_n) ) )
 
@@ -15,13 +15,13 @@ class SoftmaxNodeHandler:
         * The op has DIV count of its input_dimension on pre-defined axis
 
         Args:
-            model (class):  Input ONNX model
-            node (class):   ONNX node
+            graph_index (class):    Indexed view of the input ONNX model
+            node (class):           ONNX node
 
         Returns:
             attributes (class): Node attributes
         """
-        attributes = NodeAttributes(model, node)
+        attributes = NodeAttributes(graph_index, node)
 
         attr = {
             attr.name: onnx.helper.get_attribute_value(attr) for attr in node.attribute
@@ -5,20 +5,20 @@ import numpy as np
 
 @register_node_handler("Tanh")
 class TanhNodeHandler:
-    def handle(self, model, node):
+    def handle(self, graph_index, node):
         """
         Handler for op_types "Tanh"
 
         * The op has TRIG    count of its input_dimension (tanh)
 
         Args:
-            model (class):  Input ONNX model
-            node (class):   ONNX node
+            graph_index (class):    Indexed view of the input ONNX model
+            node (class):           ONNX node
 
         Returns:
             attributes (class): Node attributes
         """
-        attributes = NodeAttributes(model, node)
+        attributes = NodeAttributes(graph_index, node)
 
         # Calculating compute primitive
         attributes.count_trig = np.prod(attributes.input_dimension)
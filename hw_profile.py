@@ -0,0 +1,160 @@
+import json
+
+import numpy as np
+
+# Compute primitive -> per-node report column
+PRIMITIVE_COLUMNS = {
+    "MAC": "MAC Count",
+    "ALU": "ALU Count",
+    "EXP": "EXP Count",
+    "DIV": "DIV Count",
+    "TRIG": "TRIG Count",
+    "SQRT": "SQRT Count",
+}
+
+# Unit of the primitives a profile does not assign to one
+DEFAULT_UNIT = "core"
+
+
+def per_data_type(value, data_types, counts, description):
+    """
+    Per-node value of a profile entry that is either one number or a data type -> number dict ("default" for the
+    types not listed), given the "Data Type" column. Only the nodes with a non-zero count need a value
+
+    Returns:
+        numpy array: value per node
+    """
+    if not isinstance(value, dict):
+        return np.full(len(data_types), float(value))
+    types, inverse = np.unique(data_types.astype(str), return_inverse=True)
+    values = np.array(
+        [value.get(t, value.get("default", np.nan)) for t in types], dtype=float
+    )
+    per_node = values[inverse]
+    missing = np.isnan(per_node) & (counts > 0)
+    if missing.any():
+        raise ValueError(
+            f"No {description} for {', '.join(sorted(set(data_types[missing].astype(str))))}"
+        )
+    return per_node
+
+
+class HardwareProfile:
+    """
+    Throughput and bandwidth of the target, loaded from a JSON file:
+
+    {
+        "name": "npu",
+        "clock_mhz": 1000,
+        "throughput": {
+            "MAC": {"FLOAT": 256, "FLOAT16": 1024, "INT8": 2048},
+            "ALU": 256, "DIV": 16, "SQRT": 16,
+            "EXP": {"FLOAT": 16, "default": 32}, "TRIG": 16
+        },
+        "units": {"mac": ["MAC"], "vector": ["ALU", "DIV", "SQRT"], "sfu": ["EXP", "TRIG"]},
+        "dram_bandwidth_gbps": 16,
+        "sram_bandwidth_gbps": 256,
+        "dma_bandwidth_gbps": 8,
+        "dma_queues": 2
+    }
+
+    throughput is in primitive operations per cycle, either one rate or one per node data type ("default" for
+    the types not listed), a primitive missing from it takes no time. The primitives of a unit run one after
+    another, the units run in parallel, and the primitives not listed in units share one unit.
+    dram_bandwidth_gbps defaults to all the DMA queues together and dma_bandwidth_gbps to an equal share of the
+    DRAM bandwidth per queue. Without sram_bandwidth_gbps the local memory never limits the compute
+
+    Attributes:
+    name (str):                 Profile name
+    clock_hz (float):           Compute clock
+    throughput (dict):          Primitive -> operations per cycle, or data type -> operations per cycle
+    units (dict):               Unit -> primitives sharing it
+    dram_bandwidth (float):     DRAM bandwidth in bytes/s
+    sram_bandwidth (float):     Local memory bandwidth in bytes/s (or None)
+    dma_bandwidth (float):      Bandwidth of one DMA queue to DRAM in bytes/s
+    dma_queues (int):           Number of DMA transfers that run concurrently
+    """
+
+    def __init__(self, profile):
+        self.name = profile.get("name", "")
+        self.clock_hz = profile["clock_mhz"] * 1e6
+        self.throughput = profile.get("throughput", {})
+        for primitive in self.throughput:
+            if primitive not in PRIMITIVE_COLUMNS:
+                raise ValueError(
+                    f"Unknown compute primitive in the hardware profile: {primitive}"
+                )
+        self.units = {
+            unit: list(primitives)
+            for unit, primitives in profile.get("units", {}).items()
+        }
+        assigned = {
+            primitive for primitives in self.units.values() for primitive in primitives
+        }
+        unassigned = [
+            primitive for primitive in self.throughput if primitive not in assigned
+        ]
+        if unassigned:
+            self.units.setdefault(DEFAULT_UNIT, []).extend(unassigned)
+
+        self.dma_queues = profile.get("dma_queues", 1)
+        dram_gbps = profile.get("dram_bandwidth_gbps")
+        dma_gbps = profile.get("dma_bandwidth_gbps")
+        if dram_gbps is None and dma_gbps is None:
+            raise ValueError(
+                "The hardware profile needs dram_bandwidth_gbps or dma_bandwidth_gbps"
+            )
+        if dram_gbps is None:
+            dram_gbps = dma_gbps * self.dma_queues
+        if dma_gbps is None:
+            dma_gbps = dram_gbps / self.dma_queues
+        self.dram_bandwidth = dram_gbps * 1e9
+        self.dma_bandwidth = dma_gbps * 1e9
+        sram_gbps = profile.get("sram_bandwidth_gbps")
+        self.sram_bandwidth = sram_gbps * 1e9 if sram_gbps else None
+
+    @classmethod
+    def load(cls, filename):
+        with open(filename) as f:
+            return cls(json.load(f))
+
+    def unit_cycles(self, ops_attributes):
+        """
+        Cycles every unit is busy per node
+
+        Returns:
+            dict: unit -> numpy array of cycles per node
+        """
+        data_types = ops_attributes.column("Data Type")
+        cycles = {}
+        for unit, primitives in self.units.items():
+            cycles[unit] = np.zeros(len(ops_attributes))
+            for primitive in primitives:
+                if primitive not in self.throughput:
+                    continue
+                counts = ops_attributes.column(PRIMITIVE_COLUMNS[primitive])
+                rate = per_data_type(
+                    self.throughput[primitive],
+                    data_types,
+                    counts,
+                    f"{primitive} throughput in the hardware profile",
+                )
+                cycles[unit] += np.divide(
+                    counts, rate, out=np.zeros(len(counts)), where=counts > 0
+                )
+        return cycles
+
+    def compute_time(self, ops_attributes):
+        """
+        Compute time of every node in seconds, limited by its busiest unit
+
+        Returns:
+            numpy array: seconds per node
+        """
+        cycles = self.unit_cycles(ops_attributes)
+        if not cycles:
+            return np.zeros(len(ops_attributes))
+        return np.max(list(cycles.values()), axis=0) / self.clock_hz
+
+    def transfer_time(self, num_bytes):
+        return num_bytes / self.dma_bandwidth
@@ -0,0 +1,194 @@
+import hashlib
+from collections import deque
+
+import onnx
+
+# Per-node costs compared between the baseline and the new model in the delta report
+DELTA_STAT_KEYS = [
+    "MAC Count",
+    "ALU Count",
+    "EXP Count",
+    "DIV Count",
+    "TRIG Count",
+    "SQRT Count",
+    "Input Size (bytes)",
+    "Weight Size (bytes)",
+    "Output Size (bytes)",
+    "bytes_loaded",
+    "bytes_stored",
+]
+
+
+def initializer_digest(graph_index, initializer):
+    """
+    Hash of the initializer values: the raw bytes in the proto, the byte range of the external data file, or
+    the typed data fields
+    """
+    if graph_index.tensor_reader.is_external(initializer):
+        data = graph_index.tensor_reader.get_buffer(initializer)
+    elif initializer.raw_data:
+        data = initializer.raw_data
+    else:
+        data = onnx.numpy_helper.to_array(initializer).tobytes()
+    return hashlib.sha256(data).hexdigest()
+
+
+def tensor_signature(graph_index, tensor_name, digests):
+    """
+    digests caches the initializer hashes by name, an initializer shared by several nodes is hashed once
+    """
+    initializer = graph_index.find_initializer(tensor_name)
+    if initializer is not None:
+        if tensor_name not in digests:
+            digests[tensor_name] = initializer_digest(graph_index, initializer)
+        return (
+            "initializer",
+            initializer.data_type,
+            tuple(initializer.dims),
+            digests[tensor_name],
+        )
+
+    tensor = graph_index.find_tensor(tensor_name)
+    if tensor is None:
+        return None
+    tensor_type = tensor.type.tensor_type
+    return (
+        tensor_type.elem_type,
+        tuple(dim.dim_param or dim.dim_value for dim in tensor_type.shape.dim),
+    )
+
+
+def node_signature(graph_index, node, digests):
+    """
+    Everything the handlers read from a node: op_type, attributes, input/output shapes and weight values.
+    Tensor and node names are left out so renamed but otherwise identical nodes still match
+    """
+    return (
+        node.op_type,
+        tuple(attr.SerializeToString() for attr in node.attribute),
+        tuple(tensor_signature(graph_index, name, digests) for name in node.input),
+        tuple(tensor_signature(graph_index, name, digests) for name in node.output),
+    )
+
+
+class GraphDiff:
+    """
+    Match the nodes of a new model version against a previously analyzed baseline.
+
+    Nodes are matched by signature in file order, so only the unmatched nodes need their handlers re-run.
+    The signature covers the weight values, so a node whose weights changed is re-run for its sparsity
+
+    Attributes:
+    matches (list):             New node index -> matched baseline node index (None when changed/added)
+    removed (list):             Baseline node indices without a match in the new model
+    """
+
+    def __init__(self, baseline_index, graph_index):
+        baseline_nodes = {}
+        baseline_digests = {}
+        for i, node in enumerate(baseline_index.nodes):
+            signature = node_signature(baseline_index, node, baseline_digests)
+            baseline_nodes.setdefault(signature, deque()).append(i)
+
+        self.matches = []
+        digests = {}
+        for node in graph_index.nodes:
+            candidates = baseline_nodes.get(node_signature(graph_index, node, digests))
+            self.matches.append(candidates.popleft() if candidates else None)
+
+        matched = {i for i in self.matches if i is not None}
+        self.removed = [i for i in range(len(baseline_index.nodes)) if i not in matched]
+
+    def num_changed(self):
+        return sum(1 for i in self.matches if i is None)
+
+
+def same_tensor_state(baseline, model_stats, tensor_name):
+    return (
+        baseline.ref_count.get(tensor_name) == model_stats.ref_count.get(tensor_name)
+        and baseline.tensor_size.get(tensor_name)
+        == model_stats.tensor_size.get(tensor_name)
+        and baseline.graph_index.is_model_output(tensor_name)
+        == model_stats.graph_index.is_model_output(tensor_name)
+    )
+
+
+def first_affected_node(baseline, model_stats):
+    """
+    Index of the first node whose memory simulation can differ from the baseline.
+
+    The simulation state only depends on the nodes processed so far and their flush decisions, so it is
+    shared up to the first node that differs positionally (op, attributes, tensor names), touches a tensor
+    whose reference count, size or model-output status changed, or whose flush decision changed (it looks
+    at consumers further down the graph). The previous node is included to stay on the safe side
+    """
+    baseline_nodes = baseline.graph_index.nodes
+    nodes = model_stats.graph_index.nodes
+
+    for i in range(min(len(baseline_nodes), len(nodes))):
+        baseline_node = baseline_nodes[i]
+        node = nodes[i]
+        if (
+            baseline_node.op_type != node.op_type
+            or list(baseline_node.input) != list(node.input)
+            or list(baseline_node.output) != list(node.output)
+            or list(baseline_node.attribute) != list(node.attribute)
+            or baseline.chainable[i] != model_stats.chainable[i]
+        ):
+            return max(0, i - 1)
+        for tensor_name in list(node.input) + list(node.output):
+            if not same_tensor_state(baseline, model_stats, tensor_name):
+                return max(0, i - 1)
+
+    return max(0, min(len(baseline_nodes), len(nodes)) - 1)
+
+
+def delta_row(name, op_type, status, baseline_stats, new_stats):
+    row = {
+        "Operator Name": name,
+        "Op Type": op_type,
+        "Status": status,
+    }
+    for key in DELTA_STAT_KEYS:
+        baseline_value = baseline_stats.get(key, 0) if baseline_stats else 0
+        new_value = new_stats.get(key, 0) if new_stats else 0
+        row[f"{key} Delta"] = new_value - baseline_value
+    return row
+
+
+def build_delta_report(baseline, model_stats, graph_diff):
+    """
+    Per-node cost delta between the baseline and the new model.
+
+    Matched nodes are "Unchanged" (only the memory traffic can move), an unmatched node whose name exists
+    among the unmatched baseline nodes is "Changed", the remaining ones are "Added" and "Removed"
+    """
+    removed_by_name = {
+        baseline.graph_index.nodes[i].name: i for i in graph_diff.removed
+    }
+
+    delta_rows = []
+    for i, node in enumerate(model_stats.graph_index.nodes):
+        new_stats = model_stats.ops_attributes[i]
+        j = graph_diff.matches[i]
+        if j is not None:
+            status = "Unchanged"
+        elif node.name in removed_by_name:
+            j = removed_by_name.pop(node.name)
+            status = "Changed"
+        else:
+            status = "Added"
+        baseline_stats = baseline.ops_attributes[j] if j is not None else None
+        delta_rows.append(
+            delta_row(node.name, node.op_type, status, baseline_stats, new_stats)
+        )
+
+    for j in removed_by_name.values():
+        node = baseline.graph_index.nodes[j]
+        delta_rows.append(
+            delta_row(
+                node.name, node.op_type, "Removed", baseline.ops_attributes[j], None
+            )
+        )
+
+    return delta_rows
@@ -0,0 +1,64 @@
+import bisect
+import numpy as np
+
+
+class Liveness:
+    """
+    Tensor live ranges over the node DAG, built in one pass over the producer/consumer maps of the graph index.
+
+    A tensor is born at the node producing it (model inputs and initializers at their first consumer, when they
+    are loaded) and dies after its last consumer. Tensors nothing consumes die at their producer
+
+    Attributes:
+    num_nodes (int):            Number of nodes
+    birth (dict):               Tensor name -> index of the node it becomes live at
+    death (dict):               Tensor name -> index of the last node using it
+    uses (dict):                Tensor name -> indices of the nodes consuming it, in node order
+    """
+
+    def __init__(self, graph_index):
+        self.num_nodes = len(graph_index.nodes)
+        self.birth = {}
+        self.death = {}
+        self.uses = graph_index.consumers
+
+        for tensor_name, consumers in graph_index.consumers.items():
+            # Consumers are listed in node order
+            self.birth[tensor_name] = graph_index.producer.get(
+                tensor_name, consumers[0]
+            )
+            self.death[tensor_name] = consumers[-1]
+        for tensor_name, producer in graph_index.producer.items():
+            self.death.setdefault(tensor_name, producer)
+            self.birth.setdefault(tensor_name, producer)
+
+    def dies_at(self, tensor_name, i):
+        return self.death.get(tensor_name) == i
+
+    def next_use(self, tensor_name, i):
+        """
+        Index of the first node after node i consuming the tensor (None when it has no later use)
+        """
+        uses = self.uses.get(tensor_name, [])
+        k = bisect.bisect_right(uses, i)
+        return uses[k] if k < len(uses) else None
+
+    def remaining_uses(self, tensor_name, i):
+        uses = self.uses.get(tensor_name, [])
+        return len(uses) - bisect.bisect_right(uses, i)
+
+    def live_bytes(self, tensor_size):
+        """
+        Bytes of all the tensors live while each node runs, if nothing was ever flushed
+
+        Returns:
+            numpy array: live bytes per node index
+        """
+        names = list(self.birth)
+        sizes = np.array([tensor_size.get(name, 0) for name in names], dtype=np.float64)
+        births = np.fromiter((self.birth[name] for name in names), np.int64, len(names))
+        deaths = np.fromiter((self.death[name] for name in names), np.int64, len(names))
+
+        delta = np.bincount(births, weights=sizes, minlength=self.num_nodes + 1)
+        delta -= np.bincount(deaths + 1, weights=sizes, minlength=self.num_nodes + 1)
+        return np.cumsum(delta)[: self.num_nodes]
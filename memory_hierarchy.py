@@ -0,0 +1,339 @@
+import copy
+from collections import OrderedDict
+
+import pandas as pd
+
+from MemTracker import MemTracker
+
+SIZE_UNITS = {"": 1, "K": 1 << 10, "M": 1 << 20, "G": 1 << 30}
+EVICTION_POLICIES = ("lru", "belady", "refcount")
+
+
+def parse_size(size):
+    """
+    "256K", "4M", "1G" or a plain number of bytes
+    """
+    size = size.strip().upper().rstrip("B")
+    unit = size[-1] if size and size[-1] in SIZE_UNITS else ""
+    return int(float(size[: len(size) - len(unit)]) * SIZE_UNITS[unit])
+
+
+class MemoryLevel:
+    """
+    One on-chip level of the memory hierarchy, DRAM is always the implicit last level
+
+    Attributes:
+    name (str):                 Level name used in the report columns (e.g. L1)
+    capacity (int):             Capacity in bytes
+    policy (str):               Eviction policy: lru, belady or refcount
+    bandwidth (float):          Bandwidth to the next level down in GB/s (None when not given)
+    """
+
+    def __init__(self, name, capacity, policy="lru", bandwidth=None):
+        if policy not in EVICTION_POLICIES:
+            raise ValueError(
+                f"Unknown eviction policy {policy} for {name}, expected one of {EVICTION_POLICIES}"
+            )
+        self.name = name
+        self.capacity = capacity
+        self.policy = policy
+        self.bandwidth = bandwidth
+
+
+def parse_hierarchy(hierarchy_spec):
+    """
+    Parse "L1:256K:lru,L2:4M:belady:200" into MemoryLevels, closest to compute first.
+    Each level is name:capacity[:policy[:bandwidth in GB/s]]
+    """
+    levels = []
+    for entry in hierarchy_spec.split(","):
+        fields = entry.strip().split(":")
+        name, capacity = fields[0], parse_size(fields[1])
+        policy = fields[2] if len(fields) > 2 and fields[2] else "lru"
+        bandwidth = float(fields[3]) if len(fields) > 3 else None
+        levels.append(MemoryLevel(name, capacity, policy, bandwidth))
+    return levels
+
+
+def level_columns(levels):
+    """
+    Per-node report columns of the hierarchy simulation
+    """
+    return [
+        f"{level.name} {stat}"
+        for level in levels
+        for stat in ("bytes_loaded", "bytes_stored")
+    ]
+
+
+class HierarchyTracker(MemTracker):
+    """
+    MemTracker over N on-chip levels in front of DRAM.
+
+    Tensors are kept whole in the levels like MemTracker does. A level's bytes_loaded are the bytes filled into it
+    from the level below and its bytes_stored the bytes written back to the level below, so the last level's
+    traffic is the DRAM traffic reported as bytes_loaded/bytes_stored. Levels are inclusive: a tensor loaded from
+    L2 into L1 stays in L2, so only live tensors missing in every lower level are written back on eviction.
+    Tensors larger than a level stream through it. Outputs of a node that is not chainable are moved down one
+    level, which is the DRAM flush of MemTracker for a single level. Tensors used by the node being processed
+    are never evicted
+
+    Attributes:
+    levels (list):              MemoryLevel configurations, closest to compute first
+    resident (list):            Per level, tensor name -> size of the resident tensors, in least recently used order
+    level_footprint (list):     Per level, bytes currently resident
+    level_max_footprint (list): Per level, maximum bytes resident
+    level_bytes_loaded (list):  Per level, total bytes filled from the level below
+    level_bytes_stored (list):  Per level, total bytes written back to the level below
+    in_dram (set):              Tensors with an up-to-date copy in DRAM
+    """
+
+    def __init__(self, model, tensor_size, liveness, levels):
+        super().__init__(model, tensor_size, liveness, levels[0].capacity)
+        self.levels = levels
+        self.resident = [OrderedDict() for _ in levels]
+        self.level_footprint = [0] * len(levels)
+        self.level_max_footprint = [0] * len(levels)
+        self.level_bytes_loaded = [0] * len(levels)
+        self.level_bytes_stored = [0] * len(levels)
+        self.node_loaded = [0] * len(levels)
+        self.node_stored = [0] * len(levels)
+        self.pinned = set()
+
+        produced = {output for node in model.graph.node for output in node.output}
+        self.in_dram = {tensor for tensor in liveness.birth if tensor not in produced}
+
+    def choose_victim(self, level):
+        policy = self.levels[level].policy
+        candidates = (t for t in self.resident[level] if t not in self.pinned)
+        if policy == "lru":
+            return next(candidates, None)
+        if policy == "belady":
+            # Evict the tensor used the furthest in the future
+            def next_use(t):
+                use = self.liveness.next_use(t, self.node_index)
+                return float("inf") if use is None else use
+
+            return max(candidates, key=next_use, default=None)
+        # refcount: fewest remaining consumers first, least recently used among equals
+        return min(
+            candidates,
+            key=lambda t: self.liveness.remaining_uses(t, self.node_index),
+            default=None,
+        )
+
+    def is_clean_below(self, tensor, level):
+        return tensor in self.in_dram or any(
+            tensor in resident for resident in self.resident[level + 1 :]
+        )
+
+    def insert(self, level, tensor, size):
+        """
+        Make the tensor resident in the level, evicting others as needed.
+        Returns False when it can't fit and streams through the level instead
+        """
+        capacity = self.levels[level].capacity
+        if size > capacity:
+            return False
+        while self.level_footprint[level] + size > capacity:
+            victim = self.choose_victim(level)
+            if victim is None:
+                return False
+            self.evict(level, victim)
+
+        self.resident[level][tensor] = size
+        self.level_footprint[level] += size
+        self.level_max_footprint[level] = max(
+            self.level_max_footprint[level], self.level_footprint[level]
+        )
+        return True
+
+    def remove(self, level, tensor):
+        self.level_footprint[level] -= self.resident[level].pop(tensor)
+
+    def evict(self, level, tensor):
+        size = self.resident[level][tensor]
+        self.remove(level, tensor)
+        if self.liveness.death.get(tensor, -1) > self.node_index or (
+            tensor in self.graph_outputs
+        ):
+            if not self.is_clean_below(tensor, level):
+                self.write_down(level, tensor, size)
+
+    def write_down(self, level, tensor, size):
+        """
+        Write the tensor from the level to the next level down
+        """
+        self.node_stored[level] += size
+        if level + 1 == len(self.levels):
+            self.in_dram.add(tensor)
+        elif not self.insert(level + 1, tensor, size):
+            self.write_down(level + 1, tensor, size)
+
+    def find_level(self, tensor):
+        for level, resident in enumerate(self.resident):
+            if tensor in resident:
+                return level
+        return len(self.levels)
+
+    def process_node(self, node, next_node_chainable):
+        """
+        Simulate the node over the hierarchy
+
+        Returns the MemTracker per-node metrics for DRAM plus "level_bytes_loaded"/"level_bytes_stored" per level
+        """
+        self.node_loaded = [0] * len(self.levels)
+        self.node_stored = [0] * len(self.levels)
+        self.pinned = {t for t in list(node.input) + list(node.output) if t}
+
+        # 1. Load inputs into the first level, filling every level on the way
+        for input in dict.fromkeys(node.input):
+            if not input:
+                continue
+            size = self.tensor_size.get(input, 0)
+            found = self.find_level(input)
+            if found < len(self.levels):
+                self.resident[found].move_to_end(input)
+            for level in range(found - 1, -1, -1):
+                self.node_loaded[level] += size
+                self.insert(level, input, size)
+
+        # 2. Allocate outputs in the first level
+        for output in node.output:
+            if output:
+                size = self.tensor_size.get(output, 0)
+                if not self.insert(0, output, size):
+                    self.write_down(0, output, size)
+        footprint = self.level_footprint[0]
+
+        # 3. Outputs that can't stay in the first level until their consumers move one level down
+        if not next_node_chainable:
+            for output in node.output:
+                if output in self.resident[0]:
+                    size = self.resident[0][output]
+                    self.remove(0, output)
+                    if (
+                        not self.liveness.dies_at(output, self.node_index)
+                        or output in self.graph_outputs
+                    ):
+                        self.write_down(0, output, size)
+
+        # 4. Free the tensors whose last use is this node, model outputs are stored to DRAM first
+        for tensor in dict.fromkeys(list(node.input) + list(node.output)):
+            if tensor and self.liveness.dies_at(tensor, self.node_index):
+                self.release(tensor)
+
+        self.pinned = set()
+        self.node_index += 1
+
+        for level in range(len(self.levels)):
+            self.level_bytes_loaded[level] += self.node_loaded[level]
+            self.level_bytes_stored[level] += self.node_stored[level]
+        bytes_loaded = self.node_loaded[-1]
+        bytes_stored = self.node_stored[-1]
+        self.bytes_loaded_total += bytes_loaded
+        self.bytes_stored_total += bytes_stored
+        self.max_footprint = self.level_max_footprint[0]
+        self.current_footprint = self.level_footprint[0]
+
+        return {
+            "bytes_loaded": bytes_loaded,
+            "bytes_stored": bytes_stored,
+            "footprint": footprint,
+            "max_footprint": self.max_footprint,
+            "next_node_chainable": next_node_chainable,
+            "level_bytes_loaded": self.node_loaded,
+            "level_bytes_stored": self.node_stored,
+        }
+
+    def release(self, tensor):
+        found = self.find_level(tensor)
+        if tensor in self.graph_outputs and tensor not in self.in_dram:
+            size = self.tensor_size.get(tensor, 0)
+            for level in range(found, len(self.levels)):
+                self.node_stored[level] += size
+            self.in_dram.add(tensor)
+        for level, resident in enumerate(self.resident):
+            if tensor in resident:
+                self.remove(level, tensor)
+
+    def get_state(self):
+        state = super().get_state()
+        state.update(
+            copy.deepcopy(
+                {
+                    "resident": self.resident,
+                    "level_footprint": self.level_footprint,
+                    "level_max_footprint": self.level_max_footprint,
+                    "level_bytes_loaded": self.level_bytes_loaded,
+                    "level_bytes_stored": self.level_bytes_stored,
+                    "in_dram": self.in_dram,
+                }
+            )
+        )
+        return state
+
+    def resume(self, state):
+        super().resume(state)
+        for key in (
+            "resident",
+            "level_footprint",
+            "level_max_footprint",
+            "level_bytes_loaded",
+            "level_bytes_stored",
+            "in_dram",
+        ):
+            setattr(self, key, copy.deepcopy(state[key]))
+
+    def finalize(self):
+        """
+        Store the model outputs still on chip, returns the MemTracker summary plus the per-level totals
+        """
+        self.node_loaded = [0] * len(self.levels)
+        self.node_stored = [0] * len(self.levels)
+        for output in self.graph_outputs:
+            if output in self.liveness.birth:
+                self.release(output)
+        for level in range(len(self.levels)):
+            self.level_bytes_stored[level] += self.node_stored[level]
+        self.bytes_stored_total += self.node_stored[-1]
+
+        levels = {}
+        for i, level in enumerate(self.levels):
+            levels[level.name] = {
+                "bytes_loaded": self.level_bytes_loaded[i],
+                "bytes_stored": self.level_bytes_stored[i],
+                "max_footprint": self.level_max_footprint[i],
+            }
+            if level.bandwidth:
+                levels[level.name]["transfer_time_us"] = (
+                    (self.level_bytes_loaded[i] + self.level_bytes_stored[i])
+                    / (level.bandwidth * 1e9)
+                    * 1e6
+                )
+
+        return {
+            "bytes_stored_final": self.node_stored[-1],
+            "final_footprint": self.level_footprint[0],
+            "max_footprint": self.level_max_footprint[0],
+            "total_bytes_loaded": self.bytes_loaded_total,
+            "total_bytes_stored": self.bytes_stored_total,
+            "levels": levels,
+        }
+
+
+def hierarchy_rows(ops_attributes, levels):
+    """
+    Per op type sums of the per-level traffic for the report
+    """
+    columns = level_columns(levels)
+    frame = pd.DataFrame(
+        {
+            "Op Type": ops_attributes.column("Op Type"),
+            **{column: ops_attributes.column(column) for column in columns},
+        }
+    )
+    summary = frame.groupby("Op Type", sort=True)[columns].sum()
+    summary.insert(0, "Operator Count", frame.groupby("Op Type", sort=True).size())
+    summary.loc["Total"] = summary.sum()
+    return summary.reset_index().to_dict("records")
@@ -0,0 +1,134 @@
+import numpy as np
+import pandas as pd
+from openpyxl import Workbook
+from openpyxl.chart import ScatterChart, Reference, Series
+from openpyxl.utils import get_column_letter
+
+from MemTracker import MemTracker
+from memory_hierarchy import parse_size
+from reuse import reuse_traffic
+
+
+def parse_sweep_range(sweep_spec):
+    """
+    Expand "start:stop:step" (e.g. "256K:8M:256K") into the local memory sizes in bytes, stop included
+    """
+    start, stop, step = (parse_size(field) for field in sweep_spec.split(":"))
+    if step <= 0:
+        raise ValueError(f"The memory sweep step must be positive: {sweep_spec}")
+    if start > stop:
+        raise ValueError(
+            f"The memory sweep start must not be larger than its stop: {sweep_spec}"
+        )
+    return list(range(start, stop + 1, step))
+
+
+class MemorySweep:
+    """
+    DRAM traffic and footprint of the MemTracker simulation over a range of local memory sizes, on one parsed
+    model.
+
+    The local memory size only enters the simulation through the chaining decisions: a node whose consumers are
+    not all chainable ops keeps its outputs local once the size reaches the bytes live at the node. The curve is
+    a step function with breakpoints at those live bytes, so the simulation runs once per step hit by the sweep
+    instead of once per size, and the breakpoints inside the range are added to the curve.
+    --recompute applies to every simulation. The --reuse loop-nest re-reads depend on the size itself, they
+    are evaluated at every size of the curve and added to its traffic
+
+    Attributes:
+    capacities (list):          Swept local memory sizes in bytes
+    breakpoints (array):        Sizes at which a node becomes chainable, in increasing order
+    breakpoint_capacities (set): Sizes added to the curve for the breakpoints inside the range
+    rows (list):                Per size: capacity, whether it is a breakpoint, DRAM traffic and max footprint
+    num_simulations (int):      Number of MemTracker runs
+    """
+
+    def __init__(self, model_stats, sweep_spec):
+        self.capacities = parse_sweep_range(sweep_spec)
+        thresholds = model_stats.chaining_thresholds(model_stats.tensor_size)
+        self.breakpoints = np.unique(
+            thresholds[np.isfinite(thresholds) & (thresholds > 0)]
+        )
+
+        low, high = self.capacities[0], self.capacities[-1]
+        in_range = self.breakpoints[
+            (self.breakpoints >= low) & (self.breakpoints <= high)
+        ]
+        self.breakpoint_capacities = {int(b) for b in np.ceil(in_range)}
+        capacities = sorted(set(self.capacities) | self.breakpoint_capacities)
+        node_ops = model_stats.node_ops() if model_stats.recompute else None
+
+        self.rows = []
+        summaries = {}
+        for capacity in capacities:
+            step = int(np.searchsorted(self.breakpoints, capacity, side="right"))
+            if step not in summaries:
+                summaries[step] = self.simulate(
+                    model_stats, thresholds, capacity, node_ops
+                )
+            summary = summaries[step]
+            bytes_loaded = summary["total_bytes_loaded"]
+            bytes_stored = summary["total_bytes_stored"]
+            if model_stats.reuse:
+                extra_loaded, extra_stored = reuse_traffic(
+                    model_stats.graph_index, model_stats.tensor_size, capacity
+                )
+                bytes_loaded += extra_loaded
+                bytes_stored += extra_stored
+            row = {
+                "Local Memory (bytes)": capacity,
+                "Breakpoint": capacity in self.breakpoint_capacities,
+                "bytes_loaded": bytes_loaded,
+                "bytes_stored": bytes_stored,
+                "DRAM bytes": bytes_loaded + bytes_stored,
+                "Max SRAM footprint": summary["max_footprint"],
+            }
+            if model_stats.recompute:
+                row["Spill bytes saved"] = summary["total_bytes_saved"]
+            self.rows.append(row)
+        self.num_simulations = len(summaries)
+
+    def simulate(self, model_stats, thresholds, capacity, node_ops):
+        mem_tracker = MemTracker(
+            model_stats.model,
+            model_stats.tensor_size,
+            model_stats.liveness,
+            capacity / (1024 * 1024),
+        )
+        if node_ops is not None:
+            mem_tracker.enable_recompute(node_ops, model_stats.recompute)
+        for node, threshold in zip(model_stats.model.graph.node, thresholds):
+            mem_tracker.process_node(node, bool(capacity >= threshold))
+        return mem_tracker.finalize()
+
+    def write_csv(self, csv_filename):
+        pd.DataFrame(self.rows).to_csv(csv_filename, index=False)
+
+    def write_chart(self, xlsx_filename):
+        """
+        Write the curve with a DRAM bytes / footprint vs local memory size chart
+        """
+        workbook = Workbook()
+        sheet = workbook.active
+        sheet.title = "Memory Sweep"
+        columns = list(self.rows[0])
+        sheet.append(columns)
+        for row in self.rows:
+            sheet.append([row[column] for column in columns])
+        for column in sheet.columns:
+            sheet.column_dimensions[column[0].column_letter].width = 20
+
+        chart = ScatterChart()
+        chart.title = "DRAM traffic vs local memory size"
+        chart.style = 13
+        chart.x_axis.title = "Local Memory (bytes)"
+        chart.y_axis.title = "Bytes"
+        capacities = Reference(sheet, min_col=1, min_row=2, max_row=len(self.rows) + 1)
+        for column in ("DRAM bytes", "Max SRAM footprint"):
+            col = columns.index(column) + 1
+            values = Reference(
+                sheet, min_col=col, min_row=1, max_row=len(self.rows) + 1
+            )
+            chart.series.append(Series(values, capacities, title_from_data=True))
+        sheet.add_chart(chart, f"{get_column_letter(len(columns) + 2)}2")
+        workbook.save(xlsx_filename)
@@ -2,6 +2,8 @@ import argparse
 import onnx
 
 from onnx_analysis import ModelStats
+from analysis_cache import DEFAULT_CACHE_DIR
+from fusion import FUSION_RULES
 
 
 def main():
@@ -10,6 +12,23 @@ def main():
     parser.add_argument(
         "--input", "-i", type=str, required=True, help="Input ONNX model filename"
     )
+    add_analysis_arguments(parser)
+
+    args = parser.parse_args()
+
+    print_args(args)
+
+    model_stats = ModelStats(args)
+    if args.report == True:
+        model_stats.generate_report()
+    if args.save == True:
+        model_stats.save_model()
+
+
+def add_analysis_arguments(parser):
+    """
+    The ModelStats options shared by model_analyzer.py and batch_analyzer.py
+    """
     parser.add_argument(
         "--memory",
         "-m",
@@ -18,6 +37,13 @@ def main():
         required=False,
         help="Local memory size (in MBytes)",
     )
+    parser.add_argument(
+        "--hierarchy",
+        type=str,
+        default=None,
+        required=False,
+        help='Simulate on-chip memory levels in front of DRAM instead of the single local memory, closest to compute first, e.g. "L1:256K:lru,L2:4M:belady:200" (name:capacity[:lru|belady|refcount[:bandwidth GB/s]])',
+    )
     parser.add_argument(
         "--report",
         "-r",
@@ -32,6 +58,186 @@ def main():
         required=False,
         help="Saved processed onnx model",
     )
+    parser.add_argument(
+        "--mmap",
+        action="store_true",
+        required=False,
+        help="Memory-map external weight data instead of loading it into RAM (for >2GB models)",
+    )
+    parser.add_argument(
+        "--sparsity-sample",
+        type=int,
+        default=0,
+        required=False,
+        help="Estimate weight sparsity from N sampled elements for weights larger than N (default: exact)",
+    )
+    parser.add_argument(
+        "--jobs",
+        "-j",
+        type=int,
+        default=1,
+        required=False,
+        help="Number of processes used to analyze the nodes",
+    )
+    parser.add_argument(
+        "--cache",
+        "-c",
+        action="store_true",
+        required=False,
+        help="Reuse cached shape inference and node analysis across runs",
+    )
+    parser.add_argument(
+        "--cache-dir",
+        type=str,
+        default=DEFAULT_CACHE_DIR,
+        required=False,
+        help="Analysis cache directory",
+    )
+    parser.add_argument(
+        "--cache-size",
+        type=int,
+        default=1024,
+        required=False,
+        help="Analysis cache size limit (in MBytes)",
+    )
+    parser.add_argument(
+        "--baseline",
+        "-b",
+        type=str,
+        default=None,
+        required=False,
+        help="Previously analyzed version of the model, only the changed nodes are re-analyzed",
+    )
+    parser.add_argument(
+        "--shape-sweep",
+        type=str,
+        default=None,
+        required=False,
+        help='Evaluate the costs over a grid of symbolic dims, e.g. "batch=1,2,4;seq_len=128,256", '
+        "the per-node analysis is at the first grid point",
+    )
+    parser.add_argument(
+        "--schedule",
+        type=str,
+        choices=["peak", "spill"],
+        default=None,
+        required=False,
+        help="Search a node order minimizing the peak local memory footprint or the DRAM traffic",
+    )
+    parser.add_argument(
+        "--schedule-exact",
+        type=int,
+        default=0,
+        required=False,
+        help="Reorder windows of up to N nodes of the scheduled order optimally (exact DP, N <= 20)",
+    )
+    parser.add_argument(
+        "--memory-sweep",
+        type=str,
+        default=None,
+        required=False,
+        help='Simulate a range of local memory sizes in one run, "start:stop:step" e.g. "256K:8M:256K" (plain numbers are bytes), '
+        "with --recompute and --reuse applied at every size",
+    )
+    parser.add_argument(
+        "--recompute",
+        type=float,
+        default=0,
+        required=False,
+        help="Recompute flushed tensors instead of spilling them to DRAM when cheaper, given the number of primitive ops that take as long as moving one DRAM byte (default: always spill)",
+    )
+    parser.add_argument(
+        "--fusion-rules",
+        type=str,
+        choices=sorted(FUSION_RULES),
+        default="chainable",
+        required=False,
+        help="Rule set grouping the nodes into the fusion segments of the report",
+    )
+    parser.add_argument(
+        "--reuse",
+        action="store_true",
+        required=False,
+        help="Add the operand re-reads of the best Conv/Gemm/MatMul loop order and blocking for the local memory size "
+        "to bytes_loaded (needs --memory or --hierarchy)",
+    )
+    parser.add_argument(
+        "--tiling",
+        action="store_true",
+        required=False,
+        help="Search the spatial/channel tiling of every fused segment (e.g. Conv->Relu->Conv) for the local memory size",
+    )
+    parser.add_argument(
+        "--arena",
+        type=str,
+        choices=["size", "breadth", "coloring", "all"],
+        default=None,
+        required=False,
+        help="Assign a static arena offset to every intermediate tensor (all: keep the smallest arena)",
+    )
+    parser.add_argument(
+        "--arena-align",
+        type=int,
+        default=64,
+        required=False,
+        help="Arena offset and size alignment (in bytes)",
+    )
+    parser.add_argument(
+        "--arena-json",
+        type=str,
+        default=None,
+        required=False,
+        help="Export the arena plan as JSON",
+    )
+    parser.add_argument(
+        "--hw-profile",
+        type=str,
+        default=None,
+        required=False,
+        help="Hardware profile JSON (clock, per-primitive/per-dtype throughput, units, memory bandwidths, DMA queues), estimates the roofline latency and simulates the compute/DMA timeline",
+    )
+    parser.add_argument(
+        "--timeline-json",
+        type=str,
+        default=None,
+        required=False,
+        help="Export the compute/DMA timeline as a Chrome trace (chrome://tracing, Perfetto)",
+    )
+    parser.add_argument(
+        "--cores",
+        type=int,
+        default=0,
+        required=False,
+        help="List-schedule the DAG on N cores and report the critical path, makespan, utilization and speedup over 1, 2, 4, ... N cores",
+    )
+    parser.add_argument(
+        "--pipeline",
+        type=int,
+        default=0,
+        required=False,
+        help="Split the model into K contiguous pipeline stages balancing their cost with the fewest bytes across the cuts, and write each stage as an ONNX model",
+    )
+    parser.add_argument(
+        "--stage-memory",
+        type=str,
+        default=None,
+        required=False,
+        help='Weight memory of one pipeline stage, e.g. "512M" (plain numbers are bytes)',
+    )
+    parser.add_argument(
+        "--placement",
+        type=str,
+        default=None,
+        required=False,
+        help="Placement config JSON (host and accelerator hardware profiles, accelerator op types, link bandwidth), places every node on the host or the accelerator minimizing the latency with the transfers",
+    )
+    parser.add_argument(
+        "--energy",
+        type=str,
+        default=None,
+        required=False,
+        help="Energy model JSON (pJ per primitive per dtype, pJ per SRAM/DRAM byte), adds the per-node, per-op-type and per-inference energy",
+    )
     parser.add_argument(
         "--verbose",
         "-v",
@@ -40,16 +246,6 @@ def main():
         help="Verbose output for debugging purposes",
     )
 
-    args = parser.parse_args()
-
-    print_args(args)
-
-    model_stats = ModelStats(args)
-    if args.report == True:
-        model_stats.generate_report()
-    if args.save == True:
-        model_stats.save_model()
-
 
 def print_args(args):
     print("Input arguments:")
@@ -0,0 +1,156 @@
+import heapq
+
+import numpy as np
+
+
+def core_counts(max_cores):
+    """
+    1, 2, 4, ... cores up to max_cores, max_cores included
+    """
+    counts = [1 << k for k in range(max_cores.bit_length()) if 1 << k < max_cores]
+    return counts + [max_cores]
+
+
+class CoreSchedule:
+    """
+    List schedule of the DAG on identical cores, the ready node with the longest path to the end of the model
+    (its bottom level) runs first on the core that frees up first, once its producers have finished. The cores
+    share the memory, so the tensors cost nothing to move between them
+
+    Attributes:
+    cores (int):                Number of cores
+    core (array):               Core of every node
+    start (array):              Start time of every node
+    end (array):                End time of every node
+    makespan (float):           End of the last node
+    busy (array):               Time every core computes
+    """
+
+    def __init__(self, dag, cores):
+        num_nodes = len(dag.cost)
+        self.cores = cores
+        self.core = np.zeros(num_nodes, dtype=np.int64)
+        self.start = np.zeros(num_nodes)
+        self.end = np.zeros(num_nodes)
+        self.busy = np.zeros(cores)
+
+        waiting = [len(producers) for producers in dag.producers]
+        data_ready = np.zeros(num_nodes)
+        ready = [(-dag.bottom_level[i], i) for i in range(num_nodes) if not waiting[i]]
+        heapq.heapify(ready)
+        core_free = [(0.0, core) for core in range(cores)]
+        while ready:
+            _, i = heapq.heappop(ready)
+            free, core = heapq.heappop(core_free)
+            self.core[i] = core
+            self.start[i] = max(free, data_ready[i])
+            self.end[i] = self.start[i] + dag.cost[i]
+            self.busy[core] += dag.cost[i]
+            heapq.heappush(core_free, (self.end[i], core))
+            for j in dag.consumers[i]:
+                data_ready[j] = max(data_ready[j], self.end[i])
+                waiting[j] -= 1
+                if not waiting[j]:
+                    heapq.heappush(ready, (-dag.bottom_level[j], j))
+        self.makespan = float(self.end.max(initial=0))
+
+    def utilization(self):
+        return (
+            float(self.busy.sum() / (self.cores * self.makespan))
+            if self.makespan
+            else 0.0
+        )
+
+
+class MultiCore:
+    """
+    Critical path and multi-core list schedules of the DAG for per-node costs (latency or operation counts).
+
+    The critical path is the chain of producers and consumers with the highest total cost, no number of cores
+    runs the model faster. The schedule on the requested number of cores is kept per node, and the model is also
+    scheduled on 1, 2, 4, ... cores to show how the speedup over running the nodes one after another scales
+
+    Attributes:
+    names (list):               Node names
+    cost (array):               Cost of every node
+    producers (list):           Producer node indices of every node
+    consumers (list):           Consumer node indices of every node
+    bottom_level (array):       Cost of the longest path from every node to the end of the model, node included
+    critical_path (list):       Node indices on the critical path in execution order
+    serial (float):             Total cost, the makespan on one core
+    schedule (Class):           CoreSchedule on the requested number of cores
+    scaling (list):             CoreSchedule for every core count up to the requested one
+    """
+
+    def __init__(self, graph_index, cost, cores):
+        num_nodes = len(graph_index.nodes)
+        self.names = [node.name for node in graph_index.nodes]
+        self.cost = np.asarray(cost, dtype=np.float64)
+        self.producers = [
+            sorted(
+                {
+                    graph_index.producer[t]
+                    for t in node.input
+                    if t in graph_index.producer
+                }
+            )
+            for node in graph_index.nodes
+        ]
+        self.consumers = [[] for _ in range(num_nodes)]
+        for i, producers in enumerate(self.producers):
+            for j in producers:
+                self.consumers[j].append(i)
+
+        # The nodes are in topological order, so the consumers come after their producers
+        self.bottom_level = self.cost.copy()
+        next_on_path = [None] * num_nodes
+        for i in range(num_nodes - 1, -1, -1):
+            if self.consumers[i]:
+                j = max(self.consumers[i], key=lambda j: self.bottom_level[j])
+                self.bottom_level[i] += self.bottom_level[j]
+                next_on_path[i] = j
+
+        self.critical_path = []
+        i = int(np.argmax(self.bottom_level)) if num_nodes else None
+        while i is not None:
+            self.critical_path.append(i)
+            i = next_on_path[i]
+        self.serial = float(self.cost.sum())
+        self.scaling = [CoreSchedule(self, count) for count in core_counts(cores)]
+        self.schedule = self.scaling[-1]
+
+    def critical_path_cost(self):
+        return float(self.cost[self.critical_path].sum())
+
+    def speedup(self, schedule):
+        return self.serial / schedule.makespan if schedule.makespan else 1.0
+
+    def max_speedup(self):
+        critical = self.critical_path_cost()
+        return self.serial / critical if critical else 1.0
+
+    def rows(self, unit):
+        on_path = set(self.critical_path)
+        return [
+            {
+                "Operator Name": name,
+                "Core": int(self.schedule.core[i]),
+                f"Start ({unit})": self.schedule.start[i],
+                f"End ({unit})": self.schedule.end[i],
+                f"Cost ({unit})": self.cost[i],
+                f"Bottom Level ({unit})": self.bottom_level[i],
+                "Critical Path": i in on_path,
+            }
+            for i, name in enumerate(self.names)
+        ]
+
+    def scaling_rows(self, unit):
+        return [
+            {
+                "Cores": schedule.cores,
+                f"Makespan ({unit})": schedule.makespan,
+                "Speedup": self.speedup(schedule),
+                "Utilization": schedule.utilization(),
+            }
+            for schedule in self.scaling
+        ]
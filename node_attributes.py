@@ -52,6 +52,7 @@ class NodeAttributes:
     weight_size (int):          Weight data bytes
     output_size (int):          Output data bytes
     sparsity (float):           The sparsity of the weight (when applicable)
+    sparsity_bound (float):     The 95% confidence half-width when the sparsity is estimated from samples
     count_mac (int):            Compute primitive count - Multiply-Accumulate
     count_alu (int):            Compute primitive count - ALU
     count_exp (int):            Compute primitive count - Exponent and Logarithm
@@ -65,18 +66,45 @@ class NodeAttributes:
     strides (int):              Convolution attributes - strides
     """
 
-    def __init__(self, model, node, support=True):
+    __slots__ = (
+        "node_op_type",
+        "node_data_type",
+        "support",
+        "node_name",
+        "input_dimension",
+        "output_dimension",
+        "input_size",
+        "weight_size",
+        "output_size",
+        "sparsity",
+        "sparsity_bound",
+        "count_mac",
+        "count_alu",
+        "count_exp",
+        "count_div",
+        "count_trig",
+        "count_sqrt",
+        "dilations",
+        "group",
+        "kernel_shape",
+        "pads",
+        "strides",
+        "resize_mode",
+    )
+
+    def __init__(self, graph_index, node, support=True):
         if support == True:
             self.node_op_type = node.op_type
-            self.node_data_type = self.get_tensor_type(model, node.input)
+            self.node_data_type = self.get_tensor_type(graph_index, node.input)
             self.support = True
             self.node_name = node.name
-            self.input_dimension = self.get_input_shape(model, node)
-            self.output_dimension = self.get_output_shape(model, node)
+            self.input_dimension = self.get_input_shape(graph_index, node)
+            self.output_dimension = self.get_output_shape(graph_index, node)
             self.input_size = self.get_input_size()
             self.weight_size = 0
             self.output_size = self.get_output_size()
             self.sparsity = 0
+            self.sparsity_bound = 0
             # Tracking the primitive of operations
             self.count_mac = 0
             self.count_alu = 0
@@ -103,6 +131,7 @@ class NodeAttributes:
             self.weight_size = 0
             self.output_size = 0
             self.sparsity = 0
+            self.sparsity_bound = 0
             # Tracking the primitive of operations
             self.count_mac = 0
             self.count_alu = 0
@@ -119,45 +148,31 @@ class NodeAttributes:
             # Resize-specific attributes
             self.resize_mode = None
 
-    def is_tensor_name_initializer(self, model, tensor_name):
-        initializers = model.graph.initializer
+    def is_tensor_name_initializer(self, graph_index, tensor_name):
+        return graph_index.is_initializer(tensor_name)
 
-        for initializer in initializers:
-            if initializer.name == tensor_name:
-                return True
-        return False
+    def get_weight_sparsity(self, graph_index, tensor_name):
+        # Cost-only passes (e.g. the symbolic shape sweep) don't evaluate the sparsity
+        if graph_index.sparsity_engine is None:
+            return -1
 
-    def get_weight_sparsity(self, model, tensor_name):
-        initializers = model.graph.initializer
+        weight_tensor = graph_index.get_initializer_array(tensor_name)
 
-        weight_tensor = None
-        for initializer in initializers:
-            if initializer.name == tensor_name:
-                weight_tensor = initializer
-                break
-
-        if weight_tensor:
-            weight_tensor = onnx.numpy_helper.to_array(weight_tensor)
-            num_elements = np.prod(weight_tensor.shape)
-            num_zeros = np.sum(weight_tensor == 0)
-            sparsity = num_zeros / num_elements * 100
+        if weight_tensor is not None:
+            sparsity, self.sparsity_bound = graph_index.sparsity_engine.compute(
+                weight_tensor
+            )
         else:
             sparsity = -1
 
         return sparsity
 
-    def get_weight_size(self, model, tensor_name):
-        initializers = model.graph.initializer
-
-        weight_tensor = None
-        for initializer in initializers:
-            if initializer.name == tensor_name:
-                weight_tensor = initializer
-                break
+    def get_weight_size(self, graph_index, tensor_name):
+        weight_tensor = graph_index.find_initializer(tensor_name)
 
+        # The element count is in the TensorProto header, no need to decode the data
         if weight_tensor:
-            weight_tensor = onnx.numpy_helper.to_array(weight_tensor)
-            num_elements = np.prod(weight_tensor.shape)
+            num_elements = np.prod(tuple(weight_tensor.dims))
         else:
             num_elements = 0
 
@@ -165,18 +180,11 @@ class NodeAttributes:
             onnx_dtype_map[self.node_data_type], 0
         )
 
-    def get_weight_shape(self, model, tensor_name):
-        initializers = model.graph.initializer
-
-        weight_tensor = None
-        for initializer in initializers:
-            if initializer.name == tensor_name:
-                weight_tensor = initializer
-                break
+    def get_weight_shape(self, graph_index, tensor_name):
+        weight_tensor = graph_index.find_initializer(tensor_name)
 
         if weight_tensor:
-            weight_tensor = onnx.numpy_helper.to_array(weight_tensor)
-            return weight_tensor.shape
+            return tuple(weight_tensor.dims)
         else:
             return None
 
@@ -198,79 +206,51 @@ class NodeAttributes:
             onnx_dtype_map[self.node_data_type], 0
         )
 
-    def get_input_shape(self, model, node):
+    def get_input_shape(self, graph_index, node):
         """
         Locating the target tensor shape in either value_info, input, or output
         Each node could have multiple inputs so the function returns a list of all input dimensions
         """
         input_shape = []
         for input_name in node.input:
-            tensor = self.find_tensor_by_name(model, input_name)
+            tensor = self.find_tensor_by_name(graph_index, input_name)
             if tensor is not None:
-                shape = [
-                    dim.dim_value
-                    for dim in tensor.type.tensor_type.shape.dim
-                    if dim.dim_value > 0
-                ]
-                input_shape.append(shape)
+                input_shape.append(graph_index.get_shape(tensor))
 
         return input_shape
 
-    def get_output_shape(self, model, node):
+    def get_output_shape(self, graph_index, node):
         """
         Locating the target tensor shape in either value_info, input, or output
         Each node could have multiple outputs so the function returns a list of all output dimensions
         """
         output_shape = []
         for output_name in node.output:
-            tensor = self.find_tensor_by_name(model, output_name)
+            tensor = self.find_tensor_by_name(graph_index, output_name)
             if tensor is not None:
-                shape = [
-                    dim.dim_value
-                    for dim in tensor.type.tensor_type.shape.dim
-                    if dim.dim_value > 0
-                ]
-                output_shape.append(shape)
+                output_shape.append(graph_index.get_shape(tensor))
 
         return output_shape
 
-    def get_tensor_type(self, model, tensor_names):
+    def get_tensor_type(self, graph_index, tensor_names):
         """
         Determine the tensor data type for a node using the non-initializer input tensor
         The DataType enum mapping can be found at https://github.com/onnx/onnx/blob/main/onnx/onnx.proto#L503~L551
         """
         for tensor_name in tensor_names:
-            if not self.is_tensor_name_initializer(model, tensor_name):
-                tensor = self.find_tensor_by_name(model, tensor_name)
+            if not self.is_tensor_name_initializer(graph_index, tensor_name):
+                tensor = self.find_tensor_by_name(graph_index, tensor_name)
                 data_type = tensor.type.tensor_type.elem_type
                 if data_type != None:
                     return data_type
                 else:
                     return onnx.TensorProto.DataType.Value("UNDEFINED")
 
-    def find_tensor_by_name(self, model, tensor_name):
+    def find_tensor_by_name(self, graph_index, tensor_name):
         """
-        Locating the target tensor from either value_info, input, output, or initializer
+        Locating the target tensor from either value_info, input, or output
         """
-        for tensor in model.graph.value_info:
-            if tensor.name == tensor_name:
-                return tensor
-        for tensor in model.graph.input:
-            if tensor.name == tensor_name:
-                return tensor
-        for tensor in model.graph.output:
-            if tensor.name == tensor_name:
-                return tensor
-
-        #        initializers = model.graph.initializer
-
-        #        weight_tensor = None
-        #        for initializer in initializers:
-        #            if initializer.name == tensor_name:
-        #                weight_tensor = initializer
-        #                return weight_tensor
-
-        return None
+        return graph_index.find_tensor(tensor_name)
 
     def to_dict(self):
         """
@@ -299,4 +279,5 @@ class NodeAttributes:
             "Weight Size (bytes)": self.weight_size,
             "Output Size (bytes)": self.output_size,
             "Sparsity": self.sparsity,
+            "Sparsity Bound (+/-)": self.sparsity_bound,
         }
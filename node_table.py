@@ -0,0 +1,176 @@
+import sys
+import numpy as np
+import pandas as pd
+
+from node_attributes import onnx_dtype_map
+
+# (NodeAttributes attribute, report header, column dtype) of the per-node analysis results
+NODE_COLUMNS = [
+    ("node_name", "Operator Name", object),
+    ("node_op_type", "Op Type", object),
+    ("node_data_type", "Data Type", object),
+    ("support", "Supported", np.bool_),
+    ("input_dimension", "Input Dimensions", object),
+    ("output_dimension", "Output Dimensions", object),
+    ("dilations", "Dilation", object),
+    ("group", "Group", object),
+    ("kernel_shape", "Kernel Shape", object),
+    ("pads", "Pads", object),
+    ("strides", "Strides", object),
+    ("resize_mode", "Resize Mode", object),
+    ("count_mac", "MAC Count", np.float64),
+    ("count_alu", "ALU Count", np.float64),
+    ("count_exp", "EXP Count", np.float64),
+    ("count_div", "DIV Count", np.float64),
+    ("count_trig", "TRIG Count", np.float64),
+    ("count_sqrt", "SQRT Count", np.float64),
+    ("input_size", "Input Size (bytes)", np.float64),
+    ("weight_size", "Weight Size (bytes)", np.float64),
+    ("output_size", "Output Size (bytes)", np.float64),
+    ("sparsity", "Sparsity", np.float64),
+    ("sparsity_bound", "Sparsity Bound (+/-)", np.float64),
+]
+
+# Columns filled in by the memory simulation, only reported once they have been set
+MEMORY_COLUMNS = [
+    ("bytes_loaded", "bytes_loaded", np.int64),
+    ("bytes_stored", "bytes_stored", np.int64),
+    ("footprint", "Local SRAM footprint", np.int64),
+    ("next_node_chainable", "Next Node Chainable", np.bool_),
+]
+
+ALL_COLUMNS = NODE_COLUMNS + MEMORY_COLUMNS
+
+
+class NodeView:
+    """
+    Light-weight view of one row of a NodeTable, readable and writable by report header like the
+    per-node dicts it replaces
+    """
+
+    __slots__ = ("table", "index")
+
+    def __init__(self, table, index):
+        self.table = table
+        self.index = index
+
+    def __getitem__(self, header):
+        if header not in self.table.visible:
+            raise KeyError(header)
+        return self.table.columns[header][self.index]
+
+    def __setitem__(self, header, value):
+        self.table.columns[header][self.index] = value
+        self.table.show(header)
+
+    def __contains__(self, header):
+        return header in self.table.visible
+
+    def get(self, header, default=None):
+        return self[header] if header in self else default
+
+    def keys(self):
+        return self.table.headers()
+
+    def to_dict(self):
+        return {header: self[header] for header in self.keys()}
+
+
+class NodeTable:
+    """
+    Columnar storage of the per-node analysis results, one numpy array per report column.
+    Numeric columns are plain float/int arrays so totals and op-type summaries are vectorized
+    reductions, per-node access goes through NodeView without building dicts
+
+    Attributes:
+    num_nodes (int):            Number of rows
+    columns (dict):             Report header -> numpy array of num_nodes values
+    order (list):               Report column order, the fixed columns followed by the ones added with add_column
+    visible (set):              Headers that have been filled in and are reported
+    """
+
+    def __init__(self, num_nodes):
+        self.num_nodes = num_nodes
+        self.columns = {}
+        for _, header, dtype in ALL_COLUMNS:
+            if dtype is object:
+                self.columns[header] = np.full(num_nodes, None, dtype=object)
+            else:
+                self.columns[header] = np.zeros(num_nodes, dtype=dtype)
+        self.order = [header for _, header, _ in ALL_COLUMNS]
+        self.visible = {header for _, header, _ in NODE_COLUMNS}
+
+    def __len__(self):
+        return self.num_nodes
+
+    def __getitem__(self, index):
+        return NodeView(self, index)
+
+    def __iter__(self):
+        return (NodeView(self, i) for i in range(self.num_nodes))
+
+    def headers(self):
+        return [header for header in self.order if header in self.visible]
+
+    def column(self, header):
+        return self.columns[header]
+
+    def add_column(self, header, dtype):
+        """
+        Add a column for results that are not known up front (e.g. per memory level), reported once shown
+        """
+        if header not in self.columns:
+            if dtype is object:
+                self.columns[header] = np.full(self.num_nodes, None, dtype=object)
+            else:
+                self.columns[header] = np.zeros(self.num_nodes, dtype=dtype)
+            self.order.append(header)
+        return self.columns[header]
+
+    def show(self, header):
+        self.visible.add(header)
+
+    def total(self, header):
+        total = self.columns[header].sum()
+        return int(total) if float(total).is_integer() else float(total)
+
+    def to_frame(self):
+        """
+        DataFrame of the reported columns, float columns holding only whole numbers are reported as integers
+        """
+        frame = {}
+        for header in self.headers():
+            column = self.columns[header]
+            if column.dtype == np.float64 and np.all(np.mod(column, 1) == 0):
+                column = column.astype(np.int64)
+            frame[header] = column
+        return pd.DataFrame(frame)
+
+    def set_row(self, index, attributes):
+        """
+        Store the NodeAttributes returned by a handler
+        """
+        for name, header, _ in NODE_COLUMNS:
+            self.columns[header][index] = getattr(attributes, name)
+        # Interned so the per-node strings share one object per op_type/data type
+        self.columns["Op Type"][index] = sys.intern(attributes.node_op_type)
+        self.columns["Data Type"][index] = onnx_dtype_map[attributes.node_data_type]
+
+    def copy_row(self, index, other, other_index):
+        for header in self.columns:
+            if header in other.columns:
+                self.columns[header][index] = other.columns[header][other_index]
+        self.visible |= other.visible & set(self.columns)
+
+    @classmethod
+    def concatenate(cls, tables):
+        table = cls(0)
+        table.num_nodes = sum(len(t) for t in tables)
+        table.order = list(tables[0].order)
+        for header in table.order:
+            table.columns[header] = np.concatenate(
+                [t.columns[header] for t in tables]
+            ).astype(tables[0].columns[header].dtype, copy=False)
+        for t in tables:
+            table.visible |= t.visible
+        return table
@@ -1,4 +1,7 @@
 import os
+import copy
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
 import onnx
 from onnx import TensorProto, mapping
 import numpy as np
@@ -7,9 +10,36 @@ from onnxruntime.tools.symbolic_shape_infer import SymbolicShapeInference
 
 from node_registry import ONNX_OPS_REGISTRY, register_node_handler, get_handler
 from node_attributes import NodeAttributes
+from node_table import NodeTable
+from graph_index import GraphIndex
+from sparsity import SparsityEngine
+from analysis_cache import AnalysisCache
+from incremental import GraphDiff, first_affected_node, build_delta_report
+from shape_sweep import ShapeSweep, sweep_point, fixed_dim
+from scheduler import Schedule, reorder_nodes, scheduled_graph
+from arena_planner import ArenaPlan, ARENA_STRATEGIES
+from memory_sweep import MemorySweep
+from tiling import FusedTiling
+from reuse import reuse_nests, reuse_traffic
+from fusion import CHAINABLE_OPS, get_fusion_rule, partition, segment_rows
+from hw_profile import HardwareProfile
+from timeline import Timeline
+from roofline import Roofline
+from multicore import MultiCore
+from pipeline import PipelinePartition
+from placement import Placement, load_placement_config
+from energy import ENERGY_STAT_KEYS, EnergyModel, energy_rows
 import handlers
 from gen_report import ReportGenerator
 from MemTracker import MemTracker
+from liveness import Liveness
+from memory_hierarchy import (
+    HierarchyTracker,
+    parse_hierarchy,
+    parse_size,
+    level_columns,
+    hierarchy_rows,
+)
 
 import pdb
 
@@ -18,18 +48,55 @@ def is_chainable(op_type):
     """
     Example logic for which ops can be chained together without explicit DRAM flush
     """
-    chainable_ops = {
-        "Relu",
-        "Sigmoid",
-        "Tanh",
-        "Add",
-        "Mul",
-        "Mish",
-        "Transpose",
-        "LeakyRelu",
-        "Concat",
-    }
-    return op_type in chainable_ops
+    return op_type in CHAINABLE_OPS
+
+
+# Per-node results added by the memory simulation
+MEMORY_STAT_KEYS = [
+    "bytes_loaded",
+    "bytes_stored",
+    "Local SRAM footprint",
+    "Next Node Chainable",
+]
+
+# Per-node results added by the recompute-vs-spill decisions of the memory simulation
+RECOMPUTE_STAT_KEYS = ["Spill bytes saved", "Recompute ops"]
+
+# Compute primitive columns summed into the recompute cost of a node
+PRIMITIVE_KEYS = [
+    "MAC Count",
+    "ALU Count",
+    "EXP Count",
+    "DIV Count",
+    "TRIG Count",
+    "SQRT Count",
+]
+
+# Nodes between the MemTracker snapshots kept for incremental re-simulation
+MEMORY_SNAPSHOT_INTERVAL = 64
+
+# The graph index of the parse worker process, set once by init_parse_worker
+WORKER_GRAPH_INDEX = None
+
+
+def init_parse_worker(graph_index):
+    global WORKER_GRAPH_INDEX
+    WORKER_GRAPH_INDEX = graph_index
+
+
+def parse_nodes(graph_index, start, end):
+    """
+    Run the registered handlers over graph_index.nodes[start:end] and return their results as a NodeTable
+    """
+    ops_attributes = NodeTable(end - start)
+    for i, node in enumerate(graph_index.nodes[start:end]):
+        ops_handler = get_handler(node.op_type)
+        ops_attributes.set_row(i, ops_handler.handle(graph_index, node))
+    return ops_attributes
+
+
+def parse_shard(shard):
+    return parse_nodes(WORKER_GRAPH_INDEX, *shard)
 
 
 class ModelStats:
@@ -39,39 +106,228 @@ class ModelStats:
     Attributes:
     onnx_filename (string):     The input arguments
     model (Class):              Loaded ONNX model
-    ops_attributes (list):      The list of attributes of all ops in the ONNX model
-    ref_count (dict):           The tensor reference count used to track local memory usage
+    graph_index (Class):        Built-once name/producer/consumer lookup tables of the shape-inferred model
+    ops_attributes (Class):     Columnar NodeTable of the attributes of all ops in the ONNX model
+    ref_count (dict):           The tensor reference count
     tensor_size (dict):         The size of all tensors in the ONNX model
+    liveness (Class):           Birth/death node index of every tensor over the DAG
     local_memory_size (int):    The size of local SRAM
+    fusion_rule (Class):        Rule set deciding which nodes partition_model fuses with their producers
+    recompute (float):          Primitive ops costing as much as one DRAM byte, recompute flushed tensors when cheaper
+                                than spilling them (0 = always spill)
+    reuse (bool):               Add the re-reads of the best Conv/Gemm/MatMul loop nest to the DRAM traffic
+    memory_levels (list):       On-chip MemoryLevels simulated in front of DRAM instead of the single SRAM (or None)
+    chainable (list):           Per node, whether its outputs stay in local SRAM for their consumers
+    mmap_weights (bool):        Keep external weight data on disk and mmap it on demand
+    sparsity_sample (int):      Estimate weight sparsity from this many samples for larger weights (0 = exact)
+    jobs (int):                 Number of worker processes used to run the handlers
+    dim_values (dict):          Symbolic dim name -> value of the fixed-shape pass, the first point of the shape sweep
+                                (empty = symbolic dims dropped)
+    cache (Class):              On-disk cache of the shape inference and handler results (None when disabled)
+    baseline (Class):           ModelStats of the previous model version for incremental re-analysis (or None)
+    graph_diff (Class):         Node matching against the baseline (or None)
+    delta_report (list):        Per-node cost delta against the baseline (or None)
+    memory_results (dict):      Per-node memory columns before --reuse, MemTracker.finalize() summary and MemTracker
+                                snapshots every MEMORY_SNAPSHOT_INTERVAL nodes of the memory simulation, cached so
+                                an incremental run against this model only replays the nodes up to a snapshot
+    memory_summary (dict):      Model-level MemTracker totals and footprint from MemTracker.finalize()
+    shape_sweep (Class):        Costs evaluated over a grid of symbolic dim values (or None)
+    schedule (Class):           Footprint-minimizing node order (or None)
+    schedule_summary (dict):    MemTracker.finalize() summary of the memory simulation in the scheduled order
+    arena_plan (Class):         Offsets of the intermediate tensors in a single arena, in the executed order (or None)
+    memory_sweep (Class):       DRAM traffic and footprint over a range of local memory sizes (or None)
+    fused_tiling (Class):       Best tiling of every fused segment for the local memory size (or None)
+    hw_profile (Class):         Compute throughput and DMA bandwidth of the target (or None)
+    roofline (Class):           Roofline latency of every node with the hardware profile (or None)
+    timeline (Class):           Compute/DMA overlap simulation with the hardware profile (or None)
+    multicore (Class):          Critical path and list schedule of the DAG on several cores (or None)
+    pipeline (Class):           Split of the nodes into contiguous pipeline stages across devices (or None)
+    placement (Class):          Host/accelerator assignment of the nodes minimizing the latency (or None)
+    energy_model (Class):       Energy per primitive and per byte of the target (or None)
+    energy (float):             Energy per inference in uJ (or None)
     verbose (bool):             Verbose output flag
     """
 
-    def __init__(self, args):
+    def __init__(self, args, track_memory=True, dim_values=None):
         self.verbose = args.verbose
         self.onnx_filename = args.input
+        self.mmap_weights = args.mmap
+        self.sparsity_sample = args.sparsity_sample
+        self.jobs = args.jobs
+        if dim_values is None:
+            dim_values = sweep_point(args.shape_sweep) if args.shape_sweep else {}
+        self.dim_values = dim_values
+        if self.dim_values:
+            print(f"Per-node analysis with the symbolic dims at {self.dim_values}")
+        self.cache = (
+            AnalysisCache(args.cache_dir, args.cache_size) if args.cache else None
+        )
         self.model = self.load_model()
         self.xlsx_filename = (
             os.path.splitext(os.path.basename(self.onnx_filename))[0] + ".xlsx"
         )
-        self.ops_attributes = []
+        self.ops_attributes = NodeTable(0)
         self.unsupported_ops = {}
+        self.baseline = self.load_baseline(args) if args.baseline else None
+        self.graph_diff = None
+        self.delta_report = None
+        self.memory_results = None
 
-        self.check_model()
-        self.shape_infer_model()
-        self.parse_model()
+        cache_entry = self.load_cached_analysis()
+        if cache_entry is None:
+            self.check_model()
+            self.shape_infer_model()
+        self.graph_index = GraphIndex(
+            self.model,
+            os.path.dirname(os.path.abspath(self.onnx_filename)),
+            SparsityEngine(self.sparsity_sample),
+        )
+        self.graph_index.dim_values = self.dim_values
+        if self.baseline:
+            self.graph_diff = GraphDiff(self.baseline.graph_index, self.graph_index)
+        if cache_entry is None:
+            if self.graph_diff:
+                # Not cached, the results of the matched nodes are carried over from the baseline
+                self.parse_model_incremental()
+            else:
+                self.parse_model()
+                self.store_cached_analysis()
+        else:
+            self.ops_attributes = cache_entry["ops_attributes"]
 
         self.ref_count = self.build_ref_count_map()
         self.tensor_size = self.build_tensor_size_map()
+        self.liveness = Liveness(self.graph_index)
 
         self.local_memory_size = args.memory
-        self.add_memory_tracker()
+        self.reuse = args.reuse
+        self.fusion_rule = get_fusion_rule(args.fusion_rules)
+        self.hierarchy_spec = args.hierarchy
+        self.memory_levels = parse_hierarchy(args.hierarchy) if args.hierarchy else None
+        if self.memory_levels:
+            # The chaining decisions are made against the level closest to compute
+            self.local_memory_size = self.memory_levels[0].capacity / (1024 * 1024)
+        # Recomputation is modelled in the single local memory simulation only
+        self.recompute = 0 if self.memory_levels else args.recompute
+        if self.reuse and not self.local_memory_size and track_memory:
+            print(
+                "Warning: --reuse needs a local memory size (--memory or --hierarchy), no re-reads are added to the per-node traffic"
+            )
+        self.chainable = self.plan_chaining(self.tensor_size)
+        if track_memory:
+            self.add_memory_tracker()
+        self.shape_sweep = (
+            self.run_shape_sweep(args.shape_sweep) if args.shape_sweep else None
+        )
+        self.schedule = None
+        self.schedule_summary = None
+        if args.schedule and track_memory:
+            self.schedule_nodes(args.schedule, args.schedule_exact)
+        self.arena_plan = (
+            self.plan_arena(args.arena, args.arena_align, args.arena_json)
+            if args.arena
+            else None
+        )
+        self.memory_sweep = (
+            self.run_memory_sweep(args.memory_sweep) if args.memory_sweep else None
+        )
+        self.fused_tiling = self.search_tiling() if args.tiling else None
+        self.hw_profile = (
+            HardwareProfile.load(args.hw_profile) if args.hw_profile else None
+        )
+        self.roofline = (
+            self.estimate_latency() if self.hw_profile and track_memory else None
+        )
+        self.timeline = (
+            self.simulate_timeline(args.timeline_json)
+            if self.hw_profile and track_memory
+            else None
+        )
+        self.multicore = self.schedule_cores(args.cores) if args.cores else None
+        self.pipeline = (
+            self.partition_pipeline(
+                args.pipeline,
+                parse_size(args.stage_memory) if args.stage_memory else 0,
+            )
+            if args.pipeline
+            else None
+        )
+        self.placement = (
+            self.place_nodes(args.placement)
+            if args.placement and track_memory
+            else None
+        )
+        self.energy_model = (
+            EnergyModel.load(args.energy) if args.energy and track_memory else None
+        )
+        self.energy = self.add_energy() if self.energy_model else None
+        if self.baseline:
+            self.delta_report = build_delta_report(self.baseline, self, self.graph_diff)
 
     def load_model(self):
         print(f"Loading ONNX model: {self.onnx_filename}")
-        return onnx.load(self.onnx_filename)
+        # The external weights are resolved separately so the cache key only hashes the graph proto
+        model = onnx.load(self.onnx_filename, load_external_data=False)
+        if self.cache:
+            self.cache_key = self.cache.model_key(
+                self.onnx_filename,
+                model,
+                {
+                    "sparsity_sample": self.sparsity_sample,
+                    "dim_values": self.dim_values,
+                },
+            )
+        # With mmap_weights external weights are left on disk and mmap'ed on demand by GraphIndex
+        if not self.mmap_weights:
+            onnx.load_external_data_for_model(
+                model, os.path.dirname(os.path.abspath(self.onnx_filename))
+            )
+        return model
+
+    def load_baseline(self, args):
+        """
+        Load the previous model version from the analysis cache (analyzing and caching it on a miss).
+        Only its cached results are needed, so its weights are left on disk
+        """
+        baseline_args = copy.copy(args)
+        baseline_args.input = args.baseline
+        baseline_args.baseline = None
+        baseline_args.shape_sweep = None
+        baseline_args.schedule = None
+        baseline_args.arena = None
+        baseline_args.memory_sweep = None
+        baseline_args.tiling = False
+        baseline_args.hw_profile = None
+        baseline_args.cores = 0
+        baseline_args.pipeline = 0
+        baseline_args.placement = None
+        baseline_args.energy = None
+        baseline_args.cache = True
+        baseline_args.mmap = True
+        print(f"Loading baseline model analysis: {args.baseline}")
+        # The symbolic dims of the baseline are evaluated at the same values so the matched nodes agree
+        return ModelStats(baseline_args, track_memory=False, dim_values=self.dim_values)
+
+    def load_cached_analysis(self):
+        if not self.cache:
+            return None
+
+        cache_entry = self.cache.load(self.cache_key)
+        if cache_entry is not None:
+            print(f"Restoring model analysis from cache ({self.cache_key[:12]})")
+            self.cache.restore_value_info(self.model, cache_entry)
+        return cache_entry
+
+    def store_cached_analysis(self):
+        if self.cache:
+            self.cache.store(self.cache_key, self.model, self.ops_attributes)
 
     def check_model(self):
-        onnx.checker.check_model(self.model)
+        if self.mmap_weights:
+            # Checked by path so the external data locations resolve against the model directory
+            onnx.checker.check_model(self.onnx_filename)
+        else:
+            onnx.checker.check_model(self.model)
 
     def shape_infer_model(self):
         print(f"Shape-infering the model...")
@@ -85,9 +341,60 @@ class ModelStats:
                 self.model = onnx.shape_inference.infer_shapes(self.model)
 
     def parse_model(self):
-        for node in self.model.graph.node:
-            ops_handler = get_handler(node.op_type)
-            self.ops_attributes.append(ops_handler.handle(self.model, node).to_dict())
+        num_nodes = len(self.graph_index.nodes)
+        if self.jobs > 1 and num_nodes > 1:
+            self.ops_attributes = self.parse_model_parallel()
+        else:
+            self.ops_attributes = parse_nodes(self.graph_index, 0, num_nodes)
+
+    def parse_model_parallel(self):
+        """
+        Split graph.node into contiguous shards and run the handlers in a process pool.
+        Handlers only read the graph index, so the shards are independent and are merged back in node order
+        """
+        num_nodes = len(self.graph_index.nodes)
+        # A few shards per worker to balance the uneven handler cost (e.g. Conv sparsity vs Relu)
+        shard_size = max(1, -(-num_nodes // (self.jobs * 4)))
+        shards = [
+            (start, min(start + shard_size, num_nodes))
+            for start in range(0, num_nodes, shard_size)
+        ]
+
+        # With fork the workers inherit the graph index copy-on-write instead of unpickling it
+        if "fork" in multiprocessing.get_all_start_methods():
+            mp_context = multiprocessing.get_context("fork")
+        else:
+            mp_context = multiprocessing.get_context()
+
+        print(f"Parsing {num_nodes} nodes with {self.jobs} processes...")
+        with ProcessPoolExecutor(
+            max_workers=self.jobs,
+            mp_context=mp_context,
+            initializer=init_parse_worker,
+            initargs=(self.graph_index,),
+        ) as executor:
+            return NodeTable.concatenate(list(executor.map(parse_shard, shards)))
+
+    def parse_model_incremental(self):
+        """
+        Reuse the baseline results of the nodes with an identical signature and only run the handlers of
+        the changed nodes
+        """
+        print(
+            f"Re-analyzing {self.graph_diff.num_changed()} changed nodes out of {len(self.graph_index.nodes)}"
+        )
+        self.ops_attributes = NodeTable(len(self.graph_index.nodes))
+        for i, (node, match) in enumerate(
+            zip(self.graph_index.nodes, self.graph_diff.matches)
+        ):
+            if match is None:
+                ops_handler = get_handler(node.op_type)
+                self.ops_attributes.set_row(
+                    i, ops_handler.handle(self.graph_index, node)
+                )
+            else:
+                self.ops_attributes.copy_row(i, self.baseline.ops_attributes, match)
+                self.ops_attributes[i]["Operator Name"] = node.name
 
     def build_ref_count_map(self):
         ref_count = {}
@@ -109,6 +416,8 @@ class ModelStats:
         for d in tensor_type.shape.dim:
             if d.dim_value is not None and d.dim_value > 0:
                 shape.append(d.dim_value)
+            elif self.dim_values and d.dim_param:
+                shape.append(fixed_dim(d.dim_param, self.dim_values))
             else:
                 shape.append(1)
         return shape
@@ -144,75 +453,638 @@ class ModelStats:
 
         for init in self.model.graph.initializer:
             if init.name not in size_map:
-                arr = onnx.numpy_helper.to_array(init)
-                size_map[init.name] = arr.nbytes
+                # Size from the TensorProto header only, the weight data is never decoded
+                size_map[init.name] = self.get_tensor_size(init.data_type, init.dims)
 
         return size_map
 
     def partition_model(self):
         """
-        Returns a list of segments, where each segment is a list of nodes
-        that can be chained together before forcing a store to DRAM.
+        Returns a list of fusion segments over the DAG, each a list of node indices that run together
+        without storing their intermediate tensors to DRAM
         """
-        segments = []
-        current_segment = []
+        return partition(self.graph_index, self.fusion_rule)
 
-        for node in self.model.graph.node:
-            # Start a new segment when the node is unchainable
-            if not is_chainable(node.op_type):
-                segments.append(current_segment)
-                current_segment = []
-                current_segment.append(node)
-            else:
-                current_segment.append(node)
+    def fusion_segment_rows(self):
+        segments = self.partition_model()
+        rows = segment_rows(
+            self.graph_index, self.ops_attributes, self.tensor_size, segments
+        )
+        print(
+            f"{len(segments)} fusion segments, boundary DRAM loaded/stored: {sum(row['bytes_loaded'] for row in rows)}/{sum(row['bytes_stored'] for row in rows)} bytes"
+        )
+        return rows
 
-            # Adding leftover segment to the segment list
-            if current_segment:
-                segments.append(current_segment)
+    def new_mem_tracker(self, tensor_size, model=None, liveness=None, node_ops=None):
+        """
+        MemTracker (HierarchyTracker with --hierarchy) for the given tensor sizes, with --recompute enabled.
+        The model and liveness default to the model's own, node_ops to its primitive ops
+        """
+        model = model or self.model
+        liveness = liveness or self.liveness
+        if self.memory_levels:
+            return HierarchyTracker(model, tensor_size, liveness, self.memory_levels)
+        mem_tracker = MemTracker(model, tensor_size, liveness, self.local_memory_size)
+        if self.recompute:
+            mem_tracker.enable_recompute(
+                self.node_ops() if node_ops is None else node_ops, self.recompute
+            )
+        return mem_tracker
 
-            return segments
+    def memory_stat_keys(self):
+        if self.memory_levels:
+            return MEMORY_STAT_KEYS + level_columns(self.memory_levels)
+        if self.recompute:
+            return MEMORY_STAT_KEYS + RECOMPUTE_STAT_KEYS
+        return MEMORY_STAT_KEYS
 
     def add_memory_tracker(self):
-        mem_tracker = MemTracker(
-            self.model, self.tensor_size, self.ref_count, self.local_memory_size
-        )
+        mem_tracker = self.new_mem_tracker(self.tensor_size)
+
+        # The MemTracker results are written straight into the NodeTable columns
+        bytes_loaded = self.ops_attributes.column("bytes_loaded")
+        bytes_stored = self.ops_attributes.column("bytes_stored")
+        footprint = self.ops_attributes.column("Local SRAM footprint")
+        next_node_chainable = self.ops_attributes.column("Next Node Chainable")
+        self.ops_attributes.show("bytes_loaded")
+        self.ops_attributes.show("bytes_stored")
+        if self.verbose:
+            self.ops_attributes.show("Local SRAM footprint")
+            self.ops_attributes.show("Next Node Chainable")
+        level_stats = []
+        if self.memory_levels:
+            columns = level_columns(self.memory_levels)
+            for column in columns:
+                self.ops_attributes.add_column(column, np.int64)
+                self.ops_attributes.show(column)
+            level_stats = [
+                (
+                    self.ops_attributes.column(loaded),
+                    self.ops_attributes.column(stored),
+                )
+                for loaded, stored in zip(columns[::2], columns[1::2])
+            ]
+        if self.recompute:
+            bytes_saved = self.ops_attributes.add_column("Spill bytes saved", np.int64)
+            recompute_ops = self.ops_attributes.add_column("Recompute ops", np.float64)
+            for column in RECOMPUTE_STAT_KEYS:
+                self.ops_attributes.show(column)
 
         num_nodes = len(self.model.graph.node)
-        for i, node in enumerate(self.model.graph.node):
-            if i == num_nodes - 1:
-                next_node_chainable = False
-            else:
-                # The chainability is determined by:
-                # 1. op_type
-                # 2. local memory size (if local memory is big enough no system memory transfer will be needed)
-                # 3. whether next node is connected topologically
-                next_node = self.model.graph.node[i + 1]
-                next_node_chainable = (
-                    is_chainable(next_node.op_type)
-                    and set(node.output).intersection(set(next_node.input)) != {}
-                ) or (self.local_memory_size * 1024 * 1024 >= node_stats["footprint"])
-
-            node_stats = mem_tracker.process_node(node, next_node_chainable)
-            self.ops_attributes[i]["bytes_loaded"] = node_stats["bytes_loaded"]
-            self.ops_attributes[i]["bytes_stored"] = node_stats["bytes_stored"]
-            if self.verbose:
-                self.ops_attributes[i]["Local SRAM footprint"] = node_stats["footprint"]
-                self.ops_attributes[i]["Next Node Chainable"] = node_stats[
-                    "next_node_chainable"
-                ]
-
-        mem_tracker.finalize()
+        start = 0
+        if self.baseline:
+            start = self.resume_memory_tracker(mem_tracker)
+
+        snapshots = {}
+        for i in range(start, num_nodes):
+            node = self.model.graph.node[i]
+            if i % MEMORY_SNAPSHOT_INTERVAL == 0:
+                snapshots[i] = mem_tracker.get_state()
+
+            node_stats = mem_tracker.process_node(node, self.chainable[i])
+            bytes_loaded[i] = node_stats["bytes_loaded"]
+            bytes_stored[i] = node_stats["bytes_stored"]
+            footprint[i] = node_stats["footprint"]
+            next_node_chainable[i] = node_stats["next_node_chainable"]
+            for level, (loaded, stored) in enumerate(level_stats):
+                loaded[i] = node_stats["level_bytes_loaded"][level]
+                stored[i] = node_stats["level_bytes_stored"][level]
+            if self.recompute:
+                bytes_saved[i] = node_stats["bytes_saved"]
+                recompute_ops[i] = node_stats["recompute_ops"]
+
+        self.memory_summary = mem_tracker.finalize()
+        self.memory_results = {
+            "columns": {
+                key: self.ops_attributes.column(key).copy()
+                for key in self.memory_stat_keys()
+            },
+            "summary": copy.deepcopy(self.memory_summary),
+            "snapshots": snapshots,
+        }
+        if start == 0:
+            self.store_memory_results()
+        self.report_memory_summary()
+
+    def report_memory_summary(self):
+        """
+        Print the memory simulation totals and add the --reuse traffic on top of the simulated one
+        """
+        bytes_loaded = self.ops_attributes.column("bytes_loaded")
+        bytes_stored = self.ops_attributes.column("bytes_stored")
+        if self.recompute:
+            print(
+                f"Recompute instead of spill: {self.memory_summary['total_bytes_saved']} DRAM bytes saved for {self.memory_summary['total_recompute_ops']:.0f} recomputed primitive ops"
+            )
+        if self.reuse and self.local_memory_size:
+            self.add_reuse_traffic(bytes_loaded, bytes_stored)
+        if self.memory_levels:
+            for name, stats in self.memory_summary["levels"].items():
+                transfer_time = (
+                    f", {stats['transfer_time_us']:.1f} us"
+                    if "transfer_time_us" in stats
+                    else ""
+                )
+                print(
+                    f"{name}: loaded {stats['bytes_loaded']} / stored {stats['bytes_stored']} bytes from/to the level below, max footprint {stats['max_footprint']} bytes{transfer_time}"
+                )
+
+    def add_reuse_traffic(self, bytes_loaded, bytes_stored):
+        """
+        MemTracker moves every tensor once. The Conv/Gemm/MatMul layers whose operands exceed the local memory
+        re-read them, add the extra traffic of their best loop nest to bytes_loaded/bytes_stored
+        """
+        capacity = self.local_memory_size * 1024 * 1024
+        loop_order = self.ops_attributes.add_column("Reuse Loop Order", object)
+        tiles = self.ops_attributes.add_column("Reuse Tiles", object)
+        dram_bytes = self.ops_attributes.add_column("Reuse DRAM bytes", np.int64)
+        for column in ("Reuse Loop Order", "Reuse Tiles", "Reuse DRAM bytes"):
+            self.ops_attributes.show(column)
+
+        extra_loaded = extra_stored = 0
+        for i, nest in reuse_nests(self.graph_index, self.tensor_size, capacity):
+            loop_order[i] = nest.order
+            tiles[i] = nest.tiles
+            dram_bytes[i] = nest.dram_bytes()
+            loaded, stored = nest.extra_bytes()
+            bytes_loaded[i] += loaded
+            bytes_stored[i] += stored
+            extra_loaded += loaded
+            extra_stored += stored
+
+        self.memory_summary["total_bytes_loaded"] += extra_loaded
+        self.memory_summary["total_bytes_stored"] += extra_stored
+        print(
+            f"Loop-nest reuse: {extra_loaded}/{extra_stored} bytes re-loaded/stored by Conv/Gemm/MatMul on top of moving every tensor once"
+        )
+
+    def plan_chaining(self, tensor_size, graph_index=None, liveness=None):
+        """
+        Chainability of every node for the given tensor sizes, in linear time over the nodes and edges.
+        The graph index and liveness default to the model's own
+        """
+        graph_index = graph_index or self.graph_index
+        live_bytes = (liveness or self.liveness).live_bytes(tensor_size)
+        return [
+            self.is_next_node_chainable(i, live_bytes, graph_index)
+            for i in range(len(graph_index.nodes))
+        ]
+
+    def is_next_node_chainable(self, i, live_bytes, graph_index=None):
+        """
+        Decide whether the outputs of node i can stay in local memory until all their consumers have run
+
+        Args:
+            i (int):                Node index
+            live_bytes (array):     Bytes of the tensors live at each node, from Liveness.live_bytes()
+            graph_index (class):    Graph the node index refers to (default: the model's graph index)
+        """
+        return bool(
+            self.local_memory_size * 1024 * 1024
+            >= self.chaining_threshold(i, live_bytes, graph_index)
+        )
+
+    def chaining_threshold(self, i, live_bytes, graph_index=None):
+        """
+        Smallest local memory size (in bytes) from which the outputs of node i stay in local memory,
+        inf when nothing consumes them
+        """
+        graph_index = graph_index or self.graph_index
+        node = graph_index.nodes[i]
+        consumers = [
+            j for output in node.output for j in graph_index.get_consumers(output)
+        ]
+        if not consumers:
+            return np.inf
+
+        # The chainability is determined by:
+        # 1. op_type of every consumer, wherever it is in the graph (residual and multi-branch outputs included)
+        # 2. local memory size (if local memory is big enough no system memory transfer will be needed)
+        if all(is_chainable(graph_index.nodes[j].op_type) for j in consumers):
+            return 0
+        return live_bytes[i]
+
+    def chaining_thresholds(self, tensor_size):
+        """
+        chaining_threshold() of every node of the model for the given tensor sizes
+        """
+        live_bytes = self.liveness.live_bytes(tensor_size)
+        return np.array(
+            [
+                self.chaining_threshold(i, live_bytes)
+                for i in range(len(self.graph_index.nodes))
+            ],
+            dtype=np.float64,
+        )
+
+    def simulate_memory(self, tensor_size, order=None, node_ops=None, dim_values=None):
+        """
+        Run MemTracker over the whole graph with another tensor size map and/or node order without touching
+        ops_attributes. The tensor sizes of another shape come with the primitive ops of every node (in file
+        order) and the symbolic dim values they were evaluated at, for --recompute and --reuse
+
+        Returns the MemTracker.finalize() summary, with the --reuse traffic
+        """
+        model, graph_index, liveness = self.ordered_graph(order)
+        if self.recompute:
+            node_ops = self.node_ops() if node_ops is None else node_ops
+            if order is not None:
+                # MemTracker indexes the recompute costs by position in the order it runs
+                node_ops = node_ops[order]
+        mem_tracker = self.new_mem_tracker(tensor_size, model, liveness, node_ops)
+        chainable = self.plan_chaining(tensor_size, graph_index, liveness)
+        for i, node in enumerate(model.graph.node):
+            mem_tracker.process_node(node, chainable[i])
+        summary = mem_tracker.finalize()
+        if self.reuse and self.local_memory_size:
+            # The same loop-nest re-reads as report_memory_summary() adds to the file order, they do not depend
+            # on the order and the scheduled graph is a light copy without shapes
+            reuse_index = (
+                self.graph_index.fixed_view(dim_values)
+                if dim_values
+                else self.graph_index
+            )
+            extra_loaded, extra_stored = reuse_traffic(
+                reuse_index, tensor_size, self.local_memory_size * 1024 * 1024
+            )
+            summary["total_bytes_loaded"] += extra_loaded
+            summary["total_bytes_stored"] += extra_stored
+        return summary
+
+    def ordered_graph(self, order=None):
+        """
+        Model, graph index and liveness of the nodes in the given order (default: file order)
+        """
+        if order is None:
+            return self.model, self.graph_index, self.liveness
+        model = scheduled_graph(self.model, order)
+        graph_index = GraphIndex(model)
+        return model, graph_index, Liveness(graph_index)
+
+    def schedule_nodes(self, objective, exact_window):
+        """
+        Search a node order with a lower peak footprint ("peak") or DRAM traffic ("spill") than the file order
+        """
+        print(f"Scheduling {len(self.graph_index.nodes)} nodes...")
+        schedule = Schedule(self.graph_index, self.tensor_size, exact_window)
+        summary = self.simulate_memory(self.tensor_size, schedule.order)
+        if objective == "spill":
+            # The search minimizes the live bytes, keep its order only if it also moves less data
+            def spill(summary):
+                return summary["total_bytes_loaded"] + summary["total_bytes_stored"]
+
+            if spill(summary) >= spill(self.memory_summary):
+                schedule.order = schedule.file_order
+                schedule.peak = schedule.file_peak
+                schedule.profile = schedule.footprint_profile(schedule.file_order)
+                summary = self.memory_summary
+
+        print(
+            f"File order: peak live {schedule.file_peak} bytes, DRAM loaded/stored: {self.memory_summary['total_bytes_loaded']}/{self.memory_summary['total_bytes_stored']} bytes, max SRAM footprint: {self.memory_summary['max_footprint']} bytes"
+        )
+        print(
+            f"Scheduled order: peak live {schedule.peak} bytes, DRAM loaded/stored: {summary['total_bytes_loaded']}/{summary['total_bytes_stored']} bytes, max SRAM footprint: {summary['max_footprint']} bytes"
+        )
+        self.schedule = schedule
+        self.schedule_summary = summary
+
+    def schedule_rows(self):
+        rows = []
+        for position, (i, live) in enumerate(
+            zip(self.schedule.order, self.schedule.profile)
+        ):
+            node = self.graph_index.nodes[i]
+            rows.append(
+                {
+                    "Position": position,
+                    "Operator Name": node.name,
+                    "Op Type": node.op_type,
+                    "File Index": i,
+                    "Live Bytes": live,
+                }
+            )
+        return rows
+
+    def plan_arena(self, strategy, alignment, json_filename=None):
+        """
+        Assign arena offsets to the intermediate tensors in the scheduled order (file order without --schedule).
+        With strategy "all" every strategy is tried and the smallest arena is kept
+        """
+        _, graph_index, liveness = self.ordered_graph(
+            self.schedule.order if self.schedule else None
+        )
+        strategies = ARENA_STRATEGIES if strategy == "all" else (strategy,)
+        plans = []
+        for name in strategies:
+            plan = ArenaPlan(graph_index, liveness, self.tensor_size, name, alignment)
+            print(
+                f"Arena plan ({name}): {plan.arena_size} bytes, lower bound {plan.lower_bound} bytes, fragmentation {plan.fragmentation():.1%}"
+            )
+            plans.append(plan)
+        arena_plan = min(plans, key=lambda plan: plan.arena_size)
+        if json_filename:
+            print(f"Write the {arena_plan.strategy} arena plan to {json_filename}")
+            arena_plan.to_json(json_filename)
+        return arena_plan
+
+    def node_ops(self):
+        return sum(self.ops_attributes.column(key) for key in PRIMITIVE_KEYS)
+
+    def memory_cache_key(self):
+        return self.cache.memory_key(
+            self.cache_key,
+            {
+                "memory": self.local_memory_size,
+                "hierarchy": self.hierarchy_spec,
+                "recompute": self.recompute,
+            },
+        )
+
+    def store_memory_results(self):
+        if self.cache:
+            self.cache.store_entry(self.memory_cache_key(), self.memory_results)
+
+    def restore_memory_results(self):
+        """
+        Fill in the memory columns and summary from the cached memory simulation, or run it on a miss
+        """
+        entry = self.cache.load(self.memory_cache_key()) if self.cache else None
+        if entry is None:
+            self.add_memory_tracker()
+            return
+        print(f"Restoring the memory simulation from cache ({self.cache_key[:12]})")
+        self.memory_results = entry
+        for key, column in entry["columns"].items():
+            if key not in self.ops_attributes.columns:
+                self.ops_attributes.add_column(key, column.dtype)
+            self.ops_attributes.column(key)[:] = column
+            if self.verbose or key not in (
+                "Local SRAM footprint",
+                "Next Node Chainable",
+            ):
+                self.ops_attributes.show(key)
+        self.memory_summary = copy.deepcopy(entry["summary"])
+        self.report_memory_summary()
+
+    def memory_state_at(self, index):
+        """
+        MemTracker state before node index: replay the nodes from the closest snapshot before it
+        """
+        snapshots = self.memory_results["snapshots"]
+        start = max(i for i in snapshots if i <= index)
+        mem_tracker = self.new_mem_tracker(self.tensor_size)
+        mem_tracker.resume(snapshots[start])
+        for i in range(start, index):
+            mem_tracker.process_node(self.model.graph.node[i], self.chainable[i])
+        return mem_tracker.get_state()
+
+    def resume_memory_tracker(self, mem_tracker):
+        """
+        Restore the baseline memory simulation (from the cache when it has been simulated before), take its state
+        at the first node affected by the changes and resume from there. The results of the nodes before it are
+        identical to the baseline and are copied over
+
+        Returns the node index to resume the simulation from
+        """
+        start = first_affected_node(self.baseline, self)
+        self.baseline.restore_memory_results()
+
+        mem_tracker.resume(self.baseline.memory_state_at(start))
+        for key, column in self.baseline.memory_results["columns"].items():
+            self.ops_attributes.column(key)[:start] = column[:start]
+
+        print(
+            f"Re-simulating local memory from node {start} out of {len(self.model.graph.node)}"
+        )
+        return start
+
+    def run_shape_sweep(self, sweep_spec):
+        shape_sweep = ShapeSweep(self, sweep_spec)
+        for row in shape_sweep.rows:
+            dims = ", ".join(f"{name}={row[name]}" for name in shape_sweep.grid)
+            print(
+                f"[{dims}] MAC: {row['MAC Count']:.0f}, DRAM loaded/stored: {row['bytes_loaded']}/{row['bytes_stored']} bytes, max SRAM footprint: {row['Max SRAM footprint']} bytes"
+            )
+        return shape_sweep
+
+    def run_memory_sweep(self, sweep_spec):
+        memory_sweep = MemorySweep(self, sweep_spec)
+        print(
+            f"Memory sweep: {len(memory_sweep.rows)} sizes, {len(memory_sweep.breakpoints)} breakpoints, {memory_sweep.num_simulations} simulations"
+        )
+        for row in memory_sweep.rows:
+            print(
+                f"[{row['Local Memory (bytes)']} bytes{' (breakpoint)' if row['Breakpoint'] else ''}] DRAM loaded/stored: {row['bytes_loaded']}/{row['bytes_stored']} bytes, max SRAM footprint: {row['Max SRAM footprint']} bytes"
+            )
+        basename = os.path.splitext(os.path.basename(self.onnx_filename))[0]
+        print(f"Write the memory sweep curve to {basename}_memory_sweep.csv/.xlsx")
+        memory_sweep.write_csv(basename + "_memory_sweep.csv")
+        memory_sweep.write_chart(basename + "_memory_sweep.xlsx")
+        return memory_sweep
+
+    def search_tiling(self):
+        fused_tiling = FusedTiling(
+            self.graph_index,
+            self.tensor_size,
+            self.ops_attributes.column("MAC Count"),
+            self.local_memory_size * 1024 * 1024,
+        )
+        segments = fused_tiling.segments
+        fused = sum(segment.dram_bytes for segment in segments if segment.fits)
+        unfused = sum(
+            segment.unfused_dram_bytes for segment in segments if segment.fits
+        )
+        print(
+            f"Fused tiling: {sum(segment.fits for segment in segments)} of {len(segments)} segments fit, DRAM bytes {fused} fused vs {unfused} layer by layer, {sum(segment.redundant_macs for segment in segments if segment.fits):.0f} redundant MACs"
+        )
+        return fused_tiling
+
+    def estimate_latency(self, num_bottlenecks=5):
+        roofline = Roofline(self.hw_profile, self.ops_attributes)
+        share = roofline.bound_share()
+        print(
+            f"Roofline ({self.hw_profile.name or 'hw profile'}): {roofline.total * 1e6:.1f} us, {share['compute']:.0%} compute-bound, {share['DRAM']:.0%} DRAM-bound, {share['SRAM']:.0%} SRAM-bound"
+        )
+        for i in roofline.bottlenecks(num_bottlenecks):
+            print(
+                f"  {roofline.names[i]} ({roofline.op_types[i]}): {roofline.latency[i] * 1e6:.1f} us, {roofline.bound[i]}-bound"
+            )
+        return roofline
+
+    def simulate_timeline(self, trace_filename=None):
+        timeline = Timeline(
+            self.graph_index,
+            self.hw_profile,
+            self.hw_profile.compute_time(self.ops_attributes),
+            self.ops_attributes.column("bytes_loaded"),
+            self.ops_attributes.column("bytes_stored"),
+        )
+        compute = float((timeline.compute[:, 1] - timeline.compute[:, 0]).sum())
+        print(
+            f"Timeline ({self.hw_profile.name or 'hw profile'}): {timeline.makespan * 1e6:.1f} us, compute busy {compute * 1e6:.1f} us, DMA stalls {timeline.stall.sum() * 1e6:.1f} us"
+        )
+        if trace_filename:
+            print(f"Write the Chrome trace to {trace_filename}")
+            timeline.to_chrome_trace(trace_filename)
+        return timeline
+
+    def node_costs(self):
+        """
+        Per-node cost estimate: the roofline latency with a hardware profile, the primitive operations otherwise
+
+        Returns:
+            (numpy array, str): cost per node and its unit
+        """
+        if self.roofline:
+            return self.roofline.latency * 1e6, "us"
+        return sum(self.ops_attributes.column(key) for key in PRIMITIVE_KEYS), "ops"
+
+    def schedule_cores(self, cores):
+        cost, self.cost_unit = self.node_costs()
+        multicore = MultiCore(self.graph_index, cost, cores)
+        print(
+            f"Critical path: {len(multicore.critical_path)} nodes, {multicore.critical_path_cost():.1f} of {multicore.serial:.1f} {self.cost_unit} serial, max speedup {multicore.max_speedup():.2f}x"
+        )
+        for schedule in multicore.scaling:
+            print(
+                f"  {schedule.cores} cores: makespan {schedule.makespan:.1f} {self.cost_unit}, speedup {multicore.speedup(schedule):.2f}x, utilization {schedule.utilization():.0%}"
+            )
+        return multicore
+
+    def partition_pipeline(self, num_stages, weight_limit):
+        cost, self.cost_unit = self.node_costs()
+        pipeline = PipelinePartition(
+            self.graph_index, self.tensor_size, cost, num_stages, weight_limit
+        )
+        if not pipeline.bounds:
+            print(
+                f"Pipeline: no split into {pipeline.num_stages} stages fits {weight_limit} weight bytes per stage"
+            )
+            return None
+        bottleneck = pipeline.bottleneck()
+        throughput = (
+            f", {1e6 / bottleneck:.1f} inferences/s"
+            if self.cost_unit == "us" and bottleneck
+            else ""
+        )
+        print(
+            f"Pipeline: {pipeline.num_stages} stages, bottleneck stage {bottleneck:.1f} {self.cost_unit}{throughput}, {pipeline.cost.sum() / bottleneck if bottleneck else 1.0:.2f}x the throughput of one device, {int(sum(pipeline.cut_bytes[first] for first, _ in pipeline.bounds))} bytes across the cuts"
+        )
+        if self.mmap_weights:
+            onnx.load_external_data_for_model(
+                self.model, os.path.dirname(os.path.abspath(self.onnx_filename))
+            )
+        # The stages go next to the input model
+        basename = os.path.splitext(self.onnx_filename)[0]
+        for stage, (first, end) in enumerate(pipeline.bounds):
+            stage_filename = f"{basename}_stage{stage}.onnx"
+            print(
+                f"  stage {stage}: nodes {first}-{end - 1}, {pipeline.stage_cost[stage]:.1f} {self.cost_unit}, {pipeline.stage_weights[stage]} weight bytes, {int(pipeline.cut_bytes[first])} bytes in, write {stage_filename}"
+            )
+            onnx.save(pipeline.stage_model(self.model, stage), stage_filename)
+        return pipeline
+
+    def place_nodes(self, config_filename):
+        placement = Placement(
+            self.graph_index,
+            self.ops_attributes,
+            self.tensor_size,
+            *load_placement_config(config_filename),
+        )
+        host, accelerator = placement.host.name, placement.accelerator.name
+        print(
+            f"Placement: {placement.total_time():.1f} us ({placement.compute_time:.1f} us compute, {placement.transfer_time:.1f} us for {len(placement.transfers)} transfers of {sum(num_bytes for _, _, _, num_bytes in placement.transfers)} bytes) vs {placement.host_only_time:.1f} us on {host} only, {int(placement.on_accelerator.sum())} of {len(placement.on_accelerator)} nodes on {accelerator}"
+        )
+        for device, first, end in placement.segments():
+            print(
+                f"  {device}: {self.graph_index.nodes[first].name} .. {self.graph_index.nodes[end - 1].name} ({end - first} nodes)"
+            )
+        for op_type, nodes, analyzed, saved in placement.gains:
+            print(
+                f"  {op_type} kernel on {accelerator} ({nodes} nodes): saves {saved:.1f} us{'' if analyzed else ' (no cost analysis, memory time only)'}"
+            )
+        return placement
+
+    def add_energy(self):
+        compute, sram, dram = self.energy_model.node_energy(self.ops_attributes)
+        for key, energy in zip(
+            ENERGY_STAT_KEYS, (compute, sram, dram, compute + sram + dram)
+        ):
+            self.ops_attributes.add_column(key, np.float64)[:] = energy * 1e-6
+            self.ops_attributes.show(key)
+        total = self.ops_attributes.total("Energy (uJ)")
+        power = (
+            f", {total / self.roofline.total * 1e-6:.2f} W at the roofline latency"
+            if self.roofline and self.roofline.total
+            else ""
+        )
+        print(
+            f"Energy ({self.energy_model.name or 'energy model'}): {total:.1f} uJ per inference ({compute.sum() * 1e-6:.1f} compute, {sram.sum() * 1e-6:.1f} SRAM, {dram.sum() * 1e-6:.1f} DRAM), {1e6 / total if total else 0:.1f} inferences/J{power}"
+        )
+        return total
 
     def save_model(self):
+        if self.schedule and self.schedule.order != self.schedule.file_order:
+            print("Writing the nodes in the scheduled order")
+            reorder_nodes(self.model.graph, self.schedule.order)
         print(
             f"Export model to {os.path.splitext(os.path.basename((self.onnx_filename))[0] + '_opt.onnx')}"
         )
+        if self.mmap_weights:
+            # The external data locations are relative to the input model, so the weights
+            # have to be pulled in and re-written next to the exported model
+            onnx.load_external_data_for_model(
+                self.model, os.path.dirname(os.path.abspath(self.onnx_filename))
+            )
+            onnx.save(
+                self.model,
+                os.path.splitext(os.path.basename(self.onnx_filename))[0] + "_opt.onnx",
+                save_as_external_data=True,
+                location=os.path.splitext(os.path.basename(self.onnx_filename))[0]
+                + "_opt.onnx.data",
+            )
+            return
         onnx.save(
             self.model,
             os.path.splitext(os.path.basename(self.onnx_filename))[0] + "_opt.onnx",
         )
 
     def generate_report(self):
-        report_generator = ReportGenerator(self.ops_attributes, self.xlsx_filename)
+        extra_sheets = {"Fusion Segments": self.fusion_segment_rows()}
+        if self.delta_report:
+            extra_sheets["Cost Delta"] = self.delta_report
+        if self.shape_sweep:
+            extra_sheets["Shape Sweep"] = self.shape_sweep.rows
+            extra_sheets["Cost Formulas"] = self.shape_sweep.formula_rows(self)
+        if self.schedule:
+            extra_sheets["Schedule"] = self.schedule_rows()
+        if self.arena_plan:
+            extra_sheets["Arena Plan"] = self.arena_plan.rows()
+        if self.memory_sweep:
+            extra_sheets["Memory Sweep"] = self.memory_sweep.rows
+        if self.fused_tiling:
+            extra_sheets["Fused Tiling"] = self.fused_tiling.rows()
+        if self.roofline:
+            extra_sheets["Roofline"] = self.roofline.rows()
+        if self.timeline:
+            extra_sheets["Timeline"] = self.timeline.rows()
+        if self.multicore:
+            extra_sheets["Multi-Core"] = self.multicore.rows(self.cost_unit)
+            extra_sheets["Core Scaling"] = self.multicore.scaling_rows(self.cost_unit)
+        if self.pipeline:
+            extra_sheets["Pipeline Stages"] = self.pipeline.rows(self.cost_unit)
+        if self.placement:
+            extra_sheets["Placement"] = self.placement.rows()
+            extra_sheets["Device Transfers"] = self.placement.transfer_rows()
+            extra_sheets["Kernel Gains"] = self.placement.kernel_gain_rows()
+        if self.energy_model:
+            extra_sheets["Energy"] = energy_rows(self.ops_attributes)
+        if self.memory_levels and "bytes_loaded" in self.ops_attributes.visible:
+            extra_sheets["Memory Hierarchy"] = hierarchy_rows(
+                self.ops_attributes, self.memory_levels
+            )
+        report_generator = ReportGenerator(
+            self.ops_attributes, self.xlsx_filename, extra_sheets
+        )
         print(f"Generate model analysis report to {self.xlsx_filename}")
         report_generator.write_xlsx()
@@ -0,0 +1,205 @@
+import numpy as np
+import onnx
+
+# A stage may cost this much more than the most balanced partition to cut fewer bytes
+BALANCE_TOLERANCE = 0.1
+
+
+class PipelinePartition:
+    """
+    Split of the nodes, in node order, into contiguous pipeline stages, one per device.
+
+    A tensor crosses every cut between its producer and its last consumer, each stage forwarding it to the
+    next. A stage holds the weights of its nodes and has to fit the weight memory limit of a device. The most
+    balanced split (smallest bottleneck stage cost) is found first, then among the splits whose stages all
+    cost at most BALANCE_TOLERANCE more than that bottleneck the one moving the fewest bytes across the cuts
+    is kept. Both are exact dynamic programs over the cut positions
+
+    Attributes:
+    num_stages (int):           Number of stages (at most one per node)
+    cost (array):               Cost of every node
+    cut_bytes (array):          Bytes crossing a cut before every node position (0 before the first node)
+    weight_limit (int):         Weight bytes a stage can hold (0 = unlimited)
+    bounds (list):              (first, end) node positions of every stage, empty when no split fits
+    stage_cost (list):          Cost of every stage
+    stage_weights (list):       Weight bytes of every stage
+    """
+
+    def __init__(self, graph_index, tensor_size, cost, num_stages, weight_limit=0):
+        self.graph_index = graph_index
+        num_nodes = len(graph_index.nodes)
+        self.num_stages = max(min(num_stages, num_nodes), 1)
+        self.cost = np.asarray(cost, dtype=np.float64)
+        self.weight_limit = weight_limit
+        prefix = np.concatenate(([0.0], np.cumsum(self.cost)))
+
+        # Activation bytes crossing each cut: live from after their producer to their last consumer
+        delta = np.zeros(num_nodes + 1)
+        for t, i in graph_index.producer.items():
+            consumers = graph_index.get_consumers(t)
+            last = max(consumers) if consumers else i
+            if last > i:
+                delta[i + 1] += tensor_size.get(t, 0)
+                delta[last + 1] -= tensor_size.get(t, 0)
+        self.cut_bytes = np.cumsum(delta)[: num_nodes + 1]
+        self.cut_bytes[0] = 0
+
+        # Weight bytes of the initializers of every node, a shared initializer is held by every stage using it
+        self.node_weights = [
+            {t for t in node.input if t and graph_index.is_initializer(t)}
+            for node in graph_index.nodes
+        ]
+
+        # Whether the stages [a, b) fit the weight limit for every a < b: their weight bytes are the sizes of the
+        # initializers whose last use before b is at a or after
+        fits = []
+        last_use = {}
+        at = np.zeros(num_nodes)
+        for b in range(1, num_nodes + 1):
+            for t in self.node_weights[b - 1]:
+                if t in last_use:
+                    at[last_use[t]] -= tensor_size.get(t, 0)
+                last_use[t] = b - 1
+                at[b - 1] += tensor_size.get(t, 0)
+            if weight_limit:
+                fits.append(np.cumsum(at[b - 1 :: -1])[::-1] <= weight_limit)
+            else:
+                fits.append(np.ones(b, dtype=bool))
+
+        # Stage count k -> lowest bottleneck / cut bytes over the splits of the first b nodes
+        inf = np.inf
+        bottleneck = np.full((self.num_stages + 1, num_nodes + 1), inf)
+        bottleneck[0, 0] = 0
+        for b in range(1, num_nodes + 1):
+            stage = prefix[b] - prefix[:b]
+            for k in range(1, self.num_stages + 1):
+                candidates = np.where(
+                    fits[b - 1], np.maximum(bottleneck[k - 1, :b], stage), inf
+                )
+                bottleneck[k, b] = candidates.min()
+        best = bottleneck[self.num_stages, num_nodes]
+        self.bounds = []
+        if not np.isfinite(best):
+            self.stage_cost, self.stage_weights = [], []
+            return
+
+        cap = best * (1 + BALANCE_TOLERANCE)
+        moved = np.full((self.num_stages + 1, num_nodes + 1), inf)
+        moved[0, 0] = 0
+        split = np.zeros((self.num_stages + 1, num_nodes + 1), dtype=np.int64)
+        for b in range(1, num_nodes + 1):
+            stage = prefix[b] - prefix[:b]
+            feasible = fits[b - 1] & (stage <= cap)
+            for k in range(1, self.num_stages + 1):
+                candidates = np.where(
+                    feasible, moved[k - 1, :b] + self.cut_bytes[:b], inf
+                )
+                a = int(np.argmin(candidates))
+                moved[k, b] = candidates[a]
+                split[k, b] = a
+
+        end = num_nodes
+        for k in range(self.num_stages, 0, -1):
+            first = int(split[k, end])
+            self.bounds.insert(0, (first, end))
+            end = first
+        self.stage_cost = [
+            float(prefix[end] - prefix[first]) for first, end in self.bounds
+        ]
+        self.stage_weights = [
+            self.weight_bytes(tensor_size, first, end) for first, end in self.bounds
+        ]
+
+    def weight_bytes(self, tensor_size, first, end):
+        weights = set().union(*self.node_weights[first:end])
+        return sum(tensor_size.get(t, 0) for t in weights)
+
+    def bottleneck(self):
+        return max(self.stage_cost) if self.stage_cost else 0.0
+
+    def stage_io(self, first, end):
+        """
+        Tensors a stage receives (produced by earlier stages or model inputs) and sends on (used by later stages
+        or model outputs)
+        """
+        nodes = self.graph_index.nodes[first:end]
+        produced = {t for node in nodes for t in node.output if t}
+        inputs, outputs = [], []
+        for node in nodes:
+            for t in node.input:
+                if (
+                    t
+                    and t not in produced
+                    and t not in inputs
+                    and not self.graph_index.is_initializer(t)
+                ):
+                    inputs.append(t)
+            for t in node.output:
+                if t and (
+                    self.graph_index.is_model_output(t)
+                    or any(j >= end for j in self.graph_index.get_consumers(t))
+                ):
+                    outputs.append(t)
+        return inputs, outputs
+
+    def stage_model(self, model, stage):
+        """
+        Standalone ONNX model of one stage
+        """
+        first, end = self.bounds[stage]
+        nodes = self.graph_index.nodes[first:end]
+        inputs, outputs = self.stage_io(first, end)
+        weights = set().union(*self.node_weights[first:end])
+
+        def value_info(t):
+            tensor = self.graph_index.find_tensor(t)
+            return (
+                tensor
+                if tensor is not None
+                else onnx.helper.make_empty_tensor_value_info(t)
+            )
+
+        produced = {t for node in nodes for t in node.output if t}
+        graph = onnx.helper.make_graph(
+            nodes,
+            f"{model.graph.name}_stage{stage}",
+            [value_info(t) for t in inputs],
+            [value_info(t) for t in outputs],
+            initializer=[
+                initializer
+                for initializer in model.graph.initializer
+                if initializer.name in weights
+            ],
+            value_info=[
+                value_info(t)
+                for t in produced
+                if t not in outputs and self.graph_index.find_tensor(t) is not None
+            ],
+        )
+        return onnx.helper.make_model(
+            graph, opset_imports=model.opset_import, ir_version=model.ir_version
+        )
+
+    def rows(self, unit):
+        rows = []
+        for stage, (first, end) in enumerate(self.bounds):
+            inputs, outputs = self.stage_io(first, end)
+            rows.append(
+                {
+                    "Stage": stage,
+                    "First Node": self.graph_index.nodes[first].name,
+                    "Last Node": self.graph_index.nodes[end - 1].name,
+                    "Nodes": end - first,
+                    f"Cost ({unit})": self.stage_cost[stage],
+                    "Share of Bottleneck": (
+                        self.stage_cost[stage] / self.bottleneck()
+                        if self.bottleneck()
+                        else 0.0
+                    ),
+                    "Weight bytes": self.stage_weights[stage],
+                    "Bytes In": int(self.cut_bytes[first]),
+                    "Inputs": ", ".join(inputs),
+                    "Outputs": ", ".join(outputs),
+                }
+            )
+        return rows
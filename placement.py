@@ -0,0 +1,387 @@
+import json
+import os
+from collections import deque
+
+import numpy as np
+
+from hw_profile import HardwareProfile
+from roofline import Roofline
+
+
+class FlowGraph:
+    """
+    Max-flow / min-cut by Dinic's algorithm over float capacities
+    """
+
+    def __init__(self, num_vertices):
+        self.num_vertices = num_vertices
+        self.edges = []  # [to, capacity], the reverse of edge e is e ^ 1
+        self.adjacent = [[] for _ in range(num_vertices)]
+
+    def add_edge(self, u, v, capacity):
+        self.adjacent[u].append(len(self.edges))
+        self.edges.append([v, capacity])
+        self.adjacent[v].append(len(self.edges))
+        self.edges.append([u, 0.0])
+
+    def levels(self, source, eps):
+        level = [-1] * self.num_vertices
+        level[source] = 0
+        queue = deque([source])
+        while queue:
+            u = queue.popleft()
+            for e in self.adjacent[u]:
+                v, capacity = self.edges[e]
+                if capacity > eps and level[v] < 0:
+                    level[v] = level[u] + 1
+                    queue.append(v)
+        return level
+
+    def min_cut(self, source, sink, eps=1e-12):
+        """
+        Returns:
+            (float, list): cut capacity, whether every vertex is on the source side
+        """
+        flow = 0.0
+        while True:
+            level = self.levels(source, eps)
+            if level[sink] < 0:
+                break
+            next_edge = [0] * self.num_vertices
+            while True:
+                # Blocking flow, one augmenting path of the level graph at a time
+                path = []
+                u = source
+                while u != sink:
+                    while next_edge[u] < len(self.adjacent[u]):
+                        e = self.adjacent[u][next_edge[u]]
+                        v, capacity = self.edges[e]
+                        if capacity > eps and level[v] == level[u] + 1:
+                            break
+                        next_edge[u] += 1
+                    else:
+                        if u == source:
+                            break
+                        # Dead end, retreat
+                        level[u] = -1
+                        e = path.pop()
+                        u = self.edges[e ^ 1][0]
+                        continue
+                    path.append(e)
+                    u = v
+                if u != sink:
+                    break
+                pushed = min(self.edges[e][1] for e in path)
+                for e in path:
+                    self.edges[e][1] -= pushed
+                    self.edges[e ^ 1][1] += pushed
+                flow += pushed
+        reachable = self.levels(source, eps)
+        return flow, [level >= 0 for level in reachable]
+
+
+class Device:
+    """
+    One device of the placement
+
+    Attributes:
+    name (str):                 Device name
+    hw_profile (Class):         HardwareProfile giving the roofline latency of the nodes on the device
+    ops (set):                  Op types the device runs (None = every op with a handler)
+    """
+
+    def __init__(self, name, hw_profile, ops=None):
+        self.name = name
+        self.hw_profile = hw_profile
+        self.ops = set(ops) if ops is not None else None
+
+    def supports(self, op_type, analyzed):
+        return analyzed and (self.ops is None or op_type in self.ops)
+
+
+def load_placement_config(filename):
+    """
+    Devices of the placement from a JSON file, hw_profile paths are relative to it:
+
+    {
+        "host": "cpu",
+        "devices": {
+            "cpu": {"hw_profile": "cpu.json"},
+            "npu": {"hw_profile": "npu.json", "ops": ["Conv", "Relu", "Add", "MaxPool"]}
+        },
+        "link_bandwidth_gbps": 8,
+        "link_latency_us": 2
+    }
+
+    Returns:
+        (Device, Device, float, float): host, accelerator, link bandwidth in bytes/s, latency per transfer in us
+    """
+    with open(filename) as f:
+        config = json.load(f)
+    base_dir = os.path.dirname(os.path.abspath(filename))
+    if len(config["devices"]) != 2 or config["host"] not in config["devices"]:
+        raise ValueError(
+            "The placement config needs the host and one accelerator device"
+        )
+    devices = {}
+    for name, device in config["devices"].items():
+        profile = device["hw_profile"]
+        devices[name] = Device(
+            name,
+            (
+                HardwareProfile(profile)
+                if isinstance(profile, dict)
+                else HardwareProfile.load(os.path.join(base_dir, profile))
+            ),
+            device.get("ops"),
+        )
+    host = devices.pop(config["host"])
+    (accelerator,) = devices.values()
+    return (
+        host,
+        accelerator,
+        config["link_bandwidth_gbps"] * 1e9,
+        config.get("link_latency_us", 0.0),
+    )
+
+
+class Placement:
+    """
+    Assignment of every node to the host or the accelerator minimizing the model latency, nodes running one after
+    another: the roofline latency of every node on its device plus the transfers between the devices.
+
+    The host runs every node, the unanalyzed ones (DefaultHandler) included. The accelerator runs the analyzed
+    nodes of its op types. A tensor is copied once to the other device when any of its consumers is there, the
+    model inputs and outputs live on the host and the weights are preloaded on both. Every tensor is a hyperedge
+    joining its producer and consumers, cut at the cost of its copy, so the optimal placement of the two devices
+    is a minimum s-t cut (source side on the host)
+
+    Attributes:
+    host (Class):               Host Device
+    accelerator (Class):        Accelerator Device
+    cost (dict):                Device name -> roofline latency of every node on it in us
+    on_accelerator (array):     Whether every node runs on the accelerator
+    compute_time (float):       Latency of the nodes on their devices in us
+    transfer_time (float):      Latency of the transfers between the devices in us
+    transfers (list):           (tensor, from device, to device, bytes) of every copy between the devices
+    host_only_time (float):     Latency with every node on the host in us
+    gains (list):               (op type, nodes, analyzed, latency saved in us) of every op type the accelerator
+                                lacks, from kernel_gains()
+    """
+
+    def __init__(
+        self,
+        graph_index,
+        ops_attributes,
+        tensor_size,
+        host,
+        accelerator,
+        link_bandwidth,
+        link_latency,
+    ):
+        self.graph_index = graph_index
+        self.ops_attributes = ops_attributes
+        self.tensor_size = tensor_size
+        self.host = host
+        self.accelerator = accelerator
+        self.link_bandwidth = link_bandwidth
+        self.link_latency = link_latency
+        self.op_types = ops_attributes.column("Op Type")
+        self.analyzed = ops_attributes.column("Supported")
+        self.cost = {
+            device.name: Roofline(device.hw_profile, ops_attributes).latency * 1e6
+            for device in (host, accelerator)
+        }
+        self.host_only_time = float(self.cost[host.name].sum())
+        self.place(self.accelerator_ops())
+        self.gains = self.kernel_gains()
+
+    def accelerator_ops(self, extra_ops=()):
+        """
+        Whether every node can run on the accelerator, with extra_ops added to its op types
+        """
+        return np.array(
+            [
+                self.accelerator.supports(op_type, analyzed) or op_type in extra_ops
+                for op_type, analyzed in zip(self.op_types, self.analyzed)
+            ],
+            dtype=bool,
+        )
+
+    def copy_time(self, num_bytes):
+        return self.link_latency + num_bytes / self.link_bandwidth * 1e6
+
+    def hyperedges(self):
+        """
+        (tensor, member nodes, whether the host holds it too) of every tensor moving between nodes
+        """
+        graph_index = self.graph_index
+        edges = []
+        for t, producer in graph_index.producer.items():
+            consumers = graph_index.get_consumers(t)
+            if consumers or graph_index.is_model_output(t):
+                edges.append(
+                    (t, [producer] + list(consumers), graph_index.is_model_output(t))
+                )
+        for t in graph_index.graph_inputs:
+            if not graph_index.is_initializer(t) and graph_index.get_consumers(t):
+                edges.append((t, list(graph_index.get_consumers(t)), True))
+        return edges
+
+    def solve(self, runs_on_accelerator):
+        """
+        Minimum cut placement
+
+        Returns:
+            (float, numpy array): latency in us, whether every node runs on the accelerator
+        """
+        num_nodes = len(self.graph_index.nodes)
+        host_cost = self.cost[self.host.name]
+        accelerator_cost = np.where(
+            runs_on_accelerator, self.cost[self.accelerator.name], np.inf
+        )
+        edges = self.hyperedges()
+        big = (
+            2
+            * (
+                host_cost.sum()
+                + sum(self.copy_time(self.tensor_size.get(t, 0)) for t, _, _ in edges)
+            )
+            + 1
+        )
+
+        source, sink = num_nodes, num_nodes + 1
+        flow_graph = FlowGraph(num_nodes + 2 + 2 * len(edges))
+        for i in range(num_nodes):
+            # A node on the accelerator side cuts its source edge, on the host side its sink edge
+            flow_graph.add_edge(source, i, min(accelerator_cost[i], big))
+            flow_graph.add_edge(i, sink, host_cost[i])
+        for k, (t, members, on_host) in enumerate(edges):
+            edge_in = num_nodes + 2 + 2 * k
+            edge_out = edge_in + 1
+            flow_graph.add_edge(
+                edge_in, edge_out, self.copy_time(self.tensor_size.get(t, 0))
+            )
+            for i in members + ([source] if on_host else []):
+                flow_graph.add_edge(i, edge_in, big)
+                flow_graph.add_edge(edge_out, i, big)
+        total, host_side = flow_graph.min_cut(source, sink)
+        return total, ~np.array(host_side[:num_nodes], dtype=bool)
+
+    def place(self, runs_on_accelerator):
+        _, self.on_accelerator = self.solve(runs_on_accelerator)
+        device = np.where(self.on_accelerator, self.accelerator.name, self.host.name)
+        self.device = device
+        self.compute_time = float(
+            np.where(
+                self.on_accelerator,
+                self.cost[self.accelerator.name],
+                self.cost[self.host.name],
+            ).sum()
+        )
+        self.transfers = []
+        for t, members, on_host in self.hyperedges():
+            producer = self.graph_index.get_producer(t)
+            source_device = device[producer] if producer is not None else self.host.name
+            targets = {device[i] for i in members} | (
+                {self.host.name} if on_host else set()
+            )
+            for target in sorted(targets - {source_device}):
+                self.transfers.append(
+                    (t, source_device, target, self.tensor_size.get(t, 0))
+                )
+        self.transfer_time = sum(
+            self.copy_time(num_bytes) for _, _, _, num_bytes in self.transfers
+        )
+
+    def total_time(self):
+        return self.compute_time + self.transfer_time
+
+    def kernel_gains(self):
+        """
+        Latency saved by running each op type the accelerator lacks on it, one op type at a time. The unanalyzed
+        nodes have no compute counts, so their gain only accounts for their memory time and is optimistic
+
+        Returns:
+            list of (op type, nodes, analyzed, latency saved in us), the largest saving first
+        """
+        total = self.total_time()
+        gains = []
+        for op_type in sorted(set(self.op_types[~self.accelerator_ops()])):
+            nodes = self.op_types == op_type
+            latency, _ = self.solve(self.accelerator_ops(extra_ops={op_type}))
+            gains.append(
+                (
+                    op_type,
+                    int(nodes.sum()),
+                    bool(self.analyzed[nodes].all()),
+                    max(round(total - latency, 6), 0.0),
+                )
+            )
+        return sorted(gains, key=lambda gain: -gain[3])
+
+    def segments(self):
+        """
+        Runs of consecutive nodes on the same device
+
+        Returns:
+            list of (device, first node, end node)
+        """
+        runs = []
+        for i, device in enumerate(self.device):
+            if runs and runs[-1][0] == device:
+                runs[-1][2] = i + 1
+            else:
+                runs.append([device, i, i + 1])
+        return [tuple(run) for run in runs]
+
+    def rows(self):
+        runs_on_accelerator = self.accelerator_ops()
+        bytes_in = {}
+        for t, _, target, num_bytes in self.transfers:
+            for i in self.graph_index.get_consumers(t):
+                if self.device[i] == target:
+                    bytes_in[i] = bytes_in.get(i, 0) + num_bytes
+        return [
+            {
+                "Operator Name": node.name,
+                "Op Type": node.op_type,
+                "Device": self.device[i],
+                f"{self.host.name} (us)": self.cost[self.host.name][i],
+                f"{self.accelerator.name} (us)": (
+                    self.cost[self.accelerator.name][i]
+                    if runs_on_accelerator[i]
+                    else None
+                ),
+                "Transfer bytes in": bytes_in.get(i, 0),
+            }
+            for i, node in enumerate(self.graph_index.nodes)
+        ]
+
+    def transfer_rows(self):
+        return [
+            {
+                "Tensor": t,
+                "Producer": (
+                    self.graph_index.nodes[self.graph_index.get_producer(t)].name
+                    if self.graph_index.get_producer(t) is not None
+                    else "(model input)"
+                ),
+                "From": source,
+                "To": target,
+                "Bytes": num_bytes,
+                "Time (us)": self.copy_time(num_bytes),
+            }
+            for t, source, target, num_bytes in self.transfers
+        ]
+
+    def kernel_gain_rows(self):
+        return [
+            {
+                "Op Type": op_type,
+                "Nodes": nodes,
+                "Analyzed": analyzed,
+                "Latency Saved (us)": saved,
+            }
+            for op_type, nodes, analyzed, saved in self.gains
+        ]
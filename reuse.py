@@ -0,0 +1,293 @@
+import itertools
+
+import numpy as np
+import onnx
+
+# The loops of the nest: X over the output pixels (Conv) or rows (Gemm), K over the output channels or columns
+# and C over the reduction. Each operand is indexed by two of them
+LOOPS = ("X", "K", "C")
+INPUT_LOOPS = {"X", "C"}
+WEIGHT_LOOPS = {"K", "C"}
+OUTPUT_LOOPS = {"X", "K"}
+LOOP_NAMES = {
+    "Conv": {"X": "PQ", "K": "K", "C": "C"},
+    "Gemm": {"X": "M", "K": "N", "C": "K"},
+}
+REUSE_OPS = ("Conv", "Gemm", "MatMul")
+
+
+def tile_sizes(dim):
+    """
+    Tile sizes splitting dim in 1, 2, 4, ... tiles
+    """
+    splits = [1 << k for k in range(int(dim).bit_length())]
+    return np.unique([-(-int(dim) // n) for n in splits])
+
+
+def fetches(order, loops, trips):
+    """
+    Number of tile transfers of the operand indexed by loops, for the loop order outermost first
+    """
+    innermost = max(order.index(loop) for loop in loops)
+    count = 1
+    for position, loop in enumerate(order):
+        if loop in loops or position < innermost:
+            count = count * trips[loop]
+    return count
+
+
+class LoopNest:
+    """
+    Minimum DRAM traffic of one Conv/Gemm/MatMul layer over the loop orders and tile sizes of a blocked loop nest,
+    for one local buffer holding a tile of each operand.
+
+    A tile of an operand is reloaded for every iteration of the loops it does not depend on that run outside the
+    innermost loop it does depend on. When the reduction loop runs outside the innermost output loop the partial
+    sums go back and forth to DRAM: every output tile is written once per reload and read back for all but the
+    first. Conv input tiles include the halo of the kernel window, so neighbouring pixel tiles re-read the
+    overlap. Every order and tile combination fitting the buffer is evaluated and the one moving the fewest bytes
+    (then with the fewest tiles) is kept, when none fits the smallest tiles are reported
+
+    Attributes:
+    op_type (str):              Conv or Gemm (MatMul is modelled as Gemm)
+    order (str):                Loop order of the best nest, outermost first
+    tiles (str):                Tile size of every loop of the best nest
+    fits (bool):                Whether the tiles fit the buffer
+    input_bytes (int):          Input bytes read
+    weight_bytes (int):         Weight bytes read
+    psum_bytes (int):           Partial-sum bytes read back
+    output_bytes (int):         Output bytes written, partial sums included
+    compulsory_bytes (int):     Bytes moved when every operand is read and the output written exactly once
+    """
+
+    def __init__(self, op_type, dims, tile_bytes, operand_bytes, capacity, repeat=1):
+        """
+        Args:
+            op_type (str):          Conv or Gemm
+            dims (dict):            Loop -> extent, X being a list of (tile, trips) candidates
+            tile_bytes (callable):  (X tiles, K tiles, C tiles) -> (input, weight, output) tile bytes arrays
+            operand_bytes (tuple):  (input, weight, output) bytes of one repetition
+            capacity (int):         Buffer size in bytes
+            repeat (int):           Independent repetitions of the nest (groups, batched MatMul)
+        """
+        self.op_type = op_type
+        x_candidates = dims["X"]
+        x, k, c = np.meshgrid(
+            np.arange(len(x_candidates)),
+            tile_sizes(dims["K"]),
+            tile_sizes(dims["C"]),
+            indexing="ij",
+        )
+        x, k, c = x.ravel(), k.ravel(), c.ravel()
+        x_tile = [x_candidates[i][0] for i in x]
+        trips = {
+            "X": np.array([x_candidates[i][1] for i in x]),
+            "K": -(-dims["K"] // k),
+            "C": -(-dims["C"] // c),
+        }
+        input_tile, weight_tile, output_tile = tile_bytes(x_tile, k, c)
+        footprint = input_tile + weight_tile + output_tile
+        fitting = footprint <= capacity
+        num_tiles = trips["X"] * trips["K"] * trips["C"]
+
+        # (bytes, tiles, order, tile index, per operand traffic) of the best nest, fewest tiles among equals
+        best = None
+        for order in itertools.permutations(LOOPS):
+            input_reads = fetches(order, INPUT_LOOPS, trips) * input_tile
+            weight_reads = fetches(order, WEIGHT_LOOPS, trips) * weight_tile
+            output_writes = fetches(order, OUTPUT_LOOPS, trips) * output_tile
+            psum_reads = output_writes - trips["X"] * trips["K"] * output_tile
+            total = input_reads + weight_reads + output_writes + psum_reads
+            if fitting.any():
+                candidates = np.flatnonzero(fitting)
+                i = candidates[
+                    np.lexsort((num_tiles[candidates], total[candidates]))[0]
+                ]
+            else:
+                i = int(np.argmin(footprint))
+            if best is None or (total[i], num_tiles[i]) < best[:2]:
+                best = (
+                    total[i],
+                    num_tiles[i],
+                    order,
+                    i,
+                    (input_reads[i], weight_reads[i], psum_reads[i], output_writes[i]),
+                )
+
+        _, _, order, i, traffic = best
+        names = LOOP_NAMES[op_type]
+        tile = {"X": x_tile[i], "K": int(k[i]), "C": int(c[i])}
+        self.order = ",".join(names[loop] for loop in order)
+        self.tiles = ",".join(
+            f"{names[loop]}={'x'.join(str(t) for t in np.atleast_1d(tile[loop]))}"
+            for loop in LOOPS
+        )
+        self.fits = bool(fitting[i])
+        self.input_bytes, self.weight_bytes, self.psum_bytes, self.output_bytes = (
+            int(np.ceil(repeat * t)) for t in traffic
+        )
+        self.compulsory_bytes = int(np.ceil(repeat * sum(operand_bytes)))
+        self.compulsory_output_bytes = int(np.ceil(repeat * operand_bytes[2]))
+
+    def dram_bytes(self):
+        return (
+            self.input_bytes + self.weight_bytes + self.psum_bytes + self.output_bytes
+        )
+
+    def extra_bytes(self):
+        """
+        (loaded, stored) bytes on top of reading every operand and writing the output once
+        """
+        loaded = self.input_bytes + self.weight_bytes + self.psum_bytes
+        compulsory_loaded = self.compulsory_bytes - self.compulsory_output_bytes
+        return (
+            max(loaded - compulsory_loaded, 0),
+            max(self.output_bytes - self.compulsory_output_bytes, 0),
+        )
+
+
+def operand_shape(graph_index, tensor_name):
+    tensor = graph_index.find_tensor(tensor_name)
+    if tensor is not None:
+        return graph_index.get_shape(tensor)
+    initializer = graph_index.find_initializer(tensor_name)
+    return list(initializer.dims) if initializer is not None else []
+
+
+def element_bytes(tensor_size, tensor_name, shape):
+    return tensor_size.get(tensor_name, 0) / max(np.prod(shape), 1)
+
+
+def conv_nest(graph_index, tensor_size, node, capacity):
+    attr = {a.name: onnx.helper.get_attribute_value(a) for a in node.attribute}
+    in_shape = operand_shape(graph_index, node.input[0])
+    weight_shape = operand_shape(graph_index, node.input[1])
+    out_shape = operand_shape(graph_index, node.output[0])
+    if len(in_shape) != 4 or len(weight_shape) != 4 or len(out_shape) != 4:
+        return None
+    batch, _, height, width = in_shape
+    _, channels, rows, cols = out_shape
+    group = attr.get("group", 1)
+    kernel = weight_shape[2:]
+    strides = attr.get("strides", (1, 1))
+    dilations = attr.get("dilations", (1, 1))
+    in_channels = weight_shape[1]
+    out_channels = channels // group
+
+    in_bytes = element_bytes(tensor_size, node.input[0], in_shape)
+    weight_bytes = element_bytes(tensor_size, node.input[1], weight_shape)
+    out_bytes = element_bytes(tensor_size, node.output[0], out_shape)
+
+    # Pixel tiles of one image, the images of the batch are separate trips
+    x_candidates = [
+        ((p, q), batch * -(-rows // p) * -(-cols // q))
+        for p in tile_sizes(rows)
+        for q in tile_sizes(cols)
+    ]
+
+    def tile_bytes(x_tile, k, c):
+        p = np.array([tile[0] for tile in x_tile])
+        q = np.array([tile[1] for tile in x_tile])
+        in_rows = np.minimum(
+            (p - 1) * strides[0] + (kernel[0] - 1) * dilations[0] + 1, height
+        )
+        in_cols = np.minimum(
+            (q - 1) * strides[1] + (kernel[1] - 1) * dilations[1] + 1, width
+        )
+        return (
+            c * in_rows * in_cols * in_bytes,
+            k * c * kernel[0] * kernel[1] * weight_bytes,
+            k * p * q * out_bytes,
+        )
+
+    operand_bytes = (
+        batch * in_channels * height * width * in_bytes,
+        out_channels * in_channels * kernel[0] * kernel[1] * weight_bytes,
+        batch * out_channels * rows * cols * out_bytes,
+    )
+    return LoopNest(
+        "Conv",
+        {"X": x_candidates, "K": out_channels, "C": in_channels},
+        tile_bytes,
+        operand_bytes,
+        capacity,
+        group,
+    )
+
+
+def gemm_nest(graph_index, tensor_size, node, capacity):
+    attr = {a.name: onnx.helper.get_attribute_value(a) for a in node.attribute}
+    a_shape = operand_shape(graph_index, node.input[0])
+    b_shape = operand_shape(graph_index, node.input[1])
+    out_shape = operand_shape(graph_index, node.output[0])
+    if len(a_shape) < 2 or len(b_shape) < 2 or len(out_shape) < 2:
+        return None
+    if attr.get("transA", 0):
+        a_shape = a_shape[:-2] + a_shape[:-3:-1]
+    if attr.get("transB", 0):
+        b_shape = b_shape[:-2] + b_shape[:-3:-1]
+    reduction = a_shape[-1]
+    columns = b_shape[-1]
+
+    # A batched right operand makes independent products, a shared one is reused by all the batch rows
+    repeat = int(np.prod(b_shape[:-2]))
+    rows = int(np.prod(out_shape[:-1])) // repeat
+
+    a_bytes = element_bytes(tensor_size, node.input[0], a_shape)
+    b_bytes = element_bytes(tensor_size, node.input[1], b_shape)
+    out_bytes = element_bytes(tensor_size, node.output[0], out_shape)
+
+    x_candidates = [(m, -(-rows // m)) for m in tile_sizes(rows)]
+
+    def tile_bytes(x_tile, n, k):
+        m = np.array(x_tile)
+        return m * k * a_bytes, k * n * b_bytes, m * n * out_bytes
+
+    operand_bytes = (
+        rows * reduction * a_bytes,
+        reduction * columns * b_bytes,
+        rows * columns * out_bytes,
+    )
+    return LoopNest(
+        "Gemm",
+        {"X": x_candidates, "K": columns, "C": reduction},
+        tile_bytes,
+        operand_bytes,
+        capacity,
+        repeat,
+    )
+
+
+def layer_nest(graph_index, tensor_size, node, capacity):
+    """
+    Best LoopNest of a Conv/Gemm/MatMul node, None for other ops and unknown shapes
+    """
+    if node.op_type == "Conv":
+        return conv_nest(graph_index, tensor_size, node, capacity)
+    if node.op_type in ("Gemm", "MatMul"):
+        return gemm_nest(graph_index, tensor_size, node, capacity)
+    return None
+
+
+def reuse_nests(graph_index, tensor_size, capacity):
+    """
+    (node index, best LoopNest) of every Conv/Gemm/MatMul node with known shapes
+    """
+    for i, node in enumerate(graph_index.nodes):
+        if node.op_type not in REUSE_OPS:
+            continue
+        nest = layer_nest(graph_index, tensor_size, node, capacity)
+        if nest is not None:
+            yield i, nest
+
+
+def reuse_traffic(graph_index, tensor_size, capacity):
+    """
+    Extra (bytes loaded, bytes stored) of the best Conv/Gemm/MatMul loop nests for the buffer size
+    """
+    extra_loaded = extra_stored = 0
+    for _, nest in reuse_nests(graph_index, tensor_size, capacity):
+        loaded, stored = nest.extra_bytes()
+        extra_loaded += loaded
+        extra_stored += stored
+    return extra_loaded, extra_stored
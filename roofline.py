@@ -0,0 +1,108 @@
+import numpy as np
+
+from hw_profile import PRIMITIVE_COLUMNS
+
+
+class Roofline:
+    """
+    Roofline latency of every node for a hardware profile: the longest of its compute time (busiest unit), its
+    DRAM time (bytes_loaded + bytes_stored of the memory simulation over the DRAM bandwidth) and its local memory
+    time (input, weight and output bytes over the SRAM bandwidth). The nodes run one after another, so the model
+    latency is the sum of the node latencies
+
+    Attributes:
+    names (list):               Node names
+    op_types (list):            Node op types
+    unit_time (dict):           Unit -> seconds it is busy per node
+    compute_time (array):       Seconds per node on the busiest unit
+    dram_time (array):          Seconds per node moving its DRAM bytes
+    sram_time (array):          Seconds per node reading/writing its operands in local memory
+    latency (array):            Seconds per node
+    bound (array):              "compute", "DRAM" or "SRAM", whichever sets the latency of the node
+    intensity (array):          Primitive operations per DRAM byte
+    total (float):              Model latency in seconds
+    """
+
+    def __init__(self, hw_profile, ops_attributes):
+        self.names = list(ops_attributes.column("Operator Name"))
+        self.op_types = list(ops_attributes.column("Op Type"))
+        num_nodes = len(ops_attributes)
+        self.unit_time = {
+            unit: cycles / hw_profile.clock_hz
+            for unit, cycles in hw_profile.unit_cycles(ops_attributes).items()
+        }
+        self.compute_time = (
+            np.max(list(self.unit_time.values()), axis=0)
+            if self.unit_time
+            else np.zeros(num_nodes)
+        )
+        dram_bytes = ops_attributes.column("bytes_loaded") + ops_attributes.column(
+            "bytes_stored"
+        )
+        self.dram_time = dram_bytes / hw_profile.dram_bandwidth
+        if hw_profile.sram_bandwidth:
+            sram_bytes = (
+                ops_attributes.column("Input Size (bytes)")
+                + ops_attributes.column("Weight Size (bytes)")
+                + ops_attributes.column("Output Size (bytes)")
+            )
+            self.sram_time = sram_bytes / hw_profile.sram_bandwidth
+        else:
+            self.sram_time = np.zeros(num_nodes)
+
+        times = np.stack([self.compute_time, self.dram_time, self.sram_time])
+        self.latency = times.max(axis=0)
+        self.bound = np.array(["compute", "DRAM", "SRAM"], dtype=object)[
+            times.argmax(axis=0)
+        ]
+        ops = sum(
+            ops_attributes.column(column) for column in PRIMITIVE_COLUMNS.values()
+        )
+        self.intensity = np.divide(
+            ops, dram_bytes, out=np.full(num_nodes, np.inf), where=dram_bytes > 0
+        )
+        self.total = float(self.latency.sum())
+
+    def bottlenecks(self, count=None):
+        """
+        Node indices by decreasing latency
+        """
+        return np.argsort(-self.latency, kind="stable")[:count]
+
+    def bound_share(self):
+        """
+        Fraction of the model latency spent in compute-, DRAM- and SRAM-bound nodes
+        """
+        return {
+            bound: (
+                float(self.latency[self.bound == bound].sum() / self.total)
+                if self.total
+                else 0.0
+            )
+            for bound in ("compute", "DRAM", "SRAM")
+        }
+
+    def rows(self):
+        """
+        One row per node, the slowest first
+        """
+        rows = []
+        for rank, i in enumerate(self.bottlenecks(), 1):
+            row = {
+                "Rank": rank,
+                "Operator Name": self.names[i],
+                "Op Type": self.op_types[i],
+                "Latency (us)": self.latency[i] * 1e6,
+                "Share of Total": self.latency[i] / self.total if self.total else 0.0,
+                "Bound": self.bound[i],
+                "Compute (us)": self.compute_time[i] * 1e6,
+                "DRAM (us)": self.dram_time[i] * 1e6,
+                "SRAM (us)": self.sram_time[i] * 1e6,
+                "Ops per DRAM byte": (
+                    self.intensity[i] if np.isfinite(self.intensity[i]) else None
+                ),
+            }
+            for unit, time in self.unit_time.items():
+                row[f"{unit} (us)"] = time[i] * 1e6
+            rows.append(row)
+        return rows
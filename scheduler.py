@@ -0,0 +1,255 @@
+import onnx
+
+# Largest window solved exactly, the DP visits up to 2^window subsets of the window nodes
+MAX_EXACT_WINDOW = 20
+
+
+class FootprintState:
+    """
+    Live tensors while nodes are executed in some topological order. A tensor is live from its producer (model
+    inputs and initializers from their first consumer, when they are loaded) until its last consumer has run,
+    tensors nothing consumes are released right after their producer
+
+    Attributes:
+    born (set):                 Tensors that have been produced or loaded
+    remaining (dict):           Tensor name -> number of consumer nodes not executed yet
+    live (int):                 Bytes of the live tensors
+    """
+
+    def __init__(self, schedule):
+        self.schedule = schedule
+        self.born = set()
+        self.remaining = dict(schedule.num_consumers)
+        self.live = 0
+
+    def cost(self, v):
+        """
+        Returns (bytes live while node v runs, bytes live once it is done)
+        """
+        schedule = self.schedule
+        during = self.live
+        freed = 0
+        for t in schedule.inputs[v]:
+            if t not in self.born:
+                during += schedule.size(t)
+            if self.remaining[t] == 1:
+                freed += schedule.size(t)
+        for t in schedule.outputs[v]:
+            during += schedule.size(t)
+            if not self.remaining.get(t):
+                freed += schedule.size(t)
+        return during, during - freed
+
+    def apply(self, v):
+        during, self.live = self.cost(v)
+        for t in self.schedule.inputs[v]:
+            self.born.add(t)
+            self.remaining[t] -= 1
+        self.born.update(self.schedule.outputs[v])
+        return during
+
+
+class Schedule:
+    """
+    Search a topological order of the nodes that minimizes the peak local memory footprint.
+
+    The default search is a greedy list scheduler: among the ready nodes it runs the one growing the live bytes
+    the least (freeing the most), ties broken by file order. With exact_window the greedy order is then cut into
+    windows of that many nodes and each window is reordered optimally with a DP over the subsets of its nodes,
+    pruned by the greedy peak (branch and bound). The live set after a window only depends on which nodes ran, not
+    their order, so every window is solved independently and the result is never worse than the greedy order.
+    The file order is kept when no order beats it
+
+    Attributes:
+    file_order (list):          Node indices in file order
+    order (list):               Best order found
+    file_peak (int):            Peak footprint in file order (bytes)
+    peak (int):                 Peak footprint of order (bytes)
+    profile (list):             Bytes live while each node of order runs
+    """
+
+    def __init__(self, graph_index, tensor_size, exact_window=0):
+        self.tensor_size = tensor_size
+        self.num_nodes = len(graph_index.nodes)
+        self.inputs = [
+            list(dict.fromkeys(t for t in node.input if t))
+            for node in graph_index.nodes
+        ]
+        self.outputs = [[t for t in node.output if t] for node in graph_index.nodes]
+        self.num_consumers = {}
+        for inputs in self.inputs:
+            for t in inputs:
+                self.num_consumers[t] = self.num_consumers.get(t, 0) + 1
+
+        self.successors = [set() for _ in range(self.num_nodes)]
+        self.num_predecessors = [0] * self.num_nodes
+        for v, inputs in enumerate(self.inputs):
+            predecessors = {
+                graph_index.producer[t] for t in inputs if t in graph_index.producer
+            }
+            predecessors.discard(v)
+            self.num_predecessors[v] = len(predecessors)
+            for u in predecessors:
+                self.successors[u].add(v)
+
+        self.file_order = list(range(self.num_nodes))
+        self.file_peak = self.peak_footprint(self.file_order)
+
+        order = self.greedy_order()
+        if exact_window > 1:
+            order = self.refine_order(order, min(exact_window, MAX_EXACT_WINDOW))
+        self.profile = self.footprint_profile(order)
+        self.peak = max(self.profile, default=0)
+        if self.peak >= self.file_peak:
+            self.order = self.file_order
+            self.profile = self.footprint_profile(self.file_order)
+            self.peak = self.file_peak
+        else:
+            self.order = order
+
+    def size(self, tensor_name):
+        return self.tensor_size.get(tensor_name, 0)
+
+    def footprint_profile(self, order):
+        state = FootprintState(self)
+        return [state.apply(v) for v in order]
+
+    def peak_footprint(self, order):
+        return max(self.footprint_profile(order), default=0)
+
+    def greedy_order(self):
+        state = FootprintState(self)
+        num_predecessors = list(self.num_predecessors)
+        ready = [v for v in range(self.num_nodes) if num_predecessors[v] == 0]
+        order = []
+        while ready:
+
+            def priority(v):
+                during, after = state.cost(v)
+                return after - state.live, during, v
+
+            v = min(ready, key=priority)
+            ready.remove(v)
+            state.apply(v)
+            order.append(v)
+            for w in self.successors[v]:
+                num_predecessors[w] -= 1
+                if num_predecessors[w] == 0:
+                    ready.append(w)
+        return order
+
+    def refine_order(self, order, window):
+        state = FootprintState(self)
+        refined = []
+        for start in range(0, len(order), window):
+            nodes = self.refine_window(state, order[start : start + window])
+            for v in nodes:
+                state.apply(v)
+            refined += nodes
+        return refined
+
+    def refine_window(self, state, nodes):
+        """
+        Optimal order of the window nodes given the live set before the window, DP over subsets of the window
+        """
+        k = len(nodes)
+        bit = {v: 1 << i for i, v in enumerate(nodes)}
+        predecessor_mask = [0] * k
+        for i, u in enumerate(nodes):
+            for w in self.successors[u]:
+                if w in bit:
+                    predecessor_mask[nodes.index(w)] |= bit[u]
+
+        # Per tensor touched by the window: window consumers, window producer and the state before the window
+        consumer_mask = {}
+        producer_bit = {}
+        for v in nodes:
+            for t in self.inputs[v]:
+                consumer_mask[t] = consumer_mask.get(t, 0) | bit[v]
+            for t in self.outputs[v]:
+                producer_bit[t] = bit[v]
+
+        def is_born(t, mask):
+            return (
+                t in state.born
+                or producer_bit.get(t, 0) & mask
+                or (t not in producer_bit and consumer_mask.get(t, 0) & mask)
+            )
+
+        def step(i, mask, live):
+            v = nodes[i]
+            during = live
+            freed = 0
+            done = mask | (1 << i)
+            for t in self.inputs[v]:
+                if not is_born(t, mask):
+                    during += self.size(t)
+                if state.remaining[t] == bin(consumer_mask[t] & done).count("1"):
+                    freed += self.size(t)
+            for t in self.outputs[v]:
+                during += self.size(t)
+                if not state.remaining.get(t):
+                    freed += self.size(t)
+            return during, during - freed
+
+        # Upper bound: the window in its current order
+        bound = 0
+        mask, live = 0, state.live
+        for i in range(k):
+            during, live = step(i, mask, live)
+            bound = max(bound, during)
+            mask |= 1 << i
+
+        full = (1 << k) - 1
+        best = {0: (state.live, state.live, None, None)}
+        layer = [0]
+        for _ in range(k):
+            next_layer = {}
+            for mask in layer:
+                peak, live, _, _ = best[mask]
+                for i in range(k):
+                    if mask >> i & 1 or predecessor_mask[i] & ~mask:
+                        continue
+                    during, after = step(i, mask, live)
+                    new_peak = max(peak, during)
+                    if new_peak >= bound:
+                        continue
+                    new_mask = mask | (1 << i)
+                    if new_mask not in best or new_peak < best[new_mask][0]:
+                        best[new_mask] = (new_peak, after, mask, i)
+                        next_layer[new_mask] = True
+            layer = list(next_layer)
+
+        if full not in best:
+            return nodes
+
+        refined = []
+        mask = full
+        while mask:
+            _, _, previous, i = best[mask]
+            refined.append(nodes[i])
+            mask = previous
+        return refined[::-1]
+
+
+def reorder_nodes(graph, order):
+    """
+    Rewrite graph.node in the given order
+    """
+    nodes = []
+    for i in order:
+        node = onnx.NodeProto()
+        node.CopyFrom(graph.node[i])
+        nodes.append(node)
+    del graph.node[:]
+    graph.node.extend(nodes)
+
+
+def scheduled_graph(model, order):
+    """
+    Light copy of the model with only the reordered nodes and the graph outputs, for the memory simulation
+    """
+    scheduled = onnx.ModelProto()
+    scheduled.graph.node.extend(model.graph.node[i] for i in order)
+    scheduled.graph.output.extend(model.graph.output)
+    return scheduled
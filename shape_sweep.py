@@ -0,0 +1,271 @@
+import re
+import itertools
+from collections import Counter
+from functools import lru_cache
+
+import numpy as np
+import sympy
+from onnx import mapping
+from sympy.parsing.sympy_parser import parse_expr
+
+from node_registry import get_handler
+
+IDENTIFIER = re.compile(r"[A-Za-z_][A-Za-z0-9_]*")
+
+# Functions SymbolicShapeInference writes into the dim_params, e.g. "floor(H/2)"
+DIM_FUNCTIONS = {
+    "floor": sympy.floor,
+    "ceiling": sympy.ceiling,
+    "Max": sympy.Max,
+    "Min": sympy.Min,
+    "Mod": sympy.Mod,
+}
+
+# NodeAttributes cost attributes turned into formulas -> report column
+COST_ATTRIBUTES = {
+    "count_mac": "MAC Count",
+    "count_alu": "ALU Count",
+    "count_exp": "EXP Count",
+    "count_div": "DIV Count",
+    "count_trig": "TRIG Count",
+    "count_sqrt": "SQRT Count",
+    "input_size": "Input Size (bytes)",
+    "weight_size": "Weight Size (bytes)",
+    "output_size": "Output Size (bytes)",
+}
+
+# The cost attributes summed into the recompute cost of a node
+PRIMITIVE_ATTRIBUTES = (
+    "count_mac",
+    "count_alu",
+    "count_exp",
+    "count_div",
+    "count_trig",
+    "count_sqrt",
+)
+
+
+@lru_cache(maxsize=None)
+def dim_expression(dim_param):
+    """
+    Parse a dim_param into a sympy expression over the symbolic dim names, e.g. "batch" or "2*seq_len + 1"
+    as written by SymbolicShapeInference. Every identifier but DIM_FUNCTIONS is forced to a plain Symbol so
+    names like "N" or "S" don't resolve to sympy built-ins, and unparsable names become a single Symbol
+    """
+    local_dict = {
+        name: DIM_FUNCTIONS.get(name, sympy.Symbol(name))
+        for name in IDENTIFIER.findall(dim_param)
+    }
+    try:
+        expression = parse_expr(dim_param, local_dict=local_dict)
+        if isinstance(expression, sympy.Expr):
+            return expression
+    except Exception:
+        pass
+    return sympy.Symbol(dim_param)
+
+
+def parse_sweep_grid(sweep_spec):
+    """
+    Expand "batch=1,2,4;seq_len=128,256" into the cartesian product of the listed values
+
+    Returns:
+        grid (dict): dim name -> numpy array with one value per grid point
+    """
+    names = []
+    values = []
+    for entry in sweep_spec.split(";"):
+        if not entry.strip():
+            continue
+        name, dim_values = entry.split("=")
+        names.append(name.strip())
+        values.append([int(v) for v in dim_values.split(",")])
+
+    points = np.array(list(itertools.product(*values)), dtype=np.int64)
+    return {name: points[:, i] for i, name in enumerate(names)}
+
+
+def sweep_point(sweep_spec):
+    """
+    Dim values of the first grid point, the fixed-shape pass of a sweep is run at this point
+    """
+    return {
+        name: int(values[0]) for name, values in parse_sweep_grid(sweep_spec).items()
+    }
+
+
+def fixed_dim(dim_param, dim_values):
+    """
+    Value of a dim_param with its symbolic dims set from dim_values, the dims missing from it as 1
+    """
+    expression = dim_expression(dim_param)
+    return int(
+        expression.subs(
+            {
+                symbol: dim_values.get(str(symbol), 1)
+                for symbol in expression.free_symbols
+            }
+        )
+    )
+
+
+class ShapeSweep:
+    """
+    Evaluate the model costs over a grid of symbolic dim values from a single analysis pass.
+
+    The handlers are re-run once over a symbolic view of the graph index, so every cost comes out as a
+    sympy formula over the symbolic dims (batch, seq_len, H, W, ...). Each distinct formula is then
+    lambdified and evaluated over the whole grid at once. The memory simulation depends on the actual
+    sizes, so MemTracker is re-run per grid point with the evaluated tensor sizes and primitive ops (for
+    --recompute) and the --reuse loop nests at the point shapes, without re-running shape inference.
+    The regular fixed-shape pass runs at the first grid point (see sweep_point)
+
+    Attributes:
+    grid (dict):                Dim name -> value per grid point
+    num_points (int):           Number of grid points
+    symbols (list):             sympy Symbols of the grid dims, in grid order
+    unbound_symbols (set):      Symbols found in the formulas but missing in the grid, evaluated as 1
+    formulas (list):            Per-node dict of report column -> formula
+    rows (list):                Per-grid-point model totals
+    """
+
+    def __init__(self, model_stats, sweep_spec):
+        self.grid = parse_sweep_grid(sweep_spec)
+        self.num_points = len(next(iter(self.grid.values())))
+        self.symbols = [sympy.Symbol(name) for name in self.grid]
+        self.unbound_symbols = set()
+        self.evaluated = {}
+
+        print(f"Sweeping {self.num_points} shape combinations of {list(self.grid)}...")
+        self.formulas = self.build_formulas(model_stats)
+        self.rows = self.evaluate(model_stats)
+        if self.unbound_symbols:
+            print(
+                f"Symbolic dims missing in the sweep are evaluated as 1: {sorted(map(str, self.unbound_symbols))}"
+            )
+
+    def build_formulas(self, model_stats):
+        graph_index = model_stats.graph_index.symbolic_view()
+
+        formulas = []
+        for i, node in enumerate(graph_index.nodes):
+            try:
+                attributes = get_handler(node.op_type).handle(graph_index, node)
+                node_formulas = {
+                    column: getattr(attributes, name)
+                    for name, column in COST_ATTRIBUTES.items()
+                }
+            except Exception as e:
+                # Fall back to the fixed-shape costs of the regular pass
+                print(f"{node.name} has no symbolic cost formula ({e})")
+                node_formulas = {
+                    column: model_stats.ops_attributes[i][column]
+                    for column in COST_ATTRIBUTES.values()
+                }
+            formulas.append(node_formulas)
+        return formulas
+
+    def tensor_size_formula(self, model_stats, tensor_name):
+        """
+        Same as ModelStats.build_tensor_size_map, with symbolic dims kept and unknown dims as 1
+        """
+        tensor = model_stats.graph_index.find_tensor(tensor_name)
+        if tensor is None:
+            return model_stats.tensor_size[tensor_name]
+
+        tensor_type = tensor.type.tensor_type
+        size = np.dtype(mapping.TENSOR_TYPE_TO_NP_TYPE[tensor_type.elem_type]).itemsize
+        for dim in tensor_type.shape.dim:
+            if dim.dim_value > 0:
+                size *= dim.dim_value
+            elif dim.dim_param:
+                size *= dim_expression(dim.dim_param)
+        return size
+
+    def evaluate_formula(self, formula):
+        """
+        Evaluate a formula over all grid points at once, distinct formulas are evaluated only once
+        """
+        if formula in self.evaluated:
+            return self.evaluated[formula]
+
+        if isinstance(formula, sympy.Basic) and formula.free_symbols:
+            expression = formula
+            unbound = expression.free_symbols - set(self.symbols)
+            if unbound:
+                self.unbound_symbols |= unbound
+                expression = expression.subs({symbol: 1 for symbol in unbound})
+            function = sympy.lambdify(self.symbols, expression, "numpy")
+            values = function(*self.grid.values())
+        else:
+            values = float(formula)
+
+        result = np.broadcast_to(np.asarray(values, dtype=np.float64), self.num_points)
+        self.evaluated[formula] = result
+        return result
+
+    def evaluate_sum(self, formulas):
+        # Identical formulas (e.g. repeated blocks) are evaluated once and scaled by their count
+        total = np.zeros(self.num_points)
+        for formula, count in Counter(formulas).items():
+            total += count * self.evaluate_formula(formula)
+        return total
+
+    def evaluate(self, model_stats):
+        totals = {
+            column: self.evaluate_sum(
+                node_formulas[column] for node_formulas in self.formulas
+            )
+            for column in COST_ATTRIBUTES.values()
+        }
+
+        tensor_sizes = {
+            tensor_name: self.evaluate_formula(
+                self.tensor_size_formula(model_stats, tensor_name)
+            )
+            for tensor_name in model_stats.tensor_size
+        }
+
+        # Primitive ops of every node at every point, for the --recompute costs
+        node_ops = np.array(
+            [
+                sum(
+                    self.evaluate_formula(node_formulas[COST_ATTRIBUTES[key]])
+                    for key in PRIMITIVE_ATTRIBUTES
+                )
+                for node_formulas in self.formulas
+            ]
+        ).reshape(len(self.formulas), self.num_points)
+
+        rows = []
+        for point in range(self.num_points):
+            dim_values = {
+                name: int(values[point]) for name, values in self.grid.items()
+            }
+            row = dict(dim_values)
+            row.update({column: totals[column][point] for column in totals})
+
+            memory_summary = model_stats.simulate_memory(
+                {name: int(size[point]) for name, size in tensor_sizes.items()},
+                node_ops=node_ops[:, point],
+                dim_values=dim_values,
+            )
+            row["bytes_loaded"] = memory_summary["total_bytes_loaded"]
+            row["bytes_stored"] = memory_summary["total_bytes_stored"]
+            row["Max SRAM footprint"] = memory_summary["max_footprint"]
+            rows.append(row)
+        return rows
+
+    def formula_rows(self, model_stats):
+        """
+        Per-node cost formulas in text form for the report
+        """
+        rows = []
+        for node, node_formulas in zip(model_stats.graph_index.nodes, self.formulas):
+            row = {"Operator Name": node.name, "Op Type": node.op_type}
+            for column, formula in node_formulas.items():
+                row[column] = (
+                    str(formula) if isinstance(formula, sympy.Basic) else formula
+                )
+            rows.append(row)
+        return rows
@@ -0,0 +1,97 @@
+import os
+import math
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor
+
+# Number of elements scanned per task, small enough to keep the per-chunk temporaries in cache
+DEFAULT_CHUNK_ELEMENTS = 1 << 20
+
+# Two-sided 95% confidence for the sampled sparsity estimate
+CONFIDENCE_Z = 1.96
+
+
+def count_zeros(chunk):
+    return chunk.size - np.count_nonzero(chunk)
+
+
+class SparsityEngine:
+    """
+    Compute weight sparsity without a full-size temporary array. The flattened weight is scanned in
+    fixed-size chunks over a thread pool (numpy releases the GIL in count_nonzero), and tensors larger than
+    sample_size can optionally be estimated from a uniform random sample with a confidence bound instead
+
+    Attributes:
+    chunk_elements (int):       Number of elements scanned per task
+    num_threads (int):          Size of the thread pool
+    sample_size (int):          Estimate sparsity from this many sampled elements for larger tensors (0 = exact)
+    seed (int):                 Seed of the sampler so reports are reproducible
+    """
+
+    def __init__(
+        self,
+        sample_size=0,
+        chunk_elements=DEFAULT_CHUNK_ELEMENTS,
+        num_threads=None,
+        seed=0,
+    ):
+        self.sample_size = sample_size
+        self.chunk_elements = chunk_elements
+        self.num_threads = num_threads or min(32, (os.cpu_count() or 1) + 4)
+        self.seed = seed
+        self.executor = None
+
+    def __getstate__(self):
+        # The thread pool is per-process, it is re-created lazily on the other side
+        state = self.__dict__.copy()
+        state["executor"] = None
+        return state
+
+    def get_executor(self):
+        if self.executor is None:
+            self.executor = ThreadPoolExecutor(max_workers=self.num_threads)
+        return self.executor
+
+    def compute(self, weight_tensor):
+        """
+        Returns (sparsity, bound) in percent, bound is 0 for the exact scan and
+        the half-width of the 95% confidence interval for the sampled estimate
+        """
+        # ravel() is a view for the contiguous arrays coming from TensorReader
+        flat = np.ravel(weight_tensor)
+        num_elements = flat.size
+        if num_elements == 0:
+            return -1, 0
+
+        if self.sample_size and num_elements > self.sample_size:
+            return self.estimate(flat)
+
+        if num_elements <= self.chunk_elements:
+            num_zeros = count_zeros(flat)
+        else:
+            chunks = (
+                flat[start : start + self.chunk_elements]
+                for start in range(0, num_elements, self.chunk_elements)
+            )
+            num_zeros = sum(self.get_executor().map(count_zeros, chunks))
+
+        return num_zeros / num_elements * 100, 0
+
+    def estimate(self, flat):
+        """
+        Estimate sparsity as the zero proportion of a uniform sample, the bound is the Wilson score interval
+        half-width (the sample proportion itself is reported, so a fully dense or sparse sample stays 0%/100%)
+        """
+        rng = np.random.default_rng(self.seed)
+        # Sorted indices keep the reads sequential, which matters for mmap'ed weights
+        indices = np.sort(rng.integers(0, flat.size, size=self.sample_size))
+        n = self.sample_size
+        p = count_zeros(flat[indices]) / n
+
+        denominator = 1 + CONFIDENCE_Z**2 / n
+        half_width = (
+            CONFIDENCE_Z
+            * math.sqrt(p * (1 - p) / n + CONFIDENCE_Z**2 / (4 * n * n))
+            / denominator
+        )
+
+        return p * 100, half_width * 100
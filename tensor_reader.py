@@ -0,0 +1,101 @@
+import os
+import mmap
+import numpy as np
+import onnx
+from onnx import TensorProto, mapping
+from onnx.external_data_helper import ExternalDataInfo
+
+# Data types whose raw_data layout is exactly the numpy dtype from TENSOR_TYPE_TO_NP_TYPE,
+# these can be viewed in place without any conversion
+RAW_VIEWABLE_TYPES = {
+    TensorProto.FLOAT,
+    TensorProto.UINT8,
+    TensorProto.INT8,
+    TensorProto.UINT16,
+    TensorProto.INT16,
+    TensorProto.INT32,
+    TensorProto.INT64,
+    TensorProto.BOOL,
+    TensorProto.FLOAT16,
+    TensorProto.DOUBLE,
+    TensorProto.UINT32,
+    TensorProto.UINT64,
+    TensorProto.COMPLEX64,
+    TensorProto.COMPLEX128,
+}
+
+
+class TensorReader:
+    """
+    Resolve initializer data on demand. Initializers stored in the model proto are decoded with numpy_helper,
+    initializers left in external data files (model loaded with load_external_data=False) are viewed through
+    a read-only mmap so only the pages that are actually read become resident
+
+    Attributes:
+    base_dir (str):             Directory the external data locations are relative to (the model directory)
+    mapped_files (dict):        External data location -> mmap object, opened on first access
+    """
+
+    def __init__(self, base_dir):
+        self.base_dir = base_dir
+        self.mapped_files = {}
+
+    def __getstate__(self):
+        # mmap objects can't be pickled, they are re-opened lazily on the other side
+        state = self.__dict__.copy()
+        state["mapped_files"] = {}
+        return state
+
+    def is_external(self, initializer):
+        return (
+            initializer.HasField("data_location")
+            and initializer.data_location == TensorProto.EXTERNAL
+        )
+
+    def map_file(self, location):
+        if location not in self.mapped_files:
+            with open(os.path.join(self.base_dir, location), "rb") as f:
+                self.mapped_files[location] = mmap.mmap(
+                    f.fileno(), 0, access=mmap.ACCESS_READ
+                )
+        return self.mapped_files[location]
+
+    def get_buffer(self, initializer):
+        """
+        Return a zero-copy memoryview over the raw bytes of an external initializer
+        """
+        info = ExternalDataInfo(initializer)
+        buffer = memoryview(self.map_file(info.location))
+        offset = info.offset or 0
+        if info.length:
+            return buffer[offset : offset + info.length]
+        return buffer[offset:]
+
+    def get_array(self, initializer):
+        """
+        Return the initializer content as a numpy array, read-only views for raw and external data.
+        Only the typed data fields (float_data, int32_data, ...) are decoded by numpy_helper
+        """
+        shape = tuple(initializer.dims)
+        if not self.is_external(initializer):
+            if initializer.raw_data and initializer.data_type in RAW_VIEWABLE_TYPES:
+                np_dtype = mapping.TENSOR_TYPE_TO_NP_TYPE[initializer.data_type]
+                return np.frombuffer(initializer.raw_data, dtype=np_dtype).reshape(
+                    shape
+                )
+            return onnx.numpy_helper.to_array(initializer)
+
+        buffer = self.get_buffer(initializer)
+        if initializer.data_type in RAW_VIEWABLE_TYPES:
+            np_dtype = mapping.TENSOR_TYPE_TO_NP_TYPE[initializer.data_type]
+            return np.frombuffer(
+                buffer, dtype=np_dtype, count=int(np.prod(shape))
+            ).reshape(shape)
+
+        # Packed or non-native types (bfloat16, float8, int4, ...) need numpy_helper to unpack them
+        tensor = TensorProto()
+        tensor.CopyFrom(initializer)
+        del tensor.external_data[:]
+        tensor.data_location = TensorProto.DEFAULT
+        tensor.raw_data = bytes(buffer)
+        return onnx.numpy_helper.to_array(tensor)
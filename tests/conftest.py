@@ -0,0 +1,28 @@
+import argparse
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from model_analyzer import add_analysis_arguments
+from onnx_analysis import ModelStats
+
+
+@pytest.fixture
+def analyze(tmp_path):
+    """
+    Run ModelStats with model_analyzer.py command line options, the analysis cache lives in tmp_path
+    """
+
+    def run(*argv):
+        parser = argparse.ArgumentParser()
+        parser.add_argument("--input", "-i", type=str, required=True)
+        add_analysis_arguments(parser)
+        args = parser.parse_args(
+            [str(arg) for arg in argv] + ["--cache-dir", str(tmp_path / "cache")]
+        )
+        return ModelStats(args)
+
+    return run
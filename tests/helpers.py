@@ -0,0 +1,187 @@
+import os
+
+import numpy as np
+import onnx
+import pandas as pd
+from onnx import TensorProto, helper, numpy_helper
+
+
+def conv_node(name, x, cin, cout, initializers, rng, zero_fraction=0.0):
+    """
+    3x3 "same" Conv with random weights, zero_fraction of them set to 0 so the sparsity is not trivial
+    """
+    weight = rng.standard_normal((cout, cin, 3, 3)).astype(np.float32)
+    weight[rng.random(weight.shape) < zero_fraction] = 0
+    bias = rng.standard_normal(cout).astype(np.float32)
+    initializers += [
+        numpy_helper.from_array(weight, f"{name}_w"),
+        numpy_helper.from_array(bias, f"{name}_b"),
+    ]
+    return helper.make_node(
+        "Conv",
+        [x, f"{name}_w", f"{name}_b"],
+        [name],
+        name=name,
+        kernel_shape=[3, 3],
+        pads=[1, 1, 1, 1],
+        strides=[1, 1],
+        dilations=[1, 1],
+        group=1,
+    )
+
+
+def make_model(nodes, initializers, inputs, outputs):
+    graph = helper.make_graph(nodes, "test", inputs, outputs, initializers)
+    model = helper.make_model(graph, opset_imports=[helper.make_opsetid("", 13)])
+    onnx.checker.check_model(model)
+    return model
+
+
+def chain_model(num_blocks, channels=8, size=8, seed=0, changed_block=None):
+    """
+    Conv/Relu blocks in a chain. changed_block gets one more output channel, its consumer adapts to it
+    """
+    rng = np.random.default_rng(seed)
+    nodes, initializers = [], []
+    x, cin = "x", channels
+    for block in range(num_blocks):
+        cout = channels + 1 if block == changed_block else channels
+        nodes.append(conv_node(f"conv{block}", x, cin, cout, initializers, rng, 0.3))
+        nodes.append(
+            helper.make_node(
+                "Relu", [f"conv{block}"], [f"relu{block}"], name=f"relu{block}"
+            )
+        )
+        x, cin = f"relu{block}", cout
+    return make_model(
+        nodes,
+        initializers,
+        [
+            helper.make_tensor_value_info(
+                "x", TensorProto.FLOAT, [1, channels, size, size]
+            )
+        ],
+        [helper.make_tensor_value_info(x, TensorProto.FLOAT, [1, cin, size, size])],
+    )
+
+
+def branch_model(seed=0, size=16):
+    """
+    Two Conv branches of different widths joined by Concat and Add, then MaxPool and MatMul
+    """
+    rng = np.random.default_rng(seed)
+    initializers = []
+    nodes = [
+        conv_node("stem", "x", 3, 8, initializers, rng, 0.5),
+        helper.make_node("Relu", ["stem"], ["stem_relu"], name="stem_relu"),
+        conv_node("wide", "stem_relu", 8, 32, initializers, rng),
+        conv_node("narrow", "stem_relu", 8, 4, initializers, rng),
+        conv_node("narrow2", "narrow", 4, 4, initializers, rng),
+        conv_node("squeeze", "wide", 32, 4, initializers, rng),
+        helper.make_node("Concat", ["squeeze", "narrow2"], ["cat"], name="cat", axis=1),
+        conv_node("mix", "cat", 8, 8, initializers, rng),
+        helper.make_node("Add", ["mix", "stem_relu"], ["add"], name="add"),
+        helper.make_node(
+            "MaxPool",
+            ["add"],
+            ["pool"],
+            name="pool",
+            kernel_shape=[2, 2],
+            strides=[2, 2],
+        ),
+        helper.make_node("Reshape", ["pool", "shape"], ["flat"], name="flat"),
+        helper.make_node("MatMul", ["flat", "fc_w"], ["y"], name="fc"),
+    ]
+    features = 8 * (size // 2) ** 2
+    initializers += [
+        numpy_helper.from_array(np.array([1, features], dtype=np.int64), "shape"),
+        numpy_helper.from_array(
+            rng.standard_normal((features, 10)).astype(np.float32), "fc_w"
+        ),
+    ]
+    return make_model(
+        nodes,
+        initializers,
+        [helper.make_tensor_value_info("x", TensorProto.FLOAT, [1, 3, size, size])],
+        [helper.make_tensor_value_info("y", TensorProto.FLOAT, [1, 10])],
+    )
+
+
+def two_branch_model():
+    """
+    Two branches widening a 1 KiB input to 4 KiB and reducing it to one float, listed widen, widen, reduce,
+    reduce
+    """
+    nodes = [
+        helper.make_node("Concat", ["x"] * 4, [name], name=name, axis=1)
+        for name in ("a", "b")
+    ]
+    nodes += [
+        helper.make_node(
+            "ReduceMax", [name], [f"r{name}"], name=f"r{name}", axes=[1], keepdims=1
+        )
+        for name in ("a", "b")
+    ]
+    nodes.append(helper.make_node("Add", ["ra", "rb"], ["y"], name="add"))
+    return make_model(
+        nodes,
+        [],
+        [helper.make_tensor_value_info("x", TensorProto.FLOAT, [1, 256])],
+        [helper.make_tensor_value_info("y", TensorProto.FLOAT, [1, 1])],
+    )
+
+
+def dynamic_model():
+    """
+    Conv/Relu/MaxPool over symbolic batch, H and W
+    """
+    rng = np.random.default_rng(0)
+    initializers = []
+    nodes = [
+        conv_node("conv0", "x", 3, 8, initializers, rng),
+        helper.make_node("Relu", ["conv0"], ["relu0"], name="relu0"),
+        conv_node("conv1", "relu0", 8, 8, initializers, rng),
+        helper.make_node(
+            "MaxPool",
+            ["conv1"],
+            ["y"],
+            name="pool",
+            kernel_shape=[2, 2],
+            strides=[2, 2],
+        ),
+    ]
+    return make_model(
+        nodes,
+        initializers,
+        [helper.make_tensor_value_info("x", TensorProto.FLOAT, ["batch", 3, "H", "W"])],
+        [
+            helper.make_tensor_value_info(
+                "y", TensorProto.FLOAT, ["batch", 8, "H2", "W2"]
+            )
+        ],
+    )
+
+
+def save_model(model, directory, name, external_data=False):
+    filename = os.path.join(directory, name)
+    if external_data:
+        onnx.save(
+            model,
+            filename,
+            save_as_external_data=True,
+            location=name + ".data",
+            size_threshold=0,
+        )
+    else:
+        onnx.save(model, filename)
+    return filename
+
+
+def assert_same_analysis(expected, actual):
+    """
+    Same reported per-node columns and memory simulation totals
+    """
+    pd.testing.assert_frame_equal(
+        expected.ops_attributes.to_frame(), actual.ops_attributes.to_frame()
+    )
+    assert expected.memory_summary == actual.memory_summary
@@ -0,0 +1,82 @@
+import pytest
+
+from arena_planner import ARENA_STRATEGIES, ArenaPlan
+from helpers import branch_model, chain_model, save_model, two_branch_model
+
+MODELS = {
+    "branch": branch_model,
+    "chain": lambda: chain_model(6),
+}
+
+
+@pytest.mark.parametrize(
+    "strategy, alignment, offsets, arena_size",
+    [
+        # a and b overlap, the reductions reuse the bytes of a and b once these are dead
+        ("size", 64, [0, 4096, 8192, 0, 64], 8256),
+        ("size", 1, [0, 4096, 8192, 0, 4], 8196),
+        # Buffers of 4096, 4096 and 64 bytes: rb takes the one of a, y the one of b
+        ("coloring", 64, [0, 4096, 8192, 0, 4096], 8256),
+    ],
+)
+def test_two_branch_plan(tmp_path, analyze, strategy, alignment, offsets, arena_size):
+    model_stats = analyze("-i", save_model(two_branch_model(), tmp_path, "two.onnx"))
+    plan = ArenaPlan(
+        model_stats.graph_index,
+        model_stats.liveness,
+        model_stats.tensor_size,
+        strategy,
+        alignment,
+    )
+    assert plan.tensors == ["a", "b", "ra", "rb", "y"]
+    # The model output y is kept until the last node
+    assert list(plan.first_node) == [0, 1, 2, 3, 4]
+    assert list(plan.last_node) == [2, 3, 4, 4, 4]
+    assert list(plan.offsets) == offsets
+    assert plan.arena_size == arena_size
+    assert plan.lower_bound == 8192 + plan.sizes[2]
+
+
+@pytest.mark.parametrize("alignment", [1, 64])
+@pytest.mark.parametrize("strategy", ARENA_STRATEGIES)
+@pytest.mark.parametrize("name", MODELS)
+def test_live_tensors_never_overlap(tmp_path, analyze, name, strategy, alignment):
+    model_stats = analyze("-i", save_model(MODELS[name](), tmp_path, f"{name}.onnx"))
+    plan = ArenaPlan(
+        model_stats.graph_index,
+        model_stats.liveness,
+        model_stats.tensor_size,
+        strategy,
+        alignment,
+    )
+    assert len(plan.tensors) == len(model_stats.graph_index.producer)
+    assert (plan.offsets >= 0).all()
+    assert (plan.offsets % alignment == 0).all()
+    assert plan.arena_size == (plan.offsets + plan.sizes).max()
+    assert plan.arena_size >= plan.lower_bound
+
+    for a in range(len(plan.tensors)):
+        for b in range(a + 1, len(plan.tensors)):
+            live_together = (
+                plan.first_node[a] <= plan.last_node[b]
+                and plan.first_node[b] <= plan.last_node[a]
+            )
+            if live_together and plan.sizes[a] and plan.sizes[b]:
+                assert (
+                    plan.offsets[a] + plan.sizes[a] <= plan.offsets[b]
+                    or plan.offsets[b] + plan.sizes[b] <= plan.offsets[a]
+                ), (plan.tensors[a], plan.tensors[b])
+
+
+def test_arena_option_keeps_the_smallest_plan(tmp_path, analyze):
+    model = save_model(branch_model(), tmp_path, "branch.onnx")
+    model_stats = analyze("-i", model, "-m", 1, "--schedule", "peak", "--arena", "all")
+    sizes = [
+        ArenaPlan(
+            *model_stats.ordered_graph(model_stats.schedule.order)[1:],
+            model_stats.tensor_size,
+            strategy,
+        ).arena_size
+        for strategy in ARENA_STRATEGIES
+    ]
+    assert model_stats.arena_plan.arena_size == min(sizes)
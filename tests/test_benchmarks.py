@@ -0,0 +1,39 @@
+import importlib.util
+import os
+
+from node_registry import get_handler
+from graph_index import GraphIndex
+
+BENCHMARK = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)),
+    "..",
+    "benchmarks",
+    "bench_graph_index.py",
+)
+
+
+def load_benchmark():
+    spec = importlib.util.spec_from_file_location("bench_graph_index", BENCHMARK)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def test_linear_view_matches_graph_index():
+    bench = load_benchmark()
+    model = bench.build_chain_model(4)
+    indexed = GraphIndex(model)
+    linear = bench.LinearGraphView(model)
+    for node in model.graph.node:
+        handler = get_handler(node.op_type)
+        assert (
+            handler.handle(linear, node).to_dict()
+            == handler.handle(indexed, node).to_dict()
+        )
+
+
+def test_benchmark_runs(capsys):
+    load_benchmark().main(["--sizes", "30,60", "--linear-limit", "60"])
+    lines = capsys.readouterr().out.splitlines()
+    assert len(lines) == 3
+    assert "skipped" not in lines[-1]
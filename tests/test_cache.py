@@ -0,0 +1,28 @@
+import pytest
+
+from helpers import assert_same_analysis, branch_model, chain_model, save_model
+
+MODELS = {
+    "branch": branch_model,
+    "chain": lambda: chain_model(12),
+}
+
+
+@pytest.mark.parametrize("name", MODELS)
+def test_cache_matches_serial(tmp_path, analyze, capsys, name):
+    model = save_model(MODELS[name](), tmp_path, f"{name}.onnx")
+    serial = analyze("-i", model, "-m", 1)
+    cold = analyze("-i", model, "-m", 1, "--cache")
+    assert "Restoring model analysis from cache" not in capsys.readouterr().out
+    warm = analyze("-i", model, "-m", 1, "--cache")
+    assert "Restoring model analysis from cache" in capsys.readouterr().out
+    assert_same_analysis(serial, cold)
+    assert_same_analysis(serial, warm)
+
+
+def test_changed_options_miss_the_cache(tmp_path, analyze, capsys):
+    model = save_model(chain_model(4), tmp_path, "chain.onnx")
+    analyze("-i", model, "--cache")
+    capsys.readouterr()
+    analyze("-i", model, "--cache", "--sparsity-sample", 16)
+    assert "Restoring model analysis from cache" not in capsys.readouterr().out
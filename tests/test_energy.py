@@ -0,0 +1,68 @@
+import json
+
+import numpy as np
+import pytest
+from onnx import TensorProto, helper
+
+from energy import EnergyModel, energy_rows
+from helpers import make_model, save_model
+
+# 1 KiB tensors
+SHAPE = [1, 256]
+
+
+def exp_log_model():
+    return make_model(
+        [
+            helper.make_node("Exp", ["x"], ["a"], name="exp"),
+            helper.make_node("Log", ["x"], ["b"], name="log"),
+            helper.make_node("Sub", ["a", "b"], ["y"], name="sub"),
+        ],
+        [],
+        [helper.make_tensor_value_info("x", TensorProto.FLOAT, SHAPE)],
+        [helper.make_tensor_value_info("y", TensorProto.FLOAT, SHAPE)],
+    )
+
+
+def test_unknown_primitive():
+    with pytest.raises(ValueError):
+        EnergyModel({"primitive_pj": {"FMA": 1}})
+
+
+def test_energy(tmp_path, analyze):
+    energy = tmp_path / "energy.json"
+    energy.write_text(
+        json.dumps(
+            {
+                "name": "npu",
+                "primitive_pj": {"EXP": 1000, "ALU": {"FLOAT": 500, "default": 1}},
+                "sram_pj_per_byte": 1,
+                "dram_pj_per_byte": 10,
+            }
+        )
+    )
+    model = save_model(exp_log_model(), tmp_path, "exp_log.onnx")
+    model_stats = analyze("-i", model, "-m", 1, "--energy", energy)
+    ops_attributes = model_stats.ops_attributes
+
+    # 256 EXPs for exp and log, 256 float ALU ops for sub
+    np.testing.assert_allclose(
+        ops_attributes.column("Compute Energy (uJ)"), [0.256, 0.256, 0.128]
+    )
+    # exp and log read x and write 1 KiB, sub reads a and b and writes y
+    np.testing.assert_allclose(
+        ops_attributes.column("SRAM Energy (uJ)"), [0.002048, 0.002048, 0.003072]
+    )
+    # exp loads x and sub stores y from DRAM, log finds x in memory
+    np.testing.assert_allclose(
+        ops_attributes.column("DRAM Energy (uJ)"), [0.01024, 0, 0.01024]
+    )
+    np.testing.assert_allclose(
+        ops_attributes.column("Energy (uJ)"), [0.268288, 0.258048, 0.141312]
+    )
+    assert model_stats.energy == pytest.approx(0.667648)
+
+    rows = energy_rows(ops_attributes)
+    assert [row["Op Type"] for row in rows] == ["Exp", "Log", "Sub", "Total"]
+    assert rows[-1]["Energy (uJ)"] == pytest.approx(0.667648)
+    assert rows[-1]["Share of Total"] == pytest.approx(1.0)
@@ -0,0 +1,80 @@
+import numpy as np
+import pytest
+from onnx import TensorProto, helper
+
+from helpers import conv_node, make_model, save_model
+
+# 8x8x8 float maps are 2 KiB
+SHAPE = [1, 8, 8, 8]
+
+
+def activation_conv_model():
+    """
+    Relu and Sigmoid of the input, then a 3x3 Conv (2304 weight and 32 bias bytes) and its Relu
+    """
+    initializers = []
+    nodes = [
+        helper.make_node("Relu", ["x"], ["r"], name="relu"),
+        helper.make_node("Sigmoid", ["r"], ["s"], name="sigmoid"),
+        conv_node("conv", "s", 8, 8, initializers, np.random.default_rng(0)),
+        helper.make_node("Relu", ["conv"], ["y"], name="conv_relu"),
+    ]
+    return make_model(
+        nodes,
+        initializers,
+        [helper.make_tensor_value_info("x", TensorProto.FLOAT, SHAPE)],
+        [helper.make_tensor_value_info("y", TensorProto.FLOAT, SHAPE)],
+    )
+
+
+@pytest.mark.parametrize(
+    "rule, segments",
+    [
+        ("chainable", [[0, 1], [2, 3]]),
+        # The activations before the Conv have no compute op to fuse into
+        ("epilogue", [[0], [1], [2, 3]]),
+    ],
+)
+def test_partition(tmp_path, analyze, rule, segments):
+    model = save_model(activation_conv_model(), tmp_path, "act_conv.onnx")
+    model_stats = analyze("-i", model, "--fusion-rules", rule)
+    assert model_stats.partition_model() == segments
+
+
+def test_join_of_two_segments_starts_a_new_one(tmp_path, analyze):
+    model = make_model(
+        [
+            helper.make_node("Exp", ["x"], ["a"], name="exp"),
+            helper.make_node("Log", ["x"], ["b"], name="log"),
+            helper.make_node("Add", ["a", "b"], ["y"], name="add"),
+        ],
+        [],
+        [helper.make_tensor_value_info("x", TensorProto.FLOAT, SHAPE)],
+        [helper.make_tensor_value_info("y", TensorProto.FLOAT, SHAPE)],
+    )
+    model_stats = analyze("-i", save_model(model, tmp_path, "join.onnx"))
+    assert model_stats.partition_model() == [[0], [1], [2]]
+
+
+def test_segment_rows(tmp_path, analyze):
+    model = save_model(activation_conv_model(), tmp_path, "act_conv.onnx")
+    first, second = analyze("-i", model).fusion_segment_rows()
+
+    assert (first["First Node"], first["Last Node"], first["Nodes"]) == (
+        "relu",
+        "sigmoid",
+        2,
+    )
+    assert first["Op Types"] == "Relu, Sigmoid"
+    # x in, s out, at most two maps live at once
+    assert first["bytes_loaded"] == 2048
+    assert first["bytes_stored"] == 2048
+    assert first["Peak Footprint (bytes)"] == 4096
+
+    assert second["Op Types"] == "Conv, Relu"
+    # 8x8x8 outputs of 8x3x3 MACs
+    assert second["MAC Count"] == 512 * 72
+    # s and the weights in, y out. The Conv runs with its input, weights and output live
+    assert second["bytes_loaded"] == 2048 + 2304 + 32
+    assert second["bytes_stored"] == 2048
+    assert second["Peak Footprint (bytes)"] == 2048 + 2304 + 32 + 2048
@@ -0,0 +1,62 @@
+import pytest
+from onnx import TensorProto, helper
+
+from helpers import make_model, save_model
+from memory_hierarchy import parse_hierarchy, parse_size
+
+# 1 KiB tensors
+SHAPE = [1, 256]
+
+
+def exp_log_model():
+    return make_model(
+        [
+            helper.make_node("Exp", ["x"], ["a"], name="exp"),
+            helper.make_node("Log", ["x"], ["b"], name="log"),
+            helper.make_node("Sub", ["a", "b"], ["y"], name="sub"),
+        ],
+        [],
+        [helper.make_tensor_value_info("x", TensorProto.FLOAT, SHAPE)],
+        [helper.make_tensor_value_info("y", TensorProto.FLOAT, SHAPE)],
+    )
+
+
+def test_parse_hierarchy():
+    assert parse_size("256K") == 256 * 1024
+    assert parse_size("1.5MB") == 3 * 512 * 1024
+    l1, l2 = parse_hierarchy("L1:2K,L2:4M:belady:200")
+    assert (l1.name, l1.capacity, l1.policy, l1.bandwidth) == ("L1", 2048, "lru", None)
+    assert (l2.name, l2.capacity, l2.policy, l2.bandwidth) == (
+        "L2",
+        4 << 20,
+        "belady",
+        200,
+    )
+    with pytest.raises(ValueError):
+        parse_hierarchy("L1:2K:fifo")
+
+
+def test_two_level_traffic(tmp_path, analyze):
+    model = save_model(exp_log_model(), tmp_path, "exp_log.onnx")
+    model_stats = analyze("-i", model, "--hierarchy", "L1:2K,L2:8K")
+    # exp: x comes up from DRAM, a fits next to it. log: b evicts a (LRU) to L2, then b is flushed to L2 since
+    # Sub is not chainable and 3 KiB are live. sub: a and b come back up, y does not fit next to them and goes
+    # to L2, from where it is stored to DRAM
+    assert list(model_stats.ops_attributes.column("L1 bytes_loaded")) == [1024, 0, 2048]
+    assert list(model_stats.ops_attributes.column("L1 bytes_stored")) == [0, 2048, 1024]
+    assert list(model_stats.ops_attributes.column("L2 bytes_loaded")) == [1024, 0, 0]
+    assert list(model_stats.ops_attributes.column("L2 bytes_stored")) == [0, 0, 1024]
+
+    summary = model_stats.memory_summary
+    assert summary["levels"]["L1"] == {
+        "bytes_loaded": 3072,
+        "bytes_stored": 3072,
+        "max_footprint": 2048,
+    }
+    assert summary["levels"]["L2"] == {
+        "bytes_loaded": 1024,
+        "bytes_stored": 1024,
+        "max_footprint": 3072,
+    }
+    assert summary["total_bytes_loaded"] == 1024
+    assert summary["total_bytes_stored"] == 1024
@@ -0,0 +1,55 @@
+import numpy as np
+import pytest
+from onnx import numpy_helper
+
+from helpers import assert_same_analysis, chain_model, save_model
+from onnx_analysis import MEMORY_SNAPSHOT_INTERVAL
+
+MEMORY_OPTIONS = [
+    ["-m", 1],
+    ["-m", 1, "--recompute", 4],
+    ["-m", 1, "--reuse"],
+    ["--hierarchy", "L1:4K:lru,L2:16K:belady"],
+]
+
+NUM_BLOCKS = 40
+CHANGED_BLOCK = 35
+
+
+@pytest.mark.parametrize("options", MEMORY_OPTIONS, ids=lambda o: " ".join(map(str, o)))
+def test_incremental_matches_full(tmp_path, analyze, capsys, options):
+    # The changed node is past the first memory snapshot so the baseline simulation is replayed from one
+    assert 2 * CHANGED_BLOCK > MEMORY_SNAPSHOT_INTERVAL
+    base = save_model(chain_model(NUM_BLOCKS), tmp_path, "base.onnx")
+    new = save_model(
+        chain_model(NUM_BLOCKS, changed_block=CHANGED_BLOCK), tmp_path, "new.onnx"
+    )
+    full = analyze("-i", new, *options)
+
+    incremental = analyze("-i", new, "-b", base, *options)
+    assert incremental.graph_diff.matches[: 2 * CHANGED_BLOCK] == list(
+        range(2 * CHANGED_BLOCK)
+    )
+    assert_same_analysis(full, incremental)
+
+    # The second run restores the baseline memory simulation from the cache
+    capsys.readouterr()
+    again = analyze("-i", new, "-b", base, *options)
+    assert "Restoring the memory simulation from cache" in capsys.readouterr().out
+    assert_same_analysis(full, again)
+
+
+def test_changed_weights_are_reanalyzed(tmp_path, analyze):
+    model = chain_model(6)
+    base = save_model(model, tmp_path, "base.onnx")
+    initializer = model.graph.initializer[4]
+    weight = numpy_helper.to_array(initializer).copy()
+    weight[...] = 0
+    initializer.CopyFrom(numpy_helper.from_array(weight, initializer.name))
+    new = save_model(model, tmp_path, "new.onnx")
+
+    full = analyze("-i", new, "-m", 1)
+    incremental = analyze("-i", new, "-b", base, "-m", 1)
+    assert incremental.graph_diff.num_changed() == 1
+    assert np.count_nonzero(incremental.ops_attributes.column("Sparsity") == 100) == 1
+    assert_same_analysis(full, incremental)
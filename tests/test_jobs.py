@@ -0,0 +1,17 @@
+import pytest
+
+from helpers import assert_same_analysis, branch_model, chain_model, save_model
+
+MODELS = {
+    "branch": branch_model,
+    "chain": lambda: chain_model(12),
+}
+
+
+@pytest.mark.parametrize("jobs", [2, 3])
+@pytest.mark.parametrize("name", MODELS)
+def test_jobs_matches_serial(tmp_path, analyze, name, jobs):
+    model = save_model(MODELS[name](), tmp_path, f"{name}.onnx")
+    serial = analyze("-i", model, "-m", 1)
+    parallel = analyze("-i", model, "-m", 1, "--jobs", jobs)
+    assert_same_analysis(serial, parallel)
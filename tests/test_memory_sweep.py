@@ -0,0 +1,75 @@
+import os
+
+import pytest
+from onnx import TensorProto, helper
+
+from helpers import make_model, save_model
+from memory_sweep import MemorySweep, parse_sweep_range
+
+# 1 KiB tensors
+SHAPE = [1, 256]
+
+
+def exp_log_model():
+    return make_model(
+        [
+            helper.make_node("Exp", ["x"], ["a"], name="exp"),
+            helper.make_node("Log", ["x"], ["b"], name="log"),
+            helper.make_node("Sub", ["a", "b"], ["y"], name="sub"),
+        ],
+        [],
+        [helper.make_tensor_value_info("x", TensorProto.FLOAT, SHAPE)],
+        [helper.make_tensor_value_info("y", TensorProto.FLOAT, SHAPE)],
+    )
+
+
+def test_parse_sweep_range():
+    assert parse_sweep_range("1K:4K:1K") == [1024, 2048, 3072, 4096]
+    assert parse_sweep_range("100:100:1") == [100]
+    with pytest.raises(ValueError, match="step"):
+        parse_sweep_range("1K:4K:0")
+    with pytest.raises(ValueError, match="start"):
+        parse_sweep_range("4K:1K:1K")
+
+
+def test_traffic_curve(tmp_path, analyze):
+    model_stats = analyze("-i", save_model(exp_log_model(), tmp_path, "exp_log.onnx"))
+    sweep = MemorySweep(model_stats, "1K:4K:1K")
+    # a stays local once x and a fit (2 KiB), b once x, a and b do (3 KiB)
+    assert list(sweep.breakpoints) == [2048, 3072]
+    assert sweep.breakpoint_capacities == {2048, 3072}
+    assert sweep.num_simulations == 3
+    assert [row["Breakpoint"] for row in sweep.rows] == [False, True, True, False]
+    # 1K: a and b are stored and reloaded, 2K: only b, from 3K: only x is loaded and y stored
+    assert [row["bytes_loaded"] for row in sweep.rows] == [3072, 2048, 1024, 1024]
+    assert [row["bytes_stored"] for row in sweep.rows] == [3072, 2048, 1024, 1024]
+    assert [row["Max SRAM footprint"] for row in sweep.rows] == [3072] * 4
+
+
+def test_breakpoints_inside_the_range_are_added(tmp_path, analyze):
+    model_stats = analyze("-i", save_model(exp_log_model(), tmp_path, "exp_log.onnx"))
+    sweep = MemorySweep(model_stats, "1000:4000:1000")
+    assert [row["Local Memory (bytes)"] for row in sweep.rows] == [
+        1000,
+        2000,
+        2048,
+        3000,
+        3072,
+        4000,
+    ]
+    assert [row["DRAM bytes"] for row in sweep.rows] == [
+        6144,
+        6144,
+        4096,
+        4096,
+        2048,
+        2048,
+    ]
+
+
+def test_memory_sweep_option_writes_the_curve(tmp_path, analyze, monkeypatch):
+    model = save_model(exp_log_model(), tmp_path, "exp_log.onnx")
+    monkeypatch.chdir(tmp_path)
+    analyze("-i", model, "--memory-sweep", "1K:4K:1K")
+    assert os.path.exists("exp_log_memory_sweep.csv")
+    assert os.path.exists("exp_log_memory_sweep.xlsx")
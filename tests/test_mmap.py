@@ -0,0 +1,23 @@
+import pytest
+
+from helpers import assert_same_analysis, branch_model, chain_model, save_model
+
+MODELS = {
+    "branch": branch_model,
+    "chain": lambda: chain_model(12),
+}
+
+
+@pytest.mark.parametrize("name", MODELS)
+def test_mmap_matches_serial(tmp_path, analyze, name):
+    # The model lives outside the working directory, its external data resolves against the model directory
+    model = save_model(MODELS[name](), tmp_path, f"{name}.onnx", external_data=True)
+    serial = analyze("-i", model, "-m", 1)
+    mapped = analyze("-i", model, "-m", 1, "--mmap")
+    assert_same_analysis(serial, mapped)
+    assert not mapped.graph_index.tensor_reader.is_external(
+        serial.model.graph.initializer[0]
+    )
+    assert mapped.graph_index.tensor_reader.is_external(
+        mapped.model.graph.initializer[0]
+    )
@@ -0,0 +1,71 @@
+import re
+
+from onnx import TensorProto, helper
+from openpyxl import load_workbook
+
+from gen_report import table_name
+from helpers import make_model, save_model
+from multicore import core_counts
+
+# 256 elements: 256 EXP ops for exp and log, 256 ALU ops for sub
+SHAPE = [1, 256]
+
+
+def exp_log_model():
+    return make_model(
+        [
+            helper.make_node("Exp", ["x"], ["a"], name="exp"),
+            helper.make_node("Log", ["x"], ["b"], name="log"),
+            helper.make_node("Sub", ["a", "b"], ["y"], name="sub"),
+        ],
+        [],
+        [helper.make_tensor_value_info("x", TensorProto.FLOAT, SHAPE)],
+        [helper.make_tensor_value_info("y", TensorProto.FLOAT, SHAPE)],
+    )
+
+
+def test_core_counts():
+    assert core_counts(1) == [1]
+    assert core_counts(2) == [1, 2]
+    assert core_counts(6) == [1, 2, 4, 6]
+
+
+def test_two_cores(tmp_path, analyze):
+    model = save_model(exp_log_model(), tmp_path, "exp_log.onnx")
+    model_stats = analyze("-i", model, "--cores", 2)
+    multicore = model_stats.multicore
+    assert model_stats.cost_unit == "ops"
+    assert list(multicore.bottom_level) == [512, 512, 256]
+    assert multicore.critical_path == [0, 2]
+    assert multicore.serial == 768
+    assert multicore.max_speedup() == 1.5
+
+    # exp and log run side by side, sub after both on the core of exp
+    schedule = multicore.schedule
+    assert list(schedule.core) == [0, 1, 0]
+    assert list(schedule.start) == [0, 0, 256]
+    assert list(schedule.end) == [256, 256, 512]
+    assert schedule.makespan == 512
+    assert schedule.utilization() == 0.75
+    assert [row["Speedup"] for row in multicore.scaling_rows("ops")] == [1.0, 1.5]
+
+
+def test_table_name():
+    assert table_name("Multi-Core") == "Multi_Core"
+    assert table_name("Core Scaling") == "Core_Scaling"
+    assert table_name("2 Cores (us)") == "_2_Cores__us_"
+
+
+def test_report_table_names(tmp_path, analyze, monkeypatch):
+    model = save_model(exp_log_model(), tmp_path, "exp_log.onnx")
+    monkeypatch.chdir(tmp_path)
+    analyze("-i", model, "-m", 1, "--cores", 2).generate_report()
+    workbook = load_workbook("exp_log.xlsx")
+    tables = [
+        table.displayName
+        for sheet in workbook.worksheets
+        for table in sheet.tables.values()
+    ]
+    assert "Multi_Core" in tables
+    for display_name in tables:
+        assert re.fullmatch(r"[A-Za-z_][A-Za-z0-9_]*", display_name)
@@ -0,0 +1,64 @@
+import os
+
+import numpy as np
+import onnx
+from onnx import TensorProto, helper, numpy_helper
+
+from helpers import make_model, save_model
+
+# 256 floats: every tensor and weight is 1 KiB, every Add costs 256 ops
+SHAPE = [1, 256]
+
+
+def add_chain_model(num_nodes=4):
+    """
+    Adds in a chain, each with its own 1 KiB weight
+    """
+    nodes, initializers = [], []
+    x = "x"
+    for i in range(num_nodes):
+        initializers.append(
+            numpy_helper.from_array(np.ones(SHAPE, dtype=np.float32), f"w{i}")
+        )
+        nodes.append(helper.make_node("Add", [x, f"w{i}"], [f"a{i}"], name=f"add{i}"))
+        x = f"a{i}"
+    return make_model(
+        nodes,
+        initializers,
+        [helper.make_tensor_value_info("x", TensorProto.FLOAT, SHAPE)],
+        [helper.make_tensor_value_info(x, TensorProto.FLOAT, SHAPE)],
+    )
+
+
+def test_balanced_stages(tmp_path, analyze, monkeypatch):
+    model = save_model(add_chain_model(), tmp_path, "chain.onnx")
+    workdir = tmp_path / "workdir"
+    workdir.mkdir()
+    monkeypatch.chdir(workdir)
+    pipeline = analyze("-i", model, "--pipeline", 2).pipeline
+    assert pipeline.bounds == [(0, 2), (2, 4)]
+    assert pipeline.stage_cost == [512.0, 512.0]
+    assert pipeline.bottleneck() == 512.0
+    assert pipeline.stage_weights == [2048, 2048]
+    # One 1 KiB activation crosses every cut between two nodes
+    assert list(pipeline.cut_bytes) == [0, 1024, 1024, 1024, 0]
+
+    # The stages are written next to the model, not in the working directory
+    assert os.listdir(workdir) == []
+    stage1 = onnx.load(str(tmp_path / "chain_stage1.onnx"))
+    assert [t.name for t in stage1.graph.input] == ["a1"]
+    assert [t.name for t in stage1.graph.output] == ["a3"]
+    assert sorted(t.name for t in stage1.graph.initializer) == ["w2", "w3"]
+    assert (tmp_path / "chain_stage0.onnx").exists()
+
+
+def test_stage_memory(tmp_path, analyze):
+    model = save_model(add_chain_model(), tmp_path, "chain.onnx")
+    # One weight per stage does not fit two stages over four nodes
+    assert (
+        analyze("-i", model, "--pipeline", 2, "--stage-memory", "1K").pipeline is None
+    )
+    pipeline = analyze("-i", model, "--pipeline", 3, "--stage-memory", "2K").pipeline
+    assert max(pipeline.stage_weights) <= 2048
+    assert sum(pipeline.stage_cost) == 1024.0
+    assert pipeline.bottleneck() == 512.0
@@ -0,0 +1,99 @@
+import json
+
+import numpy as np
+import pytest
+from onnx import TensorProto, helper
+
+from helpers import make_model, save_model
+from placement import load_placement_config
+
+# 1 KiB tensors
+SHAPE = [1, 256]
+
+
+def exp_log_model():
+    return make_model(
+        [
+            helper.make_node("Exp", ["x"], ["a"], name="exp"),
+            helper.make_node("Log", ["x"], ["b"], name="log"),
+            helper.make_node("Sub", ["a", "b"], ["y"], name="sub"),
+        ],
+        [],
+        [helper.make_tensor_value_info("x", TensorProto.FLOAT, SHAPE)],
+        [helper.make_tensor_value_info("y", TensorProto.FLOAT, SHAPE)],
+    )
+
+
+def profile(exp_throughput):
+    # 1 cycle per microsecond and a DRAM fast enough to never set the latency
+    return {
+        "clock_mhz": 1,
+        "throughput": {"ALU": 256, "EXP": exp_throughput},
+        "dram_bandwidth_gbps": 1e6,
+    }
+
+
+@pytest.fixture
+def placement_config(tmp_path):
+    # exp and log take 4 us on the cpu and 1 us on the npu, sub 1 us on both. The npu runs no Log, a 1 KiB copy
+    # takes 0.5 + 0.5 us
+    config = tmp_path / "placement.json"
+    config.write_text(
+        json.dumps(
+            {
+                "host": "cpu",
+                "devices": {
+                    "npu": {"hw_profile": profile(256), "ops": ["Exp", "Sub"]},
+                    "cpu": {"hw_profile": profile(64)},
+                },
+                "link_bandwidth_gbps": 2.048,
+                "link_latency_us": 0.5,
+            }
+        )
+    )
+    return config
+
+
+def test_load_placement_config(placement_config):
+    host, accelerator, link_bandwidth, link_latency = load_placement_config(
+        placement_config
+    )
+    assert (host.name, accelerator.name) == ("cpu", "npu")
+    assert host.ops is None
+    assert accelerator.ops == {"Exp", "Sub"}
+    assert (link_bandwidth, link_latency) == (2.048e9, 0.5)
+
+
+def test_load_placement_config_needs_host(tmp_path):
+    config = tmp_path / "placement.json"
+    config.write_text(
+        json.dumps(
+            {
+                "host": "gpu",
+                "devices": {"cpu": {"hw_profile": profile(64)}},
+                "link_bandwidth_gbps": 1,
+            }
+        )
+    )
+    with pytest.raises(ValueError):
+        load_placement_config(config)
+
+
+def test_placement(tmp_path, analyze, placement_config):
+    model = save_model(exp_log_model(), tmp_path, "exp_log.onnx")
+    placement = analyze("-i", model, "-m", 1, "--placement", placement_config).placement
+    np.testing.assert_allclose(placement.cost["cpu"], [4, 4, 1])
+    np.testing.assert_allclose(placement.cost["npu"], [1, 1, 1])
+    assert placement.host_only_time == pytest.approx(9.0)
+
+    # Only exp moves: 3 us saved for copying x there and a back. Moving sub too would save nothing and copy b
+    # and y as well. The copies of the node outputs are listed before the ones of the model inputs
+    assert list(placement.device) == ["npu", "cpu", "cpu"]
+    assert placement.transfers == [("a", "npu", "cpu", 1024), ("x", "cpu", "npu", 1024)]
+    assert placement.compute_time == pytest.approx(6.0)
+    assert placement.transfer_time == pytest.approx(2.0)
+    assert placement.total_time() == pytest.approx(8.0)
+    assert placement.segments() == [("npu", 0, 1), ("cpu", 1, 3)]
+
+    # With Log the whole model runs on the npu: 3 us compute, x in and y out
+    assert placement.gains == [("Log", 1, True, 3.0)]
@@ -0,0 +1,90 @@
+from onnx import TensorProto, helper
+
+from helpers import make_model, save_model
+
+# 2 MiB tensors: nothing stays in a 1 MiB local memory
+ELEMENTS = 512 * 1024
+TENSOR_BYTES = 4 * ELEMENTS
+
+
+def exp_log_model():
+    """
+    Exp and Log of the input, subtracted: both branch outputs are flushed until Sub reads them
+    """
+    shape = [1, ELEMENTS]
+    return make_model(
+        [
+            helper.make_node("Exp", ["x"], ["a"], name="exp"),
+            helper.make_node("Log", ["x"], ["b"], name="log"),
+            helper.make_node("Sub", ["a", "b"], ["y"], name="sub"),
+        ],
+        [],
+        [helper.make_tensor_value_info("x", TensorProto.FLOAT, shape)],
+        [helper.make_tensor_value_info("y", TensorProto.FLOAT, shape)],
+    )
+
+
+def test_spill_traffic(tmp_path, analyze):
+    model = save_model(exp_log_model(), tmp_path, "exp_log.onnx")
+    summary = analyze("-i", model, "-m", 1).memory_summary
+    # x loaded once, a and b stored and reloaded, y stored
+    assert summary["total_bytes_loaded"] == 3 * TENSOR_BYTES
+    assert summary["total_bytes_stored"] == 3 * TENSOR_BYTES
+    assert summary["total_bytes_saved"] == 0
+
+
+def test_cheap_outputs_are_recomputed(tmp_path, analyze):
+    model = save_model(exp_log_model(), tmp_path, "exp_log.onnx")
+    model_stats = analyze("-i", model, "-m", 1, "--recompute", 4)
+    summary = model_stats.memory_summary
+    # Recomputing a or b costs ELEMENTS / 4 ops plus reloading x (dead after Log), under the 2 * TENSOR_BYTES
+    # of a spill: both are dropped, Sub reloads x twice instead of a and b, only y is stored
+    assert summary["total_bytes_loaded"] == 3 * TENSOR_BYTES
+    assert summary["total_bytes_stored"] == TENSOR_BYTES
+    assert summary["total_bytes_saved"] == 2 * TENSOR_BYTES
+    assert summary["total_recompute_ops"] == 2 * ELEMENTS
+    assert list(model_stats.ops_attributes.column("Spill bytes saved")) == [
+        TENSOR_BYTES,
+        TENSOR_BYTES,
+        0,
+    ]
+
+
+def test_simulate_memory_recomputes(tmp_path, analyze):
+    model = save_model(exp_log_model(), tmp_path, "exp_log.onnx")
+    model_stats = analyze("-i", model, "-m", 1, "--recompute", 4)
+    assert (
+        model_stats.simulate_memory(model_stats.tensor_size)
+        == model_stats.memory_summary
+    )
+    assert model_stats.simulate_memory(
+        model_stats.tensor_size, [1, 0, 2]
+    ) == model_stats.simulate_memory(model_stats.tensor_size)
+
+
+def test_scheduled_order_keeps_the_recompute_cost_of_each_node(tmp_path, analyze):
+    # a = Exp(x) is TENSOR_BYTES, b = Log(s) half of it, broadcast by Sub
+    half = [1, ELEMENTS // 2]
+    model = make_model(
+        [
+            helper.make_node("Exp", ["x"], ["a"], name="exp"),
+            helper.make_node("Log", ["s"], ["b"], name="log"),
+            helper.make_node("Sub", ["a", "b"], ["y"], name="sub"),
+        ],
+        [],
+        [
+            helper.make_tensor_value_info("x", TensorProto.FLOAT, [2, ELEMENTS // 2]),
+            helper.make_tensor_value_info("s", TensorProto.FLOAT, half),
+        ],
+        [helper.make_tensor_value_info("y", TensorProto.FLOAT, [2, ELEMENTS // 2])],
+    )
+    model_stats = analyze(
+        "-i", save_model(model, tmp_path, "exp_log.onnx"), "-m", 1, "--recompute", 4
+    )
+    # Log made too costly to recompute: 4 * TENSOR_BYTES / 4 ops + TENSOR_BYTES / 2 of s >= TENSOR_BYTES
+    model_stats.ops_attributes.column("EXP Count")[1] = 4 * TENSOR_BYTES
+    summary = model_stats.simulate_memory(model_stats.tensor_size, [1, 0, 2])
+    # Log first: b is spilled, a is recomputed from x for ELEMENTS ops, saving 2 * TENSOR_BYTES minus x
+    assert summary["total_recompute_ops"] == ELEMENTS
+    assert summary["total_bytes_saved"] == TENSOR_BYTES
+    assert summary["total_bytes_stored"] == TENSOR_BYTES // 2 + TENSOR_BYTES
@@ -0,0 +1,62 @@
+import numpy as np
+from onnx import TensorProto, helper, numpy_helper
+
+from helpers import branch_model, make_model, save_model
+from reuse import layer_nest
+
+
+def matmul_model():
+    """
+    2x2 by 2x2 float MatMul: every operand is 16 bytes
+    """
+    weight = np.arange(4, dtype=np.float32).reshape(2, 2)
+    return make_model(
+        [helper.make_node("MatMul", ["x", "w"], ["y"], name="matmul")],
+        [numpy_helper.from_array(weight, "w")],
+        [helper.make_tensor_value_info("x", TensorProto.FLOAT, [2, 2])],
+        [helper.make_tensor_value_info("y", TensorProto.FLOAT, [2, 2])],
+    )
+
+
+def test_fitting_layer_moves_every_operand_once(tmp_path, analyze):
+    model_stats = analyze("-i", save_model(matmul_model(), tmp_path, "mm.onnx"))
+    node = model_stats.graph_index.nodes[0]
+    nest = layer_nest(model_stats.graph_index, model_stats.tensor_size, node, 48)
+    assert nest.fits
+    assert nest.tiles == "M=2,N=2,K=2"
+    assert nest.dram_bytes() == 48
+    assert nest.extra_bytes() == (0, 0)
+
+
+def test_single_element_tiles_reload_the_inputs(tmp_path, analyze):
+    model_stats = analyze("-i", save_model(matmul_model(), tmp_path, "mm.onnx"))
+    node = model_stats.graph_index.nodes[0]
+    # 12 bytes hold one element of each operand, 2 trips per loop. With the reduction innermost every output
+    # element is written once (16 bytes) and both inputs are read once per output element (2 * 32 bytes)
+    nest = layer_nest(model_stats.graph_index, model_stats.tensor_size, node, 12)
+    assert nest.fits
+    assert nest.order == "M,N,K"
+    assert nest.tiles == "M=1,N=1,K=1"
+    assert (nest.input_bytes, nest.weight_bytes, nest.psum_bytes) == (32, 32, 0)
+    assert nest.output_bytes == 16
+    assert nest.extra_bytes() == (32, 0)
+
+
+def test_simulate_memory_adds_the_reuse_traffic(tmp_path, analyze):
+    model = save_model(branch_model(), tmp_path, "branch.onnx")
+    model_stats = analyze(
+        "-i", model, "--hierarchy", "L1:8K", "--reuse", "--schedule", "spill"
+    )
+    assert (
+        model_stats.simulate_memory(model_stats.tensor_size)
+        == model_stats.memory_summary
+    )
+    # Reordering does not change the loop nests, the scheduled order is charged the same re-reads
+    order = model_stats.schedule.file_order
+    assert (
+        model_stats.simulate_memory(model_stats.tensor_size, order)
+        == model_stats.memory_summary
+    )
+    assert model_stats.schedule_summary["total_bytes_loaded"] <= (
+        model_stats.memory_summary["total_bytes_loaded"]
+    )
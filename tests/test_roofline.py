@@ -0,0 +1,68 @@
+import json
+
+import numpy as np
+import pytest
+from onnx import TensorProto, helper
+
+from helpers import make_model, save_model
+
+# 1 KiB tensors
+SHAPE = [1, 256]
+
+
+def exp_log_model():
+    return make_model(
+        [
+            helper.make_node("Exp", ["x"], ["a"], name="exp"),
+            helper.make_node("Log", ["x"], ["b"], name="log"),
+            helper.make_node("Sub", ["a", "b"], ["y"], name="sub"),
+        ],
+        [],
+        [helper.make_tensor_value_info("x", TensorProto.FLOAT, SHAPE)],
+        [helper.make_tensor_value_info("y", TensorProto.FLOAT, SHAPE)],
+    )
+
+
+def roofline_at(tmp_path, analyze, sram_bandwidth_gbps):
+    # 1 cycle per microsecond: the 256 EXPs of exp and log take 4 us on the sfu, the 256 ALU ops of sub 1 us on
+    # the vector unit. exp loads x and sub stores y from DRAM in 8 us
+    profile = tmp_path / "profile.json"
+    profile.write_text(
+        json.dumps(
+            {
+                "clock_mhz": 1,
+                "throughput": {"ALU": 256, "EXP": 64},
+                "units": {"vector": ["ALU"], "sfu": ["EXP"]},
+                "dram_bandwidth_gbps": 0.128,
+                "sram_bandwidth_gbps": sram_bandwidth_gbps,
+            }
+        )
+    )
+    model = save_model(exp_log_model(), tmp_path, "exp_log.onnx")
+    return analyze("-i", model, "-m", 1, "--hw-profile", profile).roofline
+
+
+def test_dram_bound(tmp_path, analyze):
+    # exp and log move 2 KiB and sub 3 KiB through the local memory, 2 and 3 us
+    roofline = roofline_at(tmp_path, analyze, 1.024)
+    np.testing.assert_allclose(roofline.unit_time["sfu"] * 1e6, [4, 4, 0])
+    np.testing.assert_allclose(roofline.unit_time["vector"] * 1e6, [0, 0, 1])
+    np.testing.assert_allclose(roofline.dram_time * 1e6, [8, 0, 8])
+    np.testing.assert_allclose(roofline.sram_time * 1e6, [2, 2, 3])
+    np.testing.assert_allclose(roofline.latency * 1e6, [8, 4, 8])
+    assert list(roofline.bound) == ["DRAM", "compute", "DRAM"]
+    assert roofline.total == pytest.approx(20e-6)
+    assert roofline.bound_share() == pytest.approx(
+        {"compute": 0.2, "DRAM": 0.8, "SRAM": 0.0}
+    )
+    assert list(roofline.intensity) == [0.25, np.inf, 0.25]
+    assert list(roofline.bottlenecks()) == [0, 2, 1]
+
+
+def test_sram_bound(tmp_path, analyze):
+    # A quarter of the local memory bandwidth: 8 us for exp and log, 12 us for sub
+    roofline = roofline_at(tmp_path, analyze, 0.256)
+    np.testing.assert_allclose(roofline.latency * 1e6, [8, 8, 12])
+    # exp ties between DRAM and SRAM, the first one wins
+    assert list(roofline.bound) == ["DRAM", "SRAM", "SRAM"]
+    assert [row["Operator Name"] for row in roofline.rows()] == ["sub", "exp", "log"]
@@ -0,0 +1,97 @@
+import pytest
+
+from helpers import branch_model, chain_model, save_model, two_branch_model
+from scheduler import Schedule
+
+MODELS = {
+    "branch": branch_model,
+    "chain": lambda: chain_model(4),
+}
+
+
+def topological_orders(graph_index):
+    """
+    Every topological order of the nodes, by brute force
+    """
+    num_nodes = len(graph_index.nodes)
+    predecessors = [
+        {graph_index.producer[t] for t in node.input if t in graph_index.producer}
+        for node in graph_index.nodes
+    ]
+
+    def extend(order, done):
+        if len(order) == num_nodes:
+            yield list(order)
+            return
+        for v in range(num_nodes):
+            if v not in done and predecessors[v] <= done:
+                order.append(v)
+                done.add(v)
+                yield from extend(order, done)
+                order.pop()
+                done.remove(v)
+
+    yield from extend([], set())
+
+
+def assert_valid_schedule(schedule, graph_index):
+    assert sorted(schedule.order) == list(range(len(graph_index.nodes)))
+    position = {v: k for k, v in enumerate(schedule.order)}
+    for v, node in enumerate(graph_index.nodes):
+        for t in node.input:
+            if t in graph_index.producer:
+                assert position[graph_index.producer[t]] < position[v]
+    assert schedule.profile == schedule.footprint_profile(schedule.order)
+    assert schedule.peak == max(schedule.profile)
+    assert schedule.peak <= schedule.file_peak
+
+
+def test_reduce_each_branch_before_widening_the_next(tmp_path, analyze):
+    model_stats = analyze("-i", save_model(two_branch_model(), tmp_path, "two.onnx"))
+    schedule = Schedule(model_stats.graph_index, model_stats.tensor_size)
+    # File order: x, a and b are live while b is produced. Reducing a first frees it before b
+    assert schedule.file_peak == 1024 + 4096 + 4096
+    assert schedule.order == [0, 2, 1, 3, 4]
+    assert schedule.profile == [
+        1024 + 4096,
+        1024 + 4096 + 4,
+        4 + 1024 + 4096,
+        4096 + 8,
+        12,
+    ]
+    assert schedule.peak == 5124
+
+
+@pytest.mark.parametrize("name", MODELS)
+def test_greedy_schedule(tmp_path, analyze, name):
+    model_stats = analyze("-i", save_model(MODELS[name](), tmp_path, f"{name}.onnx"))
+    graph_index = model_stats.graph_index
+    schedule = Schedule(graph_index, model_stats.tensor_size)
+    assert_valid_schedule(schedule, graph_index)
+    assert schedule.file_peak == schedule.peak_footprint(schedule.file_order)
+
+
+@pytest.mark.parametrize("name", MODELS)
+def test_exact_schedule_is_optimal(tmp_path, analyze, name):
+    model_stats = analyze("-i", save_model(MODELS[name](), tmp_path, f"{name}.onnx"))
+    graph_index = model_stats.graph_index
+    greedy = Schedule(graph_index, model_stats.tensor_size)
+    exact = Schedule(
+        graph_index, model_stats.tensor_size, exact_window=len(graph_index.nodes)
+    )
+    assert_valid_schedule(exact, graph_index)
+    assert exact.peak <= greedy.peak
+    best = min(exact.peak_footprint(order) for order in topological_orders(graph_index))
+    assert exact.peak == best
+
+
+def test_schedule_option(tmp_path, analyze):
+    model_stats = analyze(
+        "-i",
+        save_model(branch_model(), tmp_path, "branch.onnx"),
+        "-m",
+        1,
+        "--schedule",
+        "peak",
+    )
+    assert_valid_schedule(model_stats.schedule, model_stats.graph_index)
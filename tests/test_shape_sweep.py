@@ -0,0 +1,99 @@
+import numpy as np
+import onnx
+import pytest
+from onnx import TensorProto, helper
+
+from helpers import conv_node, dynamic_model, make_model, save_model
+
+COST_KEYS = ["MAC Count", "ALU Count", "Input Size (bytes)", "Output Size (bytes)"]
+
+# 2 MiB activations at the larger points, so tensors are spilled and tiled
+SWEEP = "batch=1,2;H=256,384;W=256"
+MEMORY_OPTIONS = {
+    "memory": ["-m", 1],
+    "reuse": ["-m", 1, "--reuse"],
+    "hierarchy": ["--hierarchy", "L1:4K", "--reuse"],
+}
+
+
+def conv_pool_model():
+    """
+    Conv flushed before a MaxPool, recomputable from the model input
+    """
+    initializers = []
+    nodes = [
+        conv_node("conv", "x", 3, 8, initializers, np.random.default_rng(0)),
+        helper.make_node(
+            "MaxPool", ["conv"], ["y"], name="pool", kernel_shape=[2, 2], strides=[2, 2]
+        ),
+    ]
+    return make_model(
+        nodes,
+        initializers,
+        [helper.make_tensor_value_info("x", TensorProto.FLOAT, ["batch", 3, "H", "W"])],
+        [
+            helper.make_tensor_value_info(
+                "y", TensorProto.FLOAT, ["batch", 8, "H2", "W2"]
+            )
+        ],
+    )
+
+
+def assert_sweep_matches_fixed_shapes(tmp_path, analyze, model, memory_options):
+    sweep = analyze(
+        "-i",
+        save_model(model, tmp_path, "dynamic.onnx"),
+        *memory_options,
+        "--shape-sweep",
+        SWEEP,
+    )
+    assert len(sweep.shape_sweep.rows) == 4
+
+    for row in sweep.shape_sweep.rows:
+        fixed_model = onnx.ModelProto()
+        fixed_model.CopyFrom(model)
+        dims = fixed_model.graph.input[0].type.tensor_type.shape.dim
+        dims[0].dim_value, dims[2].dim_value, dims[3].dim_value = (
+            row["batch"],
+            row["H"],
+            row["W"],
+        )
+        del fixed_model.graph.output[0].type.tensor_type.shape.dim[:]
+        fixed = analyze(
+            "-i", save_model(fixed_model, tmp_path, "fixed.onnx"), *memory_options
+        )
+        for key in COST_KEYS:
+            assert fixed.ops_attributes.total(key) == row[key], key
+        assert fixed.memory_summary["total_bytes_loaded"] == row["bytes_loaded"]
+        assert fixed.memory_summary["total_bytes_stored"] == row["bytes_stored"]
+        assert fixed.memory_summary["max_footprint"] == row["Max SRAM footprint"]
+
+    # The per-node pass runs at the first grid point
+    first = sweep.shape_sweep.rows[0]
+    for key in COST_KEYS:
+        assert sweep.ops_attributes.total(key) == first[key], key
+
+
+@pytest.mark.parametrize("options", MEMORY_OPTIONS)
+def test_sweep_matches_fixed_shapes(tmp_path, analyze, options):
+    assert_sweep_matches_fixed_shapes(
+        tmp_path, analyze, dynamic_model(), MEMORY_OPTIONS[options]
+    )
+
+
+def test_sweep_recomputes_with_the_ops_of_each_point(tmp_path, analyze):
+    # Recomputing the conv output costs 216 MACs per pixel / 4 plus reloading the input (12 bytes per pixel)
+    # and the weights, against storing and reloading 2 * 32 bytes per pixel: spilled at every point, but
+    # recomputed at the larger points with the MACs of the first one
+    assert_sweep_matches_fixed_shapes(
+        tmp_path, analyze, conv_pool_model(), ["-m", 1, "--recompute", 4]
+    )
+
+
+def test_sweep_totals(tmp_path, analyze):
+    model = save_model(dynamic_model(), tmp_path, "dynamic.onnx")
+    rows = analyze("-i", model, "--shape-sweep", "batch=1,2;H=4;W=4").shape_sweep.rows
+    # Per 4x4 image: conv0, relu0 and conv1 write 8x4x4 floats (512 bytes), the pooling 8x2x2 (128 bytes).
+    # conv0 does 8x4x4 outputs of 3x3x3 MACs, conv1 of 8x3x3
+    assert [row["Output Size (bytes)"] for row in rows] == [1664, 3328]
+    assert [row["MAC Count"] for row in rows] == [12672, 25344]
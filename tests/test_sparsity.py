@@ -0,0 +1,42 @@
+import numpy as np
+import onnx
+from onnx import numpy_helper
+
+from sparsity import SparsityEngine
+from tensor_reader import TensorReader
+
+
+def test_sampled_estimate_is_the_sample_proportion():
+    engine = SparsityEngine(sample_size=1000)
+    assert engine.compute(np.ones(100000, dtype=np.float32))[0] == 0
+    assert engine.compute(np.zeros(100000, dtype=np.float32))[0] == 100
+
+    weight = np.ones(100000, dtype=np.float32)
+    weight[::4] = 0
+    sparsity, bound = engine.compute(weight)
+    assert bound > 0
+    assert abs(sparsity - 25) <= bound
+
+
+def test_chunked_scan_is_exact():
+    weight = np.ones(10000, dtype=np.float32)
+    weight[::3] = 0
+    engine = SparsityEngine(chunk_elements=1024)
+    assert engine.compute(weight) == (
+        np.count_nonzero(weight == 0) / weight.size * 100,
+        0,
+    )
+
+
+def test_raw_data_is_viewed_in_place():
+    reader = TensorReader("")
+    for dtype in (np.float32, np.float16, np.int8, np.int64, np.bool_):
+        array = (np.arange(24) % 3).astype(dtype).reshape(2, 3, 4)
+        initializer = numpy_helper.from_array(array, "w")
+        view = reader.get_array(initializer)
+        assert view.dtype == array.dtype
+        assert not view.flags.writeable
+        np.testing.assert_array_equal(view, array)
+
+    typed = onnx.helper.make_tensor("w", onnx.TensorProto.FLOAT, [2, 2], [1, 2, 3, 4])
+    np.testing.assert_array_equal(reader.get_array(typed), [[1, 2], [3, 4]])
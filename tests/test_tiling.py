@@ -0,0 +1,73 @@
+import numpy as np
+import pytest
+from onnx import TensorProto, helper
+
+from helpers import conv_node, make_model, save_model
+from tiling import FusedTiling, find_segments
+
+
+def conv_relu_model():
+    """
+    3x3 Conv of one 4x4 channel (40 weight and bias bytes) followed by a Relu
+    """
+    initializers = []
+    nodes = [
+        conv_node("conv", "x", 1, 1, initializers, np.random.default_rng(0)),
+        helper.make_node("Relu", ["conv"], ["y"], name="relu"),
+    ]
+    return make_model(
+        nodes,
+        initializers,
+        [helper.make_tensor_value_info("x", TensorProto.FLOAT, [1, 1, 4, 4])],
+        [helper.make_tensor_value_info("y", TensorProto.FLOAT, [1, 1, 4, 4])],
+    )
+
+
+def fused_tiling(model_stats, budget):
+    return FusedTiling(
+        model_stats.graph_index,
+        model_stats.tensor_size,
+        model_stats.ops_attributes.column("MAC Count"),
+        budget,
+    )
+
+
+def test_segments(tmp_path, analyze):
+    model_stats = analyze("-i", save_model(conv_relu_model(), tmp_path, "cr.onnx"))
+    assert find_segments(model_stats.graph_index) == [([0, 1], ["x", "conv"])]
+
+
+@pytest.mark.parametrize(
+    "budget, tile, num_tiles, footprint, dram_bytes",
+    [
+        # 1x4 row tiles: 3x4 input rows with the halo (48 bytes) and 2 x 16 output bytes next to the weights.
+        # The 4 tiles read 192 input bytes, plus the weights once and the 64 output bytes
+        (104, (1, 1, 4), 4, 104, 192 + 40 + 64),
+        # The whole 4x4 map: 64 bytes of input, conv and relu output each, plus the weights
+        (168, (1, 4, 4), 1, 168, 64 + 40 + 64),
+    ],
+)
+def test_best_tile(tmp_path, analyze, budget, tile, num_tiles, footprint, dram_bytes):
+    model_stats = analyze("-i", save_model(conv_relu_model(), tmp_path, "cr.onnx"))
+    (segment,) = fused_tiling(model_stats, budget).segments
+    assert segment.fits
+    assert segment.weights_resident
+    assert segment.tile == tile
+    assert segment.num_tiles == num_tiles
+    assert segment.footprint == footprint
+    assert segment.dram_bytes == dram_bytes
+    assert segment.weight_reloads == 1.0
+    assert segment.redundant_macs == 0
+    # conv reads x and writes 64 bytes plus its weights, relu reads and writes 64 bytes
+    assert segment.unfused_dram_bytes == 64 + 64 + 40 + 64 + 64
+
+
+def test_nothing_fits(tmp_path, analyze):
+    model_stats = analyze("-i", save_model(conv_relu_model(), tmp_path, "cr.onnx"))
+    (segment,) = fused_tiling(model_stats, 10).segments
+    # The smallest footprint: single pixels, a 3x3 input window (36 bytes) and one output (4 bytes) next to the
+    # weights
+    assert not segment.fits
+    assert segment.tile == (1, 1, 1)
+    assert segment.num_tiles == 16
+    assert segment.footprint == 36 + 4 + 40
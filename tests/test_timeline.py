@@ -0,0 +1,90 @@
+import json
+
+import numpy as np
+import pytest
+from onnx import TensorProto, helper
+
+from helpers import make_model, save_model
+from hw_profile import HardwareProfile
+from timeline import Timeline
+
+# 1 KiB tensors
+SHAPE = [1, 256]
+
+# One cycle per microsecond, 256 elements per cycle, one KiB per microsecond on each DMA queue
+PROFILE = {
+    "name": "test",
+    "clock_mhz": 1,
+    "throughput": {"ALU": 256, "EXP": 256},
+    "dma_bandwidth_gbps": 1.024,
+    "dma_queues": 1,
+}
+
+
+def exp_log_model():
+    return make_model(
+        [
+            helper.make_node("Exp", ["x"], ["a"], name="exp"),
+            helper.make_node("Log", ["x"], ["b"], name="log"),
+            helper.make_node("Sub", ["a", "b"], ["y"], name="sub"),
+        ],
+        [],
+        [helper.make_tensor_value_info("x", TensorProto.FLOAT, SHAPE)],
+        [helper.make_tensor_value_info("y", TensorProto.FLOAT, SHAPE)],
+    )
+
+
+def microseconds(spans):
+    return (np.asarray(spans) * 1e6).round(6).tolist()
+
+
+def test_timeline_option(tmp_path, analyze):
+    model = save_model(exp_log_model(), tmp_path, "exp_log.onnx")
+    profile = tmp_path / "profile.json"
+    profile.write_text(json.dumps(PROFILE))
+    trace = tmp_path / "trace.json"
+    timeline = analyze(
+        "-i", model, "-m", 1, "--hw-profile", profile, "--timeline-json", trace
+    ).timeline
+    # Everything stays local: exp waits 1 us for x, each node computes 1 us and y is stored after sub
+    assert microseconds(timeline.load) == [[0, 1], [0, 0], [2, 2]]
+    assert microseconds(timeline.compute) == [[1, 2], [2, 3], [3, 4]]
+    assert microseconds(timeline.store) == [[2, 2], [3, 3], [4, 5]]
+    assert microseconds(timeline.stall) == [1, 0, 0]
+    assert timeline.makespan == pytest.approx(5e-6)
+
+    events = json.loads(trace.read_text())["traceEvents"]
+    assert [event["args"]["name"] for event in events if event["ph"] == "M"] == [
+        "Compute",
+        "DMA 0",
+    ]
+    spans = {
+        event["name"]: (event["tid"], round(event["ts"], 6), round(event["dur"], 6))
+        for event in events
+        if event["ph"] == "X"
+    }
+    assert spans == {
+        "exp": (0, 1, 1),
+        "log": (0, 2, 1),
+        "sub": (0, 3, 1),
+        "stall exp": (0, 0, 1),
+        "load exp": (1, 0, 1),
+        "store sub": (1, 4, 1),
+    }
+
+
+def test_reload_waits_for_the_store(tmp_path, analyze):
+    model_stats = analyze("-i", save_model(exp_log_model(), tmp_path, "exp_log.onnx"))
+    # a is spilled by exp and loaded back by sub: the load can't start before the store is done
+    timeline = Timeline(
+        model_stats.graph_index,
+        HardwareProfile(PROFILE),
+        np.full(3, 1e-6),
+        np.array([1024, 0, 1024]),
+        np.array([1024, 0, 1024]),
+    )
+    assert microseconds(timeline.store[0]) == [2, 3]
+    assert microseconds(timeline.load[2]) == [3, 4]
+    assert microseconds(timeline.compute) == [[1, 2], [2, 3], [4, 5]]
+    assert microseconds(timeline.stall) == [1, 0, 1]
+    assert timeline.makespan == pytest.approx(6e-6)
@@ -0,0 +1,328 @@
+import numpy as np
+import onnx
+
+# Ops computing an output pixel from a kernel window of the input
+WINDOW_OPS = {"Conv", "MaxPool", "AveragePool"}
+# Ops computing an output element from the same element of their inputs
+POINTWISE_OPS = {
+    "Relu",
+    "Sigmoid",
+    "Tanh",
+    "Add",
+    "Sub",
+    "Mul",
+    "Mish",
+    "LeakyRelu",
+    "Clip",
+    "Softplus",
+    "Exp",
+    "Log",
+    "Sqrt",
+    "BatchNormalization",
+}
+
+# Tile counts tried along the output channels
+CHANNEL_SPLITS = (1, 2, 4, 8, 16, 32, 64)
+
+
+def tile_extents(dim):
+    """
+    Distinct tile extents ceil(dim / n) over all tile counts n
+    """
+    return np.unique([-(-dim // n) for n in range(1, dim + 1)])
+
+
+class TiledLayer:
+    """
+    One node of a fused segment
+
+    Attributes:
+    index (int):                Node index
+    op_type (str):              Node op_type
+    in_shape (list):            NCHW shape of the chained activation input
+    out_shape (list):           NCHW shape of the output
+    element_bytes (float):      Bytes per output element
+    kernel (tuple):             Window (kh, kw), (1, 1) for pointwise ops
+    strides (tuple):            Window strides
+    dilations (tuple):          Window dilations
+    weight_bytes (int):         Bytes of the initializer inputs
+    side_bytes (int):           Bytes of the other activation inputs read from outside the segment
+    macs (float):               MAC count of the whole node
+    """
+
+    def __init__(self, graph_index, tensor_size, index, chain_input, macs):
+        node = graph_index.nodes[index]
+        attr = {a.name: onnx.helper.get_attribute_value(a) for a in node.attribute}
+        self.index = index
+        self.op_type = node.op_type
+        self.in_shape = tensor_shape(graph_index, chain_input)
+        self.out_shape = tensor_shape(graph_index, node.output[0])
+        self.element_bytes = tensor_size.get(node.output[0], 0) / max(
+            np.prod(self.out_shape), 1
+        )
+        if node.op_type in WINDOW_OPS:
+            kernel_shape = attr.get("kernel_shape")
+            if kernel_shape is None:
+                weight = graph_index.find_initializer(node.input[1])
+                kernel_shape = tuple(weight.dims[2:]) if weight else (1, 1)
+            self.kernel = tuple(kernel_shape)
+            self.strides = tuple(attr.get("strides", (1, 1)))
+            self.dilations = tuple(attr.get("dilations", (1, 1)))
+        else:
+            self.kernel, self.strides, self.dilations = (1, 1), (1, 1), (1, 1)
+        self.weight_bytes = sum(
+            tensor_size.get(t, 0)
+            for t in node.input
+            if t and graph_index.is_initializer(t)
+        )
+        self.side_bytes = sum(
+            tensor_size.get(t, 0)
+            for t in node.input
+            if t and t != chain_input and not graph_index.is_initializer(t)
+        )
+        self.macs = float(macs)
+
+    def input_extent(self, out_extent, axis):
+        """
+        Input rows (axis 0) or columns (axis 1) needed for out_extent output rows/columns, halo included
+        """
+        extent = (
+            (out_extent - 1) * self.strides[axis]
+            + (self.kernel[axis] - 1) * self.dilations[axis]
+            + 1
+        )
+        return np.minimum(extent, self.in_shape[2 + axis])
+
+
+def tensor_shape(graph_index, tensor_name):
+    tensor = graph_index.find_tensor(tensor_name)
+    return graph_index.get_shape(tensor) if tensor is not None else []
+
+
+def is_tileable(graph_index, node):
+    if node.op_type not in WINDOW_OPS | POINTWISE_OPS:
+        return False
+    outputs = [t for t in node.output if t]
+    if len(outputs) != 1 or not node.input:
+        return False
+    return (
+        len(tensor_shape(graph_index, outputs[0])) == 4
+        and len(tensor_shape(graph_index, node.input[0])) == 4
+    )
+
+
+def find_segments(graph_index):
+    """
+    Linear chains of tileable nodes where every intermediate tensor has a single consumer and is not a model
+    output, so it never has to leave local memory. Window ops are chained on their data input only
+
+    Returns:
+        list of (node indices, chained input tensor of each node)
+    """
+    segments = []
+    visited = set()
+    for i, node in enumerate(graph_index.nodes):
+        if i in visited or not is_tileable(graph_index, node):
+            continue
+        chain, chain_inputs = [i], [node.input[0]]
+        visited.add(i)
+        while True:
+            output = graph_index.nodes[chain[-1]].output[0]
+            consumers = graph_index.get_consumers(output)
+            if len(consumers) != 1 or graph_index.is_model_output(output):
+                break
+            j = consumers[0]
+            next_node = graph_index.nodes[j]
+            if j in visited or not is_tileable(graph_index, next_node):
+                break
+            if next_node.op_type in WINDOW_OPS and next_node.input[0] != output:
+                break
+            if list(next_node.input).count(output) != 1:
+                break
+            chain.append(j)
+            chain_inputs.append(output)
+            visited.add(j)
+        if len(chain) > 1:
+            segments.append((chain, chain_inputs))
+    return segments
+
+
+class SegmentTiling:
+    """
+    Best spatial/channel tiling of a fused segment for a local memory budget.
+
+    The segment output is cut into tiles of th x tw pixels and tc channels. Going backwards through the segment
+    every layer computes the rows/columns its consumer needs, halo included, so neighbouring tiles recompute the
+    overlapping rows (redundant MACs) and re-read the overlapping input. Output channels are only split from the
+    last Conv on: the layers before it compute all their channels for every channel tile. Per tile a layer keeps
+    its input and output tiles in local memory. The weights of the segment stay resident when they fit next to
+    the activation tiles, otherwise the weights of each layer are reloaded for every tile it runs on.
+    Among the tilings that fit the budget the one moving the fewest DRAM bytes is kept, then the fewest redundant
+    MACs and tiles. When none fits, the tiling with the smallest footprint is reported
+
+    Attributes:
+    layers (list):              TiledLayers of the segment in chain order
+    tile (tuple):               Best (tc, th, tw)
+    num_tiles (int):            Number of tiles
+    footprint (int):            Local memory needed per tile (bytes)
+    fits (bool):                Whether the footprint fits the budget
+    weights_resident (bool):    Whether the weights are loaded once
+    dram_bytes (int):           DRAM traffic of the fused segment with the best tiling
+    unfused_dram_bytes (int):   DRAM traffic running the layers one by one through DRAM
+    weight_reloads (float):     Weight bytes loaded over the weight bytes of the segment
+    redundant_macs (float):     MACs recomputed in the halos and channel tiles
+    """
+
+    def __init__(self, layers, budget):
+        self.layers = layers
+        last = layers[-1]
+        _, channels, height, width = last.out_shape
+        th, tw, tc = np.meshgrid(
+            tile_extents(height),
+            tile_extents(width),
+            np.unique([-(-channels // n) for n in CHANNEL_SPLITS if n <= channels]),
+            indexing="ij",
+        )
+        th, tw, tc = th.ravel(), tw.ravel(), tc.ravel()
+        n_spatial = -(-height // th) * -(-width // tw)
+        n_channel = -(-channels // tc)
+        tiles = n_spatial * n_channel
+
+        conv_positions = [
+            k for k, layer in enumerate(layers) if layer.op_type == "Conv"
+        ]
+        first_split = conv_positions[-1] if conv_positions else 0
+
+        # Backwards through the layers: rows/columns computed per tile, activation buffers and traffic
+        out_h, out_w = th, tw
+        peak = np.zeros(len(th))
+        activation_bytes = np.zeros(len(th))
+        computed_macs = np.zeros(len(th))
+        weight_traffic = np.zeros(len(th))
+        max_weight = np.zeros(len(th))
+        for k in range(len(layers) - 1, -1, -1):
+            layer = layers[k]
+            batch, out_c, full_h, full_w = layer.out_shape
+            in_c = layer.in_shape[1]
+            split = k >= first_split
+            if split:
+                # Pointwise and pooling layers follow the channel split of their input
+                out_tile_c = np.ceil(tc * out_c / channels)
+                in_tile_c = (
+                    np.full(len(th), in_c)
+                    if layer.op_type == "Conv"
+                    else np.ceil(tc * in_c / channels)
+                )
+            else:
+                out_tile_c = np.full(len(th), out_c)
+                in_tile_c = np.full(len(th), in_c)
+            in_h = layer.input_extent(out_h, 0)
+            in_w = layer.input_extent(out_w, 1)
+
+            out_tile = batch * out_tile_c * out_h * out_w * layer.element_bytes
+            in_tile = batch * in_tile_c * in_h * in_w * layer.element_bytes
+            side_tile = (
+                layer.side_bytes
+                * out_tile_c
+                * out_h
+                * out_w
+                / (out_c * full_h * full_w)
+            )
+            peak = np.maximum(peak, in_tile + out_tile + side_tile)
+            computed_macs += layer.macs * (
+                tiles * out_tile_c * out_h * out_w / (out_c * full_h * full_w)
+            )
+            activation_bytes += tiles * side_tile
+            if k == 0:
+                activation_bytes += tiles * in_tile
+
+            # A channel-split Conv only needs the weights of its output channels
+            weight_slice = layer.weight_bytes * (out_tile_c / out_c if split else 1)
+            weight_traffic += tiles * weight_slice
+            max_weight = np.maximum(max_weight, weight_slice)
+            out_h, out_w = in_h, in_w
+
+        total_weights = sum(layer.weight_bytes for layer in layers)
+        output_bytes = np.prod(last.out_shape) * last.element_bytes
+        resident_footprint = peak + total_weights
+        streamed_footprint = peak + max_weight
+        weights_resident = resident_footprint <= budget
+        footprint = np.where(weights_resident, resident_footprint, streamed_footprint)
+        weight_traffic = np.where(weights_resident, total_weights, weight_traffic)
+        dram_bytes = activation_bytes + weight_traffic + output_bytes
+        redundant_macs = np.maximum(
+            computed_macs - sum(layer.macs for layer in layers), 0
+        )
+
+        fitting = np.flatnonzero(footprint <= budget)
+        if len(fitting):
+            best = fitting[
+                np.lexsort(
+                    (tiles[fitting], redundant_macs[fitting], dram_bytes[fitting])
+                )[0]
+            ]
+        else:
+            best = int(np.argmin(footprint))
+
+        self.tile = (int(tc[best]), int(th[best]), int(tw[best]))
+        self.num_tiles = int(tiles[best])
+        self.footprint = int(np.ceil(footprint[best]))
+        self.fits = bool(footprint[best] <= budget)
+        self.weights_resident = bool(weights_resident[best])
+        self.dram_bytes = int(np.ceil(dram_bytes[best]))
+        self.weight_reloads = (
+            float(weight_traffic[best] / total_weights) if total_weights else 0.0
+        )
+        self.redundant_macs = float(redundant_macs[best])
+        self.unfused_dram_bytes = int(
+            sum(
+                (np.prod(layer.in_shape) + np.prod(layer.out_shape))
+                * layer.element_bytes
+                + layer.weight_bytes
+                + layer.side_bytes
+                for layer in layers
+            )
+        )
+
+
+class FusedTiling:
+    """
+    Tiling search over all the fused segments of the model
+
+    Attributes:
+    budget (int):               Local memory size in bytes
+    segments (list):            SegmentTiling of every segment, in node order
+    """
+
+    def __init__(self, graph_index, tensor_size, macs, budget):
+        self.budget = budget
+        self.graph_index = graph_index
+        self.segments = []
+        for chain, chain_inputs in find_segments(graph_index):
+            layers = [
+                TiledLayer(graph_index, tensor_size, i, chain_input, macs[i])
+                for i, chain_input in zip(chain, chain_inputs)
+            ]
+            self.segments.append(SegmentTiling(layers, budget))
+
+    def rows(self):
+        rows = []
+        for segment in self.segments:
+            nodes = [self.graph_index.nodes[layer.index] for layer in segment.layers]
+            rows.append(
+                {
+                    "First Node": nodes[0].name,
+                    "Last Node": nodes[-1].name,
+                    "Op Types": "->".join(node.op_type for node in nodes),
+                    "Tile (C x H x W)": "x".join(str(t) for t in segment.tile),
+                    "Tiles": segment.num_tiles,
+                    "Footprint (bytes)": segment.footprint,
+                    "Fits": segment.fits,
+                    "Weights Resident": segment.weights_resident,
+                    "Weight Reloads": segment.weight_reloads,
+                    "Redundant MACs": segment.redundant_macs,
+                    "Fused DRAM bytes": segment.dram_bytes,
+                    "Unfused DRAM bytes": segment.unfused_dram_bytes,
+                }
+            )
+        return rows
@@ -0,0 +1,155 @@
+import json
+
+import numpy as np
+
+
+class Timeline:
+    """
+    Discrete-event simulation of one compute engine fed by double-buffered DMA.
+
+    Nodes compute one after another in node order. The loads of a node are prefetched while the previous node
+    computes: they can start once the node two before has finished computing and freed its buffer, and once the
+    stores of the producers they read back are done. The stores of a node start when it has finished computing.
+    Every transfer goes to the DMA queue that frees up first, in the order the engine issues them (the prefetch
+    of the next node before the store of the current one). A node waiting for its loads stalls the compute
+
+    Attributes:
+    names (list):               Node names
+    load (array):               (start, end) of the loads of every node in seconds
+    compute (array):            (start, end) of the compute of every node in seconds
+    store (array):              (start, end) of the stores of every node in seconds
+    load_queue (list):          DMA queue of the loads of every node (None without loads)
+    store_queue (list):         DMA queue of the stores of every node (None without stores)
+    stall (array):              Time the compute waits for the loads of every node in seconds
+    makespan (float):           End of the last compute or store in seconds
+    """
+
+    def __init__(
+        self, graph_index, hw_profile, compute_time, bytes_loaded, bytes_stored
+    ):
+        num_nodes = len(graph_index.nodes)
+        self.names = [node.name for node in graph_index.nodes]
+        self.load = np.zeros((num_nodes, 2))
+        self.compute = np.zeros((num_nodes, 2))
+        self.store = np.zeros((num_nodes, 2))
+        self.load_queue = [None] * num_nodes
+        self.store_queue = [None] * num_nodes
+        self.stall = np.zeros(num_nodes)
+        self.queue_free = [0.0] * hw_profile.dma_queues
+        self.hw_profile = hw_profile
+
+        # Producers whose stored outputs a node loads back
+        stored_producers = [
+            {
+                graph_index.producer[t]
+                for t in node.input
+                if t in graph_index.producer and bytes_stored[graph_index.producer[t]]
+            }
+            for node in graph_index.nodes
+        ]
+
+        def issue_load(i):
+            ready = self.compute[i - 2, 1] if i >= 2 else 0.0
+            for j in stored_producers[i]:
+                ready = max(ready, self.store[j, 1])
+            self.load_queue[i] = self.transfer(self.load, i, bytes_loaded[i], ready)
+
+        if num_nodes:
+            issue_load(0)
+        compute_free = 0.0
+        for i in range(num_nodes):
+            start = max(compute_free, self.load[i, 1])
+            self.stall[i] = max(self.load[i, 1] - compute_free, 0.0)
+            self.compute[i] = start, start + compute_time[i]
+            compute_free = self.compute[i, 1]
+
+            prefetch = i + 1 < num_nodes
+            if prefetch and i not in stored_producers[i + 1]:
+                issue_load(i + 1)
+                prefetch = False
+            self.store_queue[i] = self.transfer(
+                self.store, i, bytes_stored[i], self.compute[i, 1]
+            )
+            if prefetch:
+                issue_load(i + 1)
+
+        self.makespan = float(
+            max(self.compute[:, 1].max(initial=0), self.store[:, 1].max(initial=0))
+        )
+
+    def transfer(self, events, i, num_bytes, ready):
+        """
+        Run a transfer on the first free DMA queue, returns the queue (None for an empty transfer)
+        """
+        if not num_bytes:
+            events[i] = ready, ready
+            return None
+        queue = int(np.argmin(self.queue_free))
+        start = max(self.queue_free[queue], ready)
+        events[i] = start, start + self.hw_profile.transfer_time(num_bytes)
+        self.queue_free[queue] = events[i, 1]
+        return queue
+
+    def rows(self):
+        rows = []
+        for i, name in enumerate(self.names):
+            rows.append(
+                {
+                    "Operator Name": name,
+                    "Load Start (us)": self.load[i, 0] * 1e6,
+                    "Load End (us)": self.load[i, 1] * 1e6,
+                    "Compute Start (us)": self.compute[i, 0] * 1e6,
+                    "Compute End (us)": self.compute[i, 1] * 1e6,
+                    "Store Start (us)": self.store[i, 0] * 1e6,
+                    "Store End (us)": self.store[i, 1] * 1e6,
+                    "DMA Stall (us)": self.stall[i] * 1e6,
+                }
+            )
+        return rows
+
+    def to_chrome_trace(self, filename):
+        """
+        Write the timeline in the Chrome trace event format, readable by chrome://tracing and Perfetto.
+        The compute engine and every DMA queue are one track each
+        """
+        tracks = ["Compute"] + [f"DMA {q}" for q in range(self.hw_profile.dma_queues)]
+        events = [
+            {
+                "name": "thread_name",
+                "ph": "M",
+                "pid": 0,
+                "tid": tid,
+                "args": {"name": track},
+            }
+            for tid, track in enumerate(tracks)
+        ]
+
+        def add(name, category, tid, span):
+            events.append(
+                {
+                    "name": name,
+                    "cat": category,
+                    "ph": "X",
+                    "pid": 0,
+                    "tid": tid,
+                    "ts": span[0] * 1e6,
+                    "dur": (span[1] - span[0]) * 1e6,
+                }
+            )
+
+        for i, name in enumerate(self.names):
+            add(name, "compute", 0, self.compute[i])
+            if self.stall[i] > 0:
+                add(
+                    f"stall {name}",
+                    "stall",
+                    0,
+                    (self.compute[i, 0] - self.stall[i], self.compute[i, 0]),
+                )
+            if self.load_queue[i] is not None:
+                add(f"load {name}", "dma", self.load_queue[i] + 1, self.load[i])
+            if self.store_queue[i] is not None:
+                add(f"store {name}", "dma", self.store_queue[i] + 1, self.store[i])
+
+        with open(filename, "w") as f:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ns"}, f)